@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 class AgentInput(BaseModel):
     """
@@ -15,4 +15,47 @@ class AgentOutput(BaseModel):
     chain_of_thought: Optional[str] = Field(
         None,
         description="The chain-of-thought used by the agent, if stored."
-    )
\ No newline at end of file
+    )
+
+class ToolCall(BaseModel):
+    """
+    Represents one tool invocation planned by the agent.
+    """
+    tool: str = Field(..., description="The name of the tool to call.")
+    tool_input: str = Field(..., description="The input passed to the tool.")
+
+class AgentBudget(BaseModel):
+    """
+    Represents the execution limits of one agent run.
+    """
+    max_steps: int = Field(5, ge=1, description="Maximum number of planning steps.")
+    max_tokens: Optional[int] = Field(None, ge=1, description="Maximum prompt plus completion tokens across the run.")
+    deadline_seconds: Optional[float] = Field(None, gt=0, description="Wall-clock limit for the whole run.")
+    step_timeout: float = Field(30.0, gt=0, description="Seconds the tool calls of one step may take together.")
+
+class ToolResult(BaseModel):
+    """
+    Represents the outcome of one tool invocation.
+    """
+    tool: str = Field(..., description="The name of the tool that was called.")
+    tool_input: str = Field(..., description="The input passed to the tool.")
+    output: Optional[str] = Field(None, description="The tool output, rendered as text.")
+    error: Optional[str] = Field(None, description="The error message if the call failed or timed out.")
+    elapsed: float = Field(0.0, description="Seconds the call took.")
+    cached: bool = Field(False, description="Whether the output was served from the tool memo.")
+
+class AgentStep(BaseModel):
+    """
+    Represents one planning step of an agent run.
+    """
+    thought: str = Field(..., description="The raw planner output for the step.")
+    tool_calls: List[ToolCall] = Field(default_factory=list, description="The tool calls planned in the step.")
+    tool_results: List[ToolResult] = Field(default_factory=list, description="The results, in planned order.")
+
+class AgentEvent(BaseModel):
+    """
+    Represents one event of a streamed agent run.
+    """
+    event: str = Field(..., description="token, thought, tool_call, tool_result, final_answer or error.")
+    step: int = Field(..., description="The zero-based step the event belongs to.")
+    data: Dict[str, Any] = Field(default_factory=dict, description="The event payload.")
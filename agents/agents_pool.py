@@ -0,0 +1,87 @@
+"""Process-wide pool of prepared agents, so tool bindings and prompts are built once per tool set rather than per request."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence, Tuple
+
+from agents.agents_service import Agent, resolve_tool_name
+from tools.tools_registry import ToolRegistry, get_tool_registry
+from utils.logger import lazy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 64
+
+
+class AgentPool:
+    """
+    LRU cache of immutable Agent instances keyed by their tool set and the
+    registry version they were prepared against. Agents hold no per-run
+    state, so one pooled instance is shared by every concurrent request.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE) -> None:
+        """
+        :param max_size: Maximum number of distinct agents kept.
+        :raises ValueError: If max_size is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        self._max_size = max_size
+        self._agents: "OrderedDict[Tuple[Hashable, ...], Agent]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_agent(self, tools: Sequence[Any], tool_registry: Optional[ToolRegistry] = None) -> Agent:
+        """
+        Returns a prepared agent for the given tools, building it on first use.
+
+        :param tools: Registry tool names or callables taking one string.
+        :param tool_registry: The registry the tools are described from; the process-wide registry by default.
+        :return: A shared Agent instance.
+        """
+        registry = tool_registry or get_tool_registry()
+        key = (id(registry), registry.version, *(self._tool_key(tool) for tool in tools))
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self.hits += 1
+                return agent
+            self.misses += 1
+
+        agent = Agent(list(tools), registry)
+        with self._lock:
+            agent = self._agents.setdefault(key, agent)
+            self._agents.move_to_end(key)
+            while len(self._agents) > self._max_size:
+                self._agents.popitem(last=False)
+        logger.debug("Prepared agent for tools %s.", lazy(lambda: list(agent.tools)))
+        return agent
+
+    def clear(self) -> None:
+        """
+        Drops every pooled agent.
+        """
+        with self._lock:
+            self._agents.clear()
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    @staticmethod
+    def _tool_key(tool: Any) -> Hashable:
+        # Callables are keyed by identity so two different functions with the same name never share an agent.
+        return tool if isinstance(tool, str) else (resolve_tool_name(tool), id(tool))
+
+
+agent_pool = AgentPool()
+
+
+def get_agent_pool() -> AgentPool:
+    """
+    Returns the process-wide agent pool, for use as a FastAPI dependency.
+    """
+    return agent_pool
@@ -1,5 +1,15 @@
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, status
+import json
+from typing import AsyncIterator, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from agents.agents_models import AgentInput
+from agents.agents_pool import AgentPool, get_agent_pool
+from agents.agents_service import AgentBudgetExceededError, AgentServiceError, arun_agent_query, astream_agent
+from chains.chains_llm import get_llm_provider
+from jobs.jobs_router import job_accepted_response
+from jobs.jobs_service import JobQueue, get_job_queue
+from tools.tools_registry import ToolRegistry, get_tool_registry
 
 router = APIRouter(
     prefix="/agents",
@@ -9,24 +19,109 @@ router = APIRouter(
 
 
 @router.post("/query")
-def agent_query_endpoint(request_data: Dict[str, Any]) -> Dict[str, Any]:
+async def agent_query_endpoint(
+    request_data: AgentInput,
+    llm_provider: Any = Depends(get_llm_provider),
+    tool_registry: ToolRegistry = Depends(get_tool_registry),
+    agent_pool: AgentPool = Depends(get_agent_pool),
+    run_async: bool = Query(False, alias="async"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> Dict[str, Any]:
     """
     Routes an agent-based query and returns the agent's final answer.
 
+    With async=true the query is enqueued as a background job instead, and the
+    response is 202 with the job id to poll or stream under /jobs.
+
     Args:
-        request_data (Dict[str, Any]): The input data required for the agent to generate a response.
+        request_data (AgentInput): The input data required for the agent to generate a response.
+        llm_provider (Any): The LLM that plans the agent's steps.
+        tool_registry (ToolRegistry): Runs the tools the agent calls.
+        agent_pool (AgentPool): Supplies a prepared agent for the registry's tools.
+        run_async (bool): Enqueue the query as a background job.
+        job_queue (JobQueue): The queue background jobs are submitted to.
 
     Returns:
         Dict[str, Any]: The final answer generated by the agent or an error message if something goes wrong.
     """
+    if run_async:
+        job = job_queue.submit(
+            "agent_query",
+            {"user_query": request_data.user_query},
+            context={"llm_provider": llm_provider, "tool_registry": tool_registry, "agent_pool": agent_pool},
+        )
+        return job_accepted_response(job)
     try:
-        # TODO: Implement multi-step agent logic using request_data
-        # TODO: Possibly integrate with external tools/APIs
-        agent_answer = "Dummy Answer"  # Placeholder for agent's final answer
+        agent = agent_pool.get_agent(tool_registry.tool_names(), tool_registry)
+        agent_answer = await arun_agent_query(
+            agent, request_data.user_query, llm_provider=llm_provider, tool_registry=tool_registry
+        )
         return {"answer": agent_answer}
+    except AgentBudgetExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except AgentServiceError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         # TODO: Handle or log the exception
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Serializes a single server-sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/query/stream")
+async def agent_query_stream_endpoint(
+    request_data: AgentInput,
+    llm_provider: Any = Depends(get_llm_provider),
+    tool_registry: ToolRegistry = Depends(get_tool_registry),
+    agent_pool: AgentPool = Depends(get_agent_pool),
+) -> StreamingResponse:
+    """
+    Runs an agent query and streams its trace as server-sent events.
+
+    Events are token (planner output as it is generated), thought, tool_call,
+    tool_result (as each tool finishes) and final_answer; failures, including an
+    exhausted budget, end the stream with an error event. Each event's data
+    carries the step number plus the event payload.
+
+    Args:
+        request_data (AgentInput): The input data required for the agent to generate a response.
+        llm_provider (Any): The LLM that plans the agent's steps.
+        tool_registry (ToolRegistry): Runs the tools the agent calls.
+        agent_pool (AgentPool): Supplies a prepared agent for the registry's tools.
+
+    Returns:
+        StreamingResponse: A text/event-stream response.
+    """
+    agent = agent_pool.get_agent(tool_registry.tool_names(), tool_registry)
+    try:
+        # Validates the query without starting the run, so headers go out at once.
+        events = astream_agent(agent, request_data.user_query, llm_provider=llm_provider, tool_registry=tool_registry)
+    except AgentServiceError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            async for event in events:
+                yield _format_sse(event.event, {"step": event.step, **event.data})
+        finally:
+            # Cancels the agent run and its tool calls when the client disconnects.
+            await events.aclose()
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
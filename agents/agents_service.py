@@ -1,8 +1,48 @@
+import asyncio
+import functools
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import re
+import time
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, Callable, Dict, List, Mapping, Optional, Tuple
+
+from langchain.callbacks.base import AsyncCallbackHandler
+from pydantic import BaseModel
+
+from agents.agents_models import AgentBudget, AgentEvent, AgentStep, ToolCall, ToolResult
+from chains.chains_cache import CacheBackend, LRUCacheBackend, normalize_prompt
+from chains.chains_llm import get_llm_provider
+from chains.chains_prompt import compile_prompt, count_tokens
+from chains.chains_registry import llm_config_key
+from metrics.metrics_service import record_cache_lookup, record_llm_tokens
+from tools.tools_registry import ToolRegistry, get_tool_registry
+from utils.singleflight import SingleFlight
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Everything before the question depends only on the agent's tools, so agents render it once.
+AGENT_PROMPT_PREFIX = (
+    "Answer the question as well as you can. You have access to these tools:\n"
+    "{tools}\n\n"
+    "To use tools, write one line per call in the form:\n"
+    "Action: tool_name[tool input]\n"
+    "Calls written in the same reply are independent and run in parallel.\n"
+    "When you know the answer, write:\n"
+    "Final Answer: the answer\n\n"
+)
+AGENT_PROMPT = compile_prompt(AGENT_PROMPT_PREFIX + "Question: {user_query}\n{scratchpad}")
+
+_ACTION_PATTERN = re.compile(r"^\s*Action:\s*([\w-]+)\s*\[(.*)\]\s*$", re.MULTILINE)
+_FINAL_ANSWER_PATTERN = re.compile(r"Final Answer:\s*(.*)", re.DOTALL)
+_OBSERVATION_STOP = "\nObservation:"
+_STREAM_END = object()
+
+AgentEventHandler = Callable[[AgentEvent], None]
+
+agent_flight = SingleFlight()
+
 
 class AgentServiceError(Exception):
     """
@@ -11,50 +51,537 @@ class AgentServiceError(Exception):
     pass
 
 
-def create_basic_agent(tools: Optional[List[Any]]) -> Dict[str, Any]:
+class AgentBudgetExceededError(AgentServiceError):
+    """
+    Raised when a run uses up its steps, tokens or time before reaching a final answer.
+    The partial run is available as the run attribute.
+    """
+
+    def __init__(self, message: str, run: "AgentRun") -> None:
+        super().__init__(message)
+        self.run = run
+
+
+class _PlannerTokenHandler(AsyncCallbackHandler):
+    """
+    Callback handler that reports every planner token to an event sink.
+    """
+
+    def __init__(self, emit: Callable[..., None]) -> None:
+        self.emit = emit
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.emit(token=token)
+
+
+class Agent:
+    """
+    Immutable, shareable agent definition: its tool bindings and the
+    pre-rendered part of the planner prompt. Everything that changes during
+    a run lives in AgentRun, so one Agent can serve any number of concurrent
+    queries.
+    """
+
+    __slots__ = ("name", "tools", "tool_descriptions", "prompt")
+
+    def __init__(self, tools: List[Any], tool_registry: Optional[ToolRegistry] = None, name: str = "BasicAgent") -> None:
+        """
+        :param tools: Registry tool names or callables taking one string.
+        :param tool_registry: Supplies descriptions for tools given by name; the process-wide registry by default.
+        :param name: A display name for the agent.
+        """
+        registry = tool_registry or get_tool_registry()
+        bindings = {resolve_tool_name(tool): tool for tool in tools}
+        descriptions = _describe_tools(bindings, registry)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "tools", MappingProxyType(bindings))
+        object.__setattr__(self, "tool_descriptions", descriptions)
+        object.__setattr__(self, "prompt", AGENT_PROMPT.partial(tools=descriptions))
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("Agent instances are immutable.")
+
+    def render_prompt(self, user_query: str, scratchpad: str) -> str:
+        """
+        Renders the planner prompt for one step by filling the question and scratchpad into the compiled prompt.
+        """
+        return self.prompt.format(user_query=user_query, scratchpad=scratchpad)
+
+
+class AgentRun:
+    """
+    Mutable state of one agent query: the question, the steps taken so far,
+    the budget consumed, memoized tool outputs and the final answer.
+    """
+
+    __slots__ = (
+        "user_query", "steps", "final_answer", "stop_reason", "tokens_used", "tool_memo",
+        "scratchpad_tokens", "_scratchpad",
+    )
+
+    def __init__(self, user_query: str) -> None:
+        self.user_query = user_query
+        self.steps: List[AgentStep] = []
+        self.final_answer: Optional[str] = None
+        self.stop_reason: Optional[str] = None
+        self.tokens_used = 0
+        self.tool_memo: Dict[str, str] = {}
+        self.scratchpad_tokens = 0
+        self._scratchpad: List[str] = []
+
+    @property
+    def scratchpad(self) -> str:
+        return "".join(self._scratchpad)
+
+    def record(self, step: AgentStep) -> None:
+        """
+        Appends a completed step and its observations to the scratchpad, keeping its token count current.
+        """
+        self.steps.append(step)
+        if step.tool_calls:
+            entry = f"{step.thought.strip()}\n{_format_observations(step.tool_results)}\n"
+            self._scratchpad.append(entry)
+            self.scratchpad_tokens += count_tokens(entry)
+
+
+def create_basic_agent(tools: Optional[List[Any]], tool_registry: Optional[ToolRegistry] = None) -> Agent:
     """
     Builds an agent that can utilize a provided set of tools.
 
-    :param tools: A list of tools that the agent can use.
-    :return: A dictionary representing the agent.
+    :param tools: A list of tools that the agent can use: registry tool names or callables.
+    :param tool_registry: Supplies descriptions for tools given by name; the process-wide registry by default.
+    :return: The agent.
     :raises AgentServiceError: If tools are not provided or invalid.
     """
     if tools is None or not isinstance(tools, list):
         logger.error("Invalid tools parameter provided.")
         raise AgentServiceError("Tools must be a list of usable resources.")
 
-    # TODO: Replace this placeholder structure with a proper Agent class or a more sophisticated data structure.
-    agent = {
-        "name": "BasicAgent",
-        "tools": tools,
-        "state": {}
-    }
-
+    agent = Agent(tools, tool_registry)
     logger.debug("Created basic agent with provided tools.")
     return agent
 
 
-def run_agent_query(agent: Dict[str, Any], user_query: str) -> str:
+def _validate_query(agent: Agent, user_query: str) -> None:
+    if not agent:
+        logger.error("Agent is not provided or is invalid.")
+        raise AgentServiceError("Agent object is required.")
+
+    if not user_query:
+        logger.error("Empty user query provided.")
+        raise AgentServiceError("User query cannot be empty.")
+
+
+def parse_agent_output(text: str) -> Tuple[List[ToolCall], Optional[str]]:
+    """
+    Extracts the tool calls and final answer from one planner response.
+
+    :param text: The LLM output for a step.
+    :return: The tool calls in the order they were written, and the final answer if one was given.
+    """
+    calls = [ToolCall(tool=m.group(1), tool_input=m.group(2).strip()) for m in _ACTION_PATTERN.finditer(text)]
+    final = _FINAL_ANSWER_PATTERN.search(text)
+    return calls, final.group(1).strip() if final else None
+
+
+def resolve_tool_name(tool: Any) -> str:
+    """
+    Returns the name an agent uses for a tool: the registry name itself, or a
+    callable's name without a trailing "_tool".
+    """
+    if isinstance(tool, str):
+        return tool
+    name = getattr(tool, "__name__", None) or str(getattr(tool, "name", "")) or type(tool).__name__
+    return name[:-len("_tool")] if name.endswith("_tool") else name
+
+
+def _describe_tools(tools: Dict[str, Any], registry: ToolRegistry) -> str:
+    lines = []
+    for name, tool in tools.items():
+        if isinstance(tool, str) and name in registry.tool_names():
+            description = registry.get(name).description
+        else:
+            description = (getattr(tool, "__doc__", None) or "").strip().split("\n")[0]
+        lines.append(f"{name}: {description}" if description else name)
+    return "\n".join(lines)
+
+
+async def _execute_tool(tool: Any, tool_input: str, registry: ToolRegistry) -> Any:
+    if isinstance(tool, str):
+        return await registry.call(tool, tool_input)
+    # Registry calls open their own span; plain callables are traced here.
+    with span("tool.call", **{"tool.name": resolve_tool_name(tool)}):
+        if asyncio.iscoroutinefunction(tool):
+            return await tool(tool_input)
+        return await asyncio.to_thread(tool, tool_input)
+
+
+def _render_output(output: Any) -> str:
+    if isinstance(output, BaseModel):
+        return output.json()
+    return str(output)
+
+
+def tool_memo_key(call: ToolCall, tool: Any, registry: ToolRegistry) -> str:
+    """
+    Returns the memo key for a tool call: the tool identity plus its whitespace-normalized input.
+
+    Registry tools are keyed by registry and version, so re-registering a tool never serves stale results.
+    """
+    owner = f"{id(registry)}:{registry.version}" if isinstance(tool, str) else f"fn:{id(tool)}"
+    return f"{owner}\x1f{call.tool}\x1f{' '.join(call.tool_input.split())}"
+
+
+async def run_tool_calls(
+    calls: List[ToolCall],
+    tools: Mapping[str, Any],
+    registry: ToolRegistry,
+    timeout: float,
+    run_memo: Optional[Dict[str, str]] = None,
+    shared_memo: Optional[CacheBackend] = None,
+    on_result: Optional[Callable[[int, ToolResult], None]] = None,
+) -> List[ToolResult]:
+    """
+    Runs the tool calls of one agent step concurrently under a shared deadline.
+
+    Calls already answered in this run (run_memo) or recently by any run
+    (shared_memo) are served from the memo, and identical calls within the
+    step run only once. Only successful outputs are memoized.
+
+    :param calls: The tool calls planned for the step.
+    :param tools: The agent's tools by name: registry names or callables taking one string.
+    :param registry: Executes tools given by name.
+    :param timeout: Seconds all calls together may take; unfinished calls are cancelled.
+    :param run_memo: Outputs by memo key for the current run; updated in place.
+    :param shared_memo: Cross-run memo with its own expiry; updated in place.
+    :param on_result: Called with (call index, result) as soon as each result is available.
+    :return: One result per call, in the order the calls were planned.
+    """
+    async def run_one(call: ToolCall) -> ToolResult:
+        start = time.perf_counter()
+        tool = tools.get(call.tool)
+        try:
+            if tool is None:
+                raise AgentServiceError(f"Unknown tool: {call.tool}")
+            output = await _execute_tool(tool, call.tool_input, registry)
+            return ToolResult(tool=call.tool, tool_input=call.tool_input, output=_render_output(output),
+                              elapsed=time.perf_counter() - start)
+        except Exception as e:
+            logger.warning("Tool '%s' failed: %s", call.tool, e)
+            return ToolResult(tool=call.tool, tool_input=call.tool_input, error=str(e) or type(e).__name__,
+                              elapsed=time.perf_counter() - start)
+
+    if not calls:
+        return []
+
+    keys: List[Optional[str]] = []
+    memoized: Dict[str, str] = {}
+    tasks: Dict[Any, asyncio.Task] = {}
+    for index, call in enumerate(calls):
+        tool = tools.get(call.tool)
+        key = tool_memo_key(call, tool, registry) if tool is not None else None
+        keys.append(key)
+        if key is None:
+            tasks[index] = asyncio.create_task(run_one(call))
+            continue
+        if key in memoized or key in tasks:
+            continue
+        output = run_memo.get(key) if run_memo is not None else None
+        if output is None and shared_memo is not None:
+            output = shared_memo.get(key)
+        record_cache_lookup("tool_memo", output is not None)
+        if output is not None:
+            memoized[key] = output
+        else:
+            tasks[key] = asyncio.create_task(run_one(call))
+
+    def for_call(call: ToolCall, result: ToolResult) -> ToolResult:
+        # Deduplicated calls share one result, but each keeps its own spelling of the input.
+        return result if result.tool_input == call.tool_input else result.copy(update={"tool_input": call.tool_input})
+
+    if on_result is not None:
+        for index, (call, key) in enumerate(zip(calls, keys)):
+            if key in memoized:
+                on_result(index, ToolResult(tool=call.tool, tool_input=call.tool_input, output=memoized[key], cached=True))
+
+        def notify(task: asyncio.Task, indices: List[int]) -> None:
+            if not task.cancelled():
+                for i in indices:
+                    on_result(i, for_call(calls[i], task.result()))
+
+        for task_key, task in tasks.items():
+            indices = [i for i, key in enumerate(keys) if (key if key is not None else i) == task_key]
+            task.add_done_callback(functools.partial(notify, indices=indices))
+
+    if tasks:
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+    else:
+        done = set()
+
+    results = []
+    for index, (call, key) in enumerate(zip(calls, keys)):
+        if key in memoized:
+            results.append(ToolResult(tool=call.tool, tool_input=call.tool_input, output=memoized[key], cached=True))
+            continue
+        task = tasks[key if key is not None else index]
+        if task in done:
+            result = task.result()
+            results.append(for_call(call, result))
+            if key is not None and result.error is None:
+                if run_memo is not None:
+                    run_memo[key] = result.output
+                if shared_memo is not None:
+                    shared_memo.set(key, result.output)
+        else:
+            results.append(ToolResult(tool=call.tool, tool_input=call.tool_input,
+                                      error=f"Timed out after {timeout}s.", elapsed=timeout))
+            if on_result is not None:
+                on_result(index, results[-1])
+    return results
+
+
+def _format_observations(results: List[ToolResult]) -> str:
+    return "\n".join(
+        f"Observation: {r.tool}[{r.tool_input}] -> {r.output if r.error is None else 'Error: ' + r.error}"
+        for r in results
+    )
+
+
+def build_tool_memo_from_env() -> Optional[CacheBackend]:
+    """
+    Builds the cross-run tool memo from AGENT_TOOL_MEMO_TTL (seconds, default 300;
+    0 disables it) and AGENT_TOOL_MEMO_SIZE (entries, default 1024).
+
+    :return: An LRU cache backend, or None when disabled.
+    """
+    ttl = float(os.getenv("AGENT_TOOL_MEMO_TTL", "300"))
+    if ttl <= 0:
+        return None
+    return LRUCacheBackend(max_size=int(os.getenv("AGENT_TOOL_MEMO_SIZE", "1024")), ttl_seconds=ttl)
+
+
+_tool_memo: Optional[CacheBackend] = None
+_tool_memo_built = False
+
+
+def get_tool_memo() -> Optional[CacheBackend]:
+    """
+    Returns the process-wide cross-run tool memo, built from the environment on first use.
+    """
+    global _tool_memo, _tool_memo_built
+    if not _tool_memo_built:
+        _tool_memo = build_tool_memo_from_env()
+        _tool_memo_built = True
+    return _tool_memo
+
+
+def run_agent_query(agent: Agent, user_query: str) -> str:
     """
     Passes a query to the agent and handles the chain of thought.
 
-    :param agent: The agent (dictionary or object) with tools and state.
+    Blocking wrapper around arun_agent_query; do not call it from a running event loop.
+
+    :param agent: The agent with its tools.
     :param user_query: The user's query to be processed by the agent.
     :return: The agent's response as a string.
     :raises AgentServiceError: If the agent or user query is invalid.
     """
-    if not agent:
-        logger.error("Agent is not provided or is invalid.")
-        raise AgentServiceError("Agent object is required.")
+    _validate_query(agent, user_query)
+    return asyncio.run(arun_agent_query(agent, user_query))
 
-    if not user_query:
-        logger.error("Empty user query provided.")
-        raise AgentServiceError("User query cannot be empty.")
 
-    logger.debug("Running agent query.")
-    # TODO: Implement the agent's chain of thought using the provided tools and agent state.
-    # The current implementation is a placeholder.
-    response = f"Agent response to '{user_query}' with tools: {agent.get('tools')}"
+async def arun_agent_query(
+    agent: Agent,
+    user_query: str,
+    llm_provider: Optional[Any] = None,
+    tool_registry: Optional[ToolRegistry] = None,
+    budget: Optional[AgentBudget] = None,
+    tool_memo: Optional[CacheBackend] = None,
+) -> str:
+    """
+    Runs the agent loop and returns only the final answer. See arun_agent.
+
+    Concurrent queries with the same agent, normalized query, LLM configuration
+    and budget share one run; its answer, or its error, goes to every caller.
+
+    :param agent: The agent with its tools.
+    :param user_query: The user's query to be processed by the agent.
+    :return: The agent's final answer as a string.
+    :raises AgentServiceError: If the agent or user query is invalid.
+    :raises AgentBudgetExceededError: If the budget runs out before a final answer.
+    """
+    _validate_query(agent, user_query)
+    llm = llm_provider or get_llm_provider()
+    registry = tool_registry or get_tool_registry()
+    budget = budget or AgentBudget()
+    # The running flight holds the agent and registry, so their ids cannot be reused while it is keyed by them.
+    key = (id(agent), id(registry), registry.version, normalize_prompt(user_query), llm_config_key(llm), budget.json())
+
+    async def run_query() -> str:
+        run = await arun_agent(agent, user_query, llm, registry, budget, tool_memo)
+        return run.final_answer
+
+    return await agent_flight.do(key, run_query)
+
+
+async def arun_agent(
+    agent: Agent,
+    user_query: str,
+    llm_provider: Optional[Any] = None,
+    tool_registry: Optional[ToolRegistry] = None,
+    budget: Optional[AgentBudget] = None,
+    tool_memo: Optional[CacheBackend] = None,
+    on_event: Optional[AgentEventHandler] = None,
+) -> AgentRun:
+    """
+    Runs the agent loop: the LLM plans one step at a time, every tool call it
+    emits in a step runs concurrently, and the observations are fed back. The
+    run ends as soon as a final answer appears, or when the budget runs out.
+
+    :param agent: The agent with its tools.
+    :param user_query: The user's query to be processed by the agent.
+    :param llm_provider: The planner LLM; the process-wide provider by default.
+    :param tool_registry: Executes tools given by name; the process-wide registry by default.
+    :param budget: Step, token and time limits; AgentBudget defaults when None.
+    :param tool_memo: Cross-run memo of tool outputs; the process-wide memo by default.
+    :param on_event: Receives an AgentEvent for every planner token, thought, tool call,
+        tool result and the final answer, as they happen.
+    :return: The completed run, with its steps and final answer.
+    :raises AgentServiceError: If the agent or user query is invalid.
+    :raises AgentBudgetExceededError: If the budget runs out before a final answer.
+    """
+    _validate_query(agent, user_query)
+    llm = llm_provider or get_llm_provider()
+    registry = tool_registry or get_tool_registry()
+    budget = budget or AgentBudget()
+    shared_memo = tool_memo if tool_memo is not None else get_tool_memo()
+    loop = asyncio.get_running_loop()
+    deadline = None if budget.deadline_seconds is None else loop.time() + budget.deadline_seconds
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - loop.time()
+
+    def stop(reason: str) -> AgentBudgetExceededError:
+        run.stop_reason = reason
+        logger.warning("Agent stopped: %s", reason)
+        return AgentBudgetExceededError(f"Agent did not reach a final answer: {reason}", run)
+
+    def emit(event: str, step: int, **data: Any) -> None:
+        if on_event is not None:
+            on_event(AgentEvent(event=event, step=step, data=data))
+
+    run = AgentRun(user_query)
+    query_tokens = count_tokens(user_query)
+    for step in range(budget.max_steps):
+        with span("agent.step", **{"agent.name": agent.name, "agent.step": step}):
+            # Checked before rendering: the prompt's static text is counted once per agent.
+            prompt_tokens = agent.prompt.static_tokens + query_tokens + run.scratchpad_tokens
+            if budget.max_tokens is not None and run.tokens_used + prompt_tokens > budget.max_tokens:
+                raise stop(f"token budget of {budget.max_tokens} exhausted")
+            if deadline is not None and remaining() <= 0:
+                raise stop(f"deadline of {budget.deadline_seconds}s exceeded")
+            prompt = agent.render_prompt(user_query, run.scratchpad)
+            callbacks = [_PlannerTokenHandler(functools.partial(emit, "token", step))] if on_event else None
+            try:
+                with span("llm.call", **{"agent.step": step}):
+                    text = await asyncio.wait_for(
+                        llm.apredict(prompt, stop=[_OBSERVATION_STOP], callbacks=callbacks), remaining()
+                    )
+            except asyncio.TimeoutError:
+                raise stop(f"deadline of {budget.deadline_seconds}s exceeded") from None
+            completion_tokens = count_tokens(text)
+            run.tokens_used += prompt_tokens + completion_tokens
+            record_llm_tokens("agent", prompt_tokens, completion_tokens)
+            emit("thought", step, text=text)
+
+            calls, final_answer = parse_agent_output(text)
+            if final_answer is not None or not calls:
+                # A final answer ends the run at once, even if the same reply also planned tool calls.
+                run.record(AgentStep(thought=text))
+                run.final_answer = final_answer if final_answer is not None else text.strip()
+                emit("final_answer", step, answer=run.final_answer, tokens_used=run.tokens_used)
+                logger.debug("Agent answered after %d step(s).", step + 1)
+                return run
+
+            def report(index: int, result: ToolResult, step: int = step) -> None:
+                emit("tool_result", step, index=index, **result.dict())
+
+            for index, call in enumerate(calls):
+                emit("tool_call", step, index=index, **call.dict())
+            step_timeout = (
+                budget.step_timeout if deadline is None else max(0.0, min(budget.step_timeout, remaining()))
+            )
+            results = await run_tool_calls(
+                calls, agent.tools, registry, step_timeout, run.tool_memo, shared_memo,
+                on_result=report if on_event else None,
+            )
+            run.record(AgentStep(thought=text, tool_calls=calls, tool_results=results))
+
+    raise stop(f"step limit of {budget.max_steps} reached")
+
+
+def astream_agent(
+    agent: Agent,
+    user_query: str,
+    llm_provider: Optional[Any] = None,
+    tool_registry: Optional[ToolRegistry] = None,
+    budget: Optional[AgentBudget] = None,
+    tool_memo: Optional[CacheBackend] = None,
+) -> AsyncGenerator[AgentEvent, None]:
+    """
+    Runs the agent loop and yields its events as they happen. Failures,
+    including an exhausted budget, end the stream with an "error" event.
+
+    The input is validated when this is called, before anything runs, so
+    callers can reject a bad query without starting the agent. Closing the
+    returned generator early (aclose) cancels the run.
+
+    :param agent: The agent with its tools.
+    :param user_query: The user's query to be processed by the agent.
+    :return: An async generator of AgentEvent.
+    :raises AgentServiceError: If the agent or user query is invalid.
+    """
+    _validate_query(agent, user_query)
+    return _stream_agent_events(agent, user_query, llm_provider, tool_registry, budget, tool_memo)
+
+
+async def _stream_agent_events(
+    agent: Agent,
+    user_query: str,
+    llm_provider: Optional[Any],
+    tool_registry: Optional[ToolRegistry],
+    budget: Optional[AgentBudget],
+    tool_memo: Optional[CacheBackend],
+) -> AsyncGenerator[AgentEvent, None]:
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    async def _run() -> AgentRun:
+        try:
+            return await arun_agent(agent, user_query, llm_provider, tool_registry, budget, tool_memo,
+                                    on_event=queue.put_nowait)
+        finally:
+            queue.put_nowait(_STREAM_END)
 
-    logger.debug(f"Agent response generated: {response}")
-    return response
\ No newline at end of file
+    task = asyncio.ensure_future(_run())
+    try:
+        while True:
+            event = await queue.get()
+            if event is _STREAM_END:
+                break
+            yield event
+        try:
+            await task
+        except Exception as e:
+            logger.error("Agent run failed while streaming: %s", e)
+            run = getattr(e, "run", None)
+            yield AgentEvent(
+                event="error",
+                step=len(run.steps) if run is not None else 0,
+                data={"detail": str(e), "stop_reason": run.stop_reason if run is not None else None},
+            )
+    finally:
+        if not task.done():
+            task.cancel()
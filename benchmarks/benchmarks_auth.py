@@ -0,0 +1,168 @@
+"""
+Benchmark of per-request JWT authentication overhead, with and without the
+verified-token cache.
+
+Two measurements:
+
+- verify: the cost of one verification call, full decode versus cache lookup,
+  over a pool of distinct tokens reused round-robin like returning clients.
+- requests: latency of GET /tools through the app with authentication off,
+  on without the cache, and on with the cache; the overhead is the difference
+  from the unauthenticated run.
+
+    python -m benchmarks.benchmarks_auth --tokens 100 --requests 2000 --output auth.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from benchmarks.benchmarks_load import Scenario, run_scenario
+from main import create_app
+from utils.auth import (
+    KeyRing,
+    VerifiedTokenCache,
+    create_jwt,
+    decode_jwt,
+    get_key_ring,
+    get_token_cache,
+    set_key_ring,
+    set_token_cache,
+    verify_jwt,
+)
+
+RESULTS_VERSION = 1
+AUTH_MODES = ("none", "uncached", "cached")
+DEFAULT_TOKENS = 100
+DEFAULT_ITERATIONS = 20_000
+DEFAULT_REQUESTS = 1000
+
+
+def make_tokens(count: int, key_ring: KeyRing) -> List[str]:
+    """
+    Issues one token per simulated user.
+    """
+    return [create_jwt(f"user-{i}", key_ring) for i in range(count)]
+
+
+def measure_verify(tokens: Sequence[str], iterations: int, key_ring: KeyRing, cached: bool) -> Dict[str, Any]:
+    """
+    Times individual verification calls.
+
+    :param tokens: Tokens verified round-robin.
+    :param iterations: Number of timed calls.
+    :param key_ring: The keys the tokens were signed with.
+    :param cached: Verify through a fresh VerifiedTokenCache instead of decoding every time.
+    :return: Per-call latency percentiles in microseconds and calls per second.
+    """
+    cache = VerifiedTokenCache(max_size=max(len(tokens), 1)) if cached else None
+    samples = np.empty(iterations, dtype=np.float64)
+    clock = time.perf_counter_ns
+    started = clock()
+    for i in range(iterations):
+        token = tokens[i % len(tokens)]
+        start = clock()
+        if cache is None:
+            decode_jwt(token, key_ring)
+        else:
+            verify_jwt(token, key_ring, cache)
+        samples[i] = clock() - start
+    wall_ns = clock() - started
+    samples /= 1000.0
+    p50, p99 = np.percentile(samples, [50, 99])
+    return {
+        "mode": "cached" if cached else "uncached",
+        "calls": iterations,
+        "calls_per_second": round(iterations / (wall_ns / 1e9), 1),
+        "latency_us": {
+            "p50": round(float(p50), 3), "p99": round(float(p99), 3), "mean": round(float(samples.mean()), 3),
+        },
+    }
+
+
+async def measure_requests(
+    tokens: Sequence[str], key_ring: KeyRing, requests: int, concurrency: int
+) -> List[Dict[str, Any]]:
+    """
+    Times GET /tools with authentication off, on without the cache and on with it.
+
+    :param tokens: Bearer tokens sent round-robin.
+    :param key_ring: The keys the tokens were signed with.
+    :param requests: Measured requests per mode.
+    :param concurrency: Concurrent clients.
+    :return: One load result per mode, each with its p50 overhead over the unauthenticated run.
+    """
+    previous_key_ring, previous_cache = get_key_ring(), get_token_cache()
+    results = []
+    baseline_p50: Optional[float] = None
+    for mode in AUTH_MODES:
+        app = create_app(auth=mode != "none")
+        set_key_ring(key_ring)
+        set_token_cache(VerifiedTokenCache(max_size=max(len(tokens), 1)) if mode == "cached" else None)
+        scenario = Scenario(
+            f"auth.{mode}", "GET", "/tools",
+            lambda i: {"headers": {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}},
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            result = await run_scenario(client, scenario, concurrency, requests, warmup=max(len(tokens), 200))
+        set_key_ring(previous_key_ring)
+        set_token_cache(previous_cache)
+        result["auth"] = mode
+        p50 = result["latency_ms"]["p50"]
+        if baseline_p50 is None:
+            baseline_p50 = p50
+        result["overhead_us"] = round((p50 - baseline_p50) * 1000.0, 1)
+        results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Command-line entry point: runs both measurements, prints them and writes the JSON results.
+    """
+    parser = argparse.ArgumentParser(description="Measure JWT authentication overhead with and without the cache.")
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS, help="Distinct tokens (simulated users).")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed verification calls.")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Measured requests per mode.")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--output", help="Where to write the JSON results.")
+    args = parser.parse_args(argv)
+
+    key_ring = KeyRing({"bench": "benchmark-secret-of-at-least-32-bytes"}, "bench")
+    tokens = make_tokens(args.tokens, key_ring)
+    verify = [measure_verify(tokens, args.iterations, key_ring, cached) for cached in (False, True)]
+    requests = asyncio.run(measure_requests(tokens, key_ring, args.requests, args.concurrency))
+
+    for result in verify:
+        latency = result["latency_us"]
+        print(f"verify {result['mode']:<9} p50 {latency['p50']:8.2f} us  p99 {latency['p99']:8.2f} us  "
+              f"{result['calls_per_second']:12.1f} calls/s")
+    for result in requests:
+        latency = result["latency_ms"]
+        print(f"request auth={result['auth']:<9} p50 {latency['p50']:8.3f} ms  p95 {latency['p95']:8.3f} ms  "
+              f"rps {result['rps']:9.1f}  overhead {result['overhead_us']:8.1f} us  errors {result['errors']}")
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "verify": verify,
+        "requests": requests,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Load-test benchmark for the API, driven in-process through an ASGI client.
+
+Every scenario hits one endpoint of create_app() at fixed concurrency levels,
+with the LLM replaced by a MockLLM so results depend on the service code and
+the simulated latency profile rather than on a remote provider. Results are
+written as JSON so runs can be compared:
+
+    python -m benchmarks.benchmarks_load --concurrency 1 8 32 --requests 200 --output after.json
+    python -m benchmarks.benchmarks_load --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from chains.chains_cache import get_response_cache
+from chains.chains_llm import LATENCY_DISTRIBUTIONS, MockLLM, get_llm_provider
+from main import create_app
+
+RESULTS_VERSION = 1
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_REQUESTS = 200
+
+RequestFactory = Callable[[int], Dict[str, Any]]
+
+
+class Scenario:
+    """
+    One endpoint under load: the request to send for the i-th call.
+    """
+
+    __slots__ = ("name", "method", "path", "build")
+
+    def __init__(self, name: str, method: str, path: str, build: Optional[RequestFactory] = None) -> None:
+        self.name = name
+        self.method = method
+        self.path = path
+        self.build = build or (lambda i: {})
+
+
+# Inputs vary per call so the response cache and request coalescing do not hide the work.
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("chains.generate", "POST", "/chains/generate",
+                 lambda i: {"json": {"user_input": f"Benchmark question {i}"}}),
+        Scenario("chains.generate_stream", "POST", "/chains/generate/stream",
+                 lambda i: {"json": {"user_input": f"Benchmark question {i}"}}),
+        Scenario("agents.query", "POST", "/agents/query",
+                 lambda i: {"json": {"user_query": f"What is {i} + {i}?"}}),
+        Scenario("tools.calculator", "POST", "/tools/call/calculator",
+                 lambda i: {"params": {"tool_input": f"{i} * 3 + sqrt(16)"}}),
+        Scenario("tools.search", "POST", "/tools/call/search",
+                 lambda i: {"params": {"tool_input": f"benchmark query {i % 50}"}}),
+    )
+}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak rather than the current size, in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def summarize(latencies: Sequence[float], errors: int, wall_seconds: float) -> Dict[str, Any]:
+    """
+    Reduces per-request latencies to the reported statistics.
+
+    :param latencies: Seconds per completed request, including failed ones.
+    :param errors: Number of requests that failed or returned a 4xx/5xx status.
+    :param wall_seconds: Wall-clock time of the whole run.
+    :return: Request counts, RPS and latency percentiles in milliseconds.
+    """
+    samples = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if samples.size:
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        latency = {"p50": p50, "p95": p95, "p99": p99, "mean": samples.mean(), "max": samples.max()}
+    else:
+        latency = {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "requests": int(samples.size),
+        "errors": errors,
+        "rps": samples.size / wall_seconds if wall_seconds > 0 else 0.0,
+        "latency_ms": {key: round(float(value), 3) for key, value in latency.items()},
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, concurrency: int, requests: int, warmup: int = 5
+) -> Dict[str, Any]:
+    """
+    Sends requests to one endpoint with at most concurrency of them in flight.
+
+    :param client: A client bound to the app under test.
+    :param scenario: The endpoint and request factory.
+    :param concurrency: Number of concurrent workers.
+    :param requests: Number of measured requests.
+    :param warmup: Unmeasured requests sent first, so one-time setup is excluded.
+    :return: The summary of the run plus memory figures.
+    """
+    for i in range(warmup):
+        await client.request(scenario.method, scenario.path, **scenario.build(-1 - i))
+
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path, **scenario.build(index))
+                code = str(response.status_code)
+                failed = response.status_code >= 400
+            except Exception:
+                code, failed = "exception", True
+            latencies.append(time.perf_counter() - start)
+            status_codes[code] = status_codes.get(code, 0) + 1
+            errors += failed
+
+    rss_before = _rss_bytes()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - started
+
+    result = {"endpoint": scenario.name, "concurrency": concurrency, **summarize(latencies, errors, wall_seconds)}
+    result["status_codes"] = status_codes
+    rss_after = _rss_bytes()
+    result["rss_mb"] = round(rss_after / 2**20, 2)
+    result["rss_delta_mb"] = round((rss_after - rss_before) / 2**20, 2)
+    if tracemalloc.is_tracing():
+        result["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    return result
+
+
+async def run_benchmarks(
+    scenarios: Sequence[Scenario],
+    concurrency_levels: Sequence[int],
+    requests: int,
+    llm: MockLLM,
+    use_cache: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Runs every scenario at every concurrency level against a fresh app.
+
+    :param scenarios: The endpoints to load.
+    :param concurrency_levels: Concurrency levels to run each scenario at.
+    :param requests: Measured requests per scenario and level.
+    :param llm: The LLM injected into the app.
+    :param use_cache: Keep the configured response cache instead of disabling it.
+    :return: One result per (scenario, concurrency level), in run order.
+    """
+    app = create_app()
+    app.dependency_overrides[get_llm_provider] = lambda: llm
+    if not use_cache:
+        app.dependency_overrides[get_response_cache] = lambda: None
+
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for scenario in scenarios:
+            for concurrency in concurrency_levels:
+                results.append(await run_scenario(client, scenario, concurrency, requests))
+    return results
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> List[str]:
+    """
+    Formats the change in p95 latency and RPS for runs present in both result sets.
+    """
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline}
+    lines = []
+    for result in current:
+        before = previous.get((result["endpoint"], result["concurrency"]))
+        if before is None:
+            continue
+        p95_before, p95_after = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        rps_before, rps_after = before["rps"], result["rps"]
+        lines.append(
+            f"{result['endpoint']:<24} c={result['concurrency']:<4} "
+            f"p95 {p95_before:9.2f} -> {p95_after:9.2f} ms ({_change(p95_before, p95_after)})  "
+            f"rps {rps_before:9.1f} -> {rps_after:9.1f} ({_change(rps_before, rps_after)})"
+        )
+    return lines
+
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{result['endpoint']:<24} c={result['concurrency']:<4} "
+        f"p50 {latency['p50']:8.2f}  p95 {latency['p95']:8.2f}  p99 {latency['p99']:8.2f} ms  "
+        f"rps {result['rps']:9.1f}  errors {result['errors']:<5} rss {result['rss_mb']:.1f} MB"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Command-line entry point: runs the benchmarks, prints a table and writes the JSON results.
+    """
+    parser = argparse.ArgumentParser(description="Load-test the API endpoints in-process.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Measured requests per run.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock LLM seconds to first token.")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.5, help="Uniform half-width or lognormal sigma.")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled.")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report peak Python allocations.")
+    parser.add_argument("--output", help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="A previous results file to compare against.")
+    args = parser.parse_args(argv)
+
+    llm = MockLLM(
+        # Concurrent requests draw from one response cycle, so every response must end an agent run.
+        responses=["Final Answer: The answer is 4."],
+        latency=args.latency,
+        latency_distribution=args.distribution,
+        latency_spread=args.spread,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    if args.trace_memory:
+        tracemalloc.start()
+    results = asyncio.run(run_benchmarks(
+        [SCENARIOS[name] for name in args.scenarios], args.concurrency, args.requests, llm, use_cache=args.cache
+    ))
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    for result in results:
+        print(_format_result(result))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        print("\nCompared with", args.compare)
+        for line in compare(results, baseline):
+            print(line)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
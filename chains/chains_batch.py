@@ -0,0 +1,105 @@
+"""Runs chain requests through the compiled chains: singly, with caching and request coalescing, or as a bounded-concurrency batch."""
+
+import asyncio
+import logging
+import os
+from typing import Any, List, Optional
+
+from chains.chains_cache import ResponseCache, make_cache_key
+from chains.chains_models import ChainRequest, ChainResponse
+from chains.chains_prompt import count_tokens
+from chains.chains_registry import ChainNotFoundError, ChainRegistry, llm_config_key
+from metrics.metrics_service import record_llm_tokens
+from utils.singleflight import SingleFlight
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_CONCURRENCY: int = int(os.getenv("CHAIN_BATCH_CONCURRENCY", "8"))
+
+chain_flight = SingleFlight()
+
+
+async def run_chain_request(
+    chain_name: str,
+    user_input: str,
+    llm_provider: Any,
+    registry: ChainRegistry,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    """
+    Runs one request through its registered chain.
+
+    The response cache is consulted first. On a miss, concurrent requests with
+    the same chain, normalized input and LLM configuration share a single chain
+    call, so a burst of identical prompts costs one LLM call; its result, or
+    its exception, is delivered to every caller.
+
+    :param chain_name: The registered chain to run.
+    :param user_input: The user input passed to the chain.
+    :param llm_provider: The LLM bound to the compiled chain.
+    :param registry: The registry holding compiled chains.
+    :param cache: Optional response cache consulted before and filled after the call.
+    :raises ChainNotFoundError: If the chain name is not registered.
+    :return: The chain output.
+    """
+    chain = registry.get_chain(chain_name, llm_provider)
+    llm_key = llm_config_key(llm_provider)
+    if cache is not None:
+        cached_output = cache.get(chain_name, user_input, llm_key)
+        if cached_output is not None:
+            return cached_output
+
+    async def call_chain() -> str:
+        with span("llm.call", **{"chain.name": chain_name}):
+            output = await chain.arun(user_input)
+        record_llm_tokens("chain", registry.prompt_token_count(chain_name, user_input), count_tokens(output))
+        if cache is not None:
+            cache.set(chain_name, user_input, llm_key, output)
+        return output
+
+    return await chain_flight.do(make_cache_key(chain_name, user_input, llm_key), call_chain)
+
+
+async def run_chain_batch(
+    requests: List[ChainRequest],
+    llm_provider: Any,
+    registry: ChainRegistry,
+    cache: Optional[ResponseCache] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[ChainResponse]:
+    """
+    Runs every request through its registered chain, at most max_concurrency at a time.
+
+    A failing item never fails the batch; it is reported through its own
+    ChainResponse with success=False and an error_message.
+
+    :param requests: The chain requests to run.
+    :param llm_provider: The LLM bound to the compiled chains.
+    :param registry: The registry holding compiled chains.
+    :param cache: Optional response cache consulted before and filled after each call.
+    :param max_concurrency: Upper bound on in-flight calls; defaults to CHAIN_BATCH_CONCURRENCY.
+    :raises ValueError: If max_concurrency is not positive.
+    :return: One ChainResponse per request, in input order.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_BATCH_CONCURRENCY
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive.")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(item: ChainRequest) -> ChainResponse:
+        async with semaphore:
+            try:
+                output = await run_chain_request(item.chain_name, item.user_input, llm_provider, registry, cache)
+                return ChainResponse(output=output)
+            except ChainNotFoundError:
+                return ChainResponse(
+                    output="", success=False, error_message=f"Unknown chain: {item.chain_name}"
+                )
+            except Exception as e:
+                logger.error("Error in batch item for chain '%s': %s", item.chain_name, e)
+                return ChainResponse(output="", success=False, error_message=str(e))
+
+    return list(await asyncio.gather(*(run_one(item) for item in requests)))
@@ -0,0 +1,459 @@
+"""Response cache for chain outputs: an exact-match tier over a pluggable backend plus an optional semantic tier."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from chains.chains_models import CacheStats
+from metrics.metrics_service import record_cache_lookup
+
+EmbeddingFunction = Callable[[str], Sequence[float]]
+
+
+def normalize_prompt(user_input: str) -> str:
+    """
+    Normalizes a prompt so trivially different spellings share a cache entry.
+
+    :param user_input: The raw user input.
+    :return: The input case-folded with whitespace collapsed.
+    """
+    return " ".join(user_input.split()).casefold()
+
+
+def make_cache_key(chain_name: str, user_input: str, llm_key: str) -> str:
+    """
+    Builds the exact-match cache key for a chain call.
+
+    :param chain_name: The registered chain name.
+    :param user_input: The raw user input; it is normalized before hashing.
+    :param llm_key: The LLM configuration key (see chains_registry.llm_config_key).
+    :return: A hex digest identifying the call.
+    """
+    raw = "\x1f".join((chain_name, llm_key, normalize_prompt(user_input)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface for the exact-match tier. Implementations must be thread-safe.
+    """
+
+    evictions: int = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the value stored under key, or None if it is missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """
+        Stores value under key, evicting older entries if the backend is full.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Returns the number of stored entries.
+        """
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    In-process LRU cache with an optional per-entry time-to-live.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None) -> None:
+        """
+        :param max_size: Maximum number of entries before least recently used ones are evicted.
+        :param ttl_seconds: Entry lifetime in seconds; entries never expire when None.
+        :raises ValueError: If max_size is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self._ttl is not None and time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        # Expired entries are purged first so the count matches what get() would serve.
+        with self._lock:
+            if self._ttl is not None:
+                cutoff = time.monotonic() - self._ttl
+                for key in [k for k, (_, stored_at) in self._entries.items() if stored_at < cutoff]:
+                    del self._entries[key]
+                    self.evictions += 1
+            return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Disk-backed cache stored in a SQLite file, shared by every process that opens it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 100_000,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        :param path: The SQLite database file (":memory:" for a private in-memory database).
+        :param max_size: Maximum number of rows before least recently used ones are evicted.
+        :param ttl_seconds: Entry lifetime in seconds; entries never expire when None.
+        :raises ValueError: If max_size is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chain_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_chain_cache_accessed_at ON chain_cache (accessed_at)"
+        )
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM chain_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._ttl is not None and now - created_at > self._ttl:
+                self._conn.execute("DELETE FROM chain_cache WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._conn.execute(
+                "UPDATE chain_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chain_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            overflow = self._count() - self._max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM chain_cache WHERE key IN ("
+                    "SELECT key FROM chain_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chain_cache")
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chain_cache").fetchone()[0]
+
+    def __len__(self) -> int:
+        # Counts only entries get() would still serve, like LRUCacheBackend.
+        with self._lock:
+            if self._ttl is None:
+                return self._count()
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chain_cache WHERE created_at >= ?", (time.time() - self._ttl,)
+            ).fetchone()[0]
+
+
+class _SemanticScope:
+    """
+    Embeddings of one scope in a float32 matrix used as a ring buffer: rows
+    are written at next_row, and once max_entries rows exist the oldest is
+    overwritten. The matrix doubles as it fills, up to max_entries rows.
+    """
+
+    __slots__ = ("matrix", "keys", "size", "next_row")
+
+    def __init__(self, dim: int) -> None:
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+        self.keys: List[Optional[str]] = [None] * 16
+        self.size = 0
+        self.next_row = 0
+
+    def add(self, vector: np.ndarray, key: str, max_entries: int) -> None:
+        if self.next_row == len(self.keys) and len(self.keys) < max_entries:
+            capacity = min(2 * len(self.keys), max_entries)
+            matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+            matrix[:self.size] = self.matrix[:self.size]
+            self.matrix = matrix
+            self.keys.extend([None] * (capacity - len(self.keys)))
+        row = self.next_row % max_entries
+        self.matrix[row] = vector
+        self.keys[row] = key
+        self.size = max(self.size, row + 1)
+        self.next_row = row + 1
+
+
+class SemanticIndex:
+    """
+    Embedding-similarity tier. Maps prompt embeddings to exact-match keys,
+    scoped by chain name and LLM config so answers never cross chains.
+    """
+
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction,
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+    ) -> None:
+        """
+        :param embedding_function: Maps text to a vector.
+        :param threshold: Minimum cosine similarity for a match.
+        :param max_entries: Entries kept per scope; oldest are dropped first.
+        """
+        self._embed = embedding_function
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._scopes: Dict[str, _SemanticScope] = {}
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.asarray(self._embed(normalize_prompt(text)), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, scope: str, user_input: str) -> Optional[str]:
+        """
+        Returns the exact-match key of the most similar stored prompt, if it clears the threshold.
+        """
+        if scope not in self._scopes:
+            return None
+        vector = self._vector(user_input)
+        # Scored under the lock: add() overwrites rows of the same matrix in place.
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is None or not entries.size:
+                return None
+            scores = entries.matrix[:entries.size] @ vector
+            best = int(np.argmax(scores))
+            key = entries.keys[best]
+        # Discarded rows are zeroed, so they only score best when nothing matches.
+        if key is not None and scores[best] >= self._threshold:
+            return key
+        return None
+
+    def add(self, scope: str, user_input: str, key: str) -> None:
+        """
+        Records the embedding of a prompt whose response is stored under key.
+        """
+        vector = self._vector(user_input)
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is None:
+                entries = self._scopes[scope] = _SemanticScope(len(vector))
+            entries.add(vector, key, self._max_entries)
+
+    def discard(self, scope: str, key: str) -> None:
+        """
+        Forgets every embedding pointing at a key that is no longer cached.
+        """
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is None:
+                return
+            for row, stored in enumerate(entries.keys):
+                if stored == key:
+                    entries.keys[row] = None
+                    entries.matrix[row] = 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scopes.clear()
+
+
+class ResponseCache:
+    """
+    Front door for cached chain outputs. Looks up the exact-match tier first,
+    then the semantic tier when one is configured.
+    """
+
+    def __init__(self, backend: CacheBackend, semantic_index: Optional[SemanticIndex] = None) -> None:
+        self.backend = backend
+        self.semantic_index = semantic_index
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+
+    def get(self, chain_name: str, user_input: str, llm_key: str) -> Optional[str]:
+        """
+        Returns a cached response for the call, or None on a miss.
+
+        :param chain_name: The registered chain name.
+        :param user_input: The raw user input.
+        :param llm_key: The LLM configuration key.
+        """
+        value = self.backend.get(make_cache_key(chain_name, user_input, llm_key))
+        if value is not None:
+            self._count(hit=True)
+            return value
+
+        if self.semantic_index is not None:
+            scope = f"{chain_name}\x1f{llm_key}"
+            similar_key = self.semantic_index.lookup(scope, user_input)
+            if similar_key is not None:
+                value = self.backend.get(similar_key)
+                if value is not None:
+                    self._count(hit=True, semantic=True)
+                    return value
+                self.semantic_index.discard(scope, similar_key)
+
+        self._count(hit=False)
+        return None
+
+    def set(self, chain_name: str, user_input: str, llm_key: str, response: str) -> None:
+        """
+        Stores a response for the call in every configured tier.
+        """
+        key = make_cache_key(chain_name, user_input, llm_key)
+        self.backend.set(key, response)
+        if self.semantic_index is not None:
+            self.semantic_index.add(f"{chain_name}\x1f{llm_key}", user_input, key)
+
+    def clear(self) -> None:
+        """
+        Drops every cached response and resets the counters.
+        """
+        self.backend.clear()
+        if self.semantic_index is not None:
+            self.semantic_index.clear()
+        with self._lock:
+            self._hits = self._semantic_hits = self._misses = 0
+        self.backend.evictions = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Returns hit/miss/eviction counters and the current size.
+        """
+        with self._lock:
+            hits, semantic_hits, misses = self._hits, self._semantic_hits, self._misses
+        lookups = hits + misses
+        return CacheStats(
+            hits=hits,
+            semantic_hits=semantic_hits,
+            misses=misses,
+            evictions=self.backend.evictions,
+            size=len(self.backend),
+            hit_rate=hits / lookups if lookups else 0.0,
+        )
+
+    def _count(self, hit: bool, semantic: bool = False) -> None:
+        record_cache_lookup("response", hit, semantic)
+        with self._lock:
+            if hit:
+                self._hits += 1
+                if semantic:
+                    self._semantic_hits += 1
+            else:
+                self._misses += 1
+
+
+def build_response_cache_from_env() -> Optional[ResponseCache]:
+    """
+    Builds a ResponseCache from environment variables.
+
+    CHAIN_CACHE_BACKEND selects "memory" (default), "sqlite" or "none".
+    CHAIN_CACHE_MAX_SIZE and CHAIN_CACHE_TTL bound the backend;
+    CHAIN_CACHE_SQLITE_PATH sets the SQLite file. Setting
+    CHAIN_CACHE_SEMANTIC_THRESHOLD enables the semantic tier.
+
+    :raises ValueError: If CHAIN_CACHE_BACKEND names an unknown backend.
+    :return: The configured cache, or None when caching is disabled.
+    """
+    backend_name = os.getenv("CHAIN_CACHE_BACKEND", "memory").lower()
+    max_size = int(os.getenv("CHAIN_CACHE_MAX_SIZE", "1024"))
+    ttl_env = os.getenv("CHAIN_CACHE_TTL")
+    ttl_seconds = float(ttl_env) if ttl_env else None
+
+    backend: CacheBackend
+    if backend_name == "none":
+        return None
+    if backend_name == "memory":
+        backend = LRUCacheBackend(max_size=max_size, ttl_seconds=ttl_seconds)
+    elif backend_name == "sqlite":
+        path = os.getenv("CHAIN_CACHE_SQLITE_PATH", "chain_cache.sqlite3")
+        backend = SQLiteCacheBackend(path, max_size=max_size, ttl_seconds=ttl_seconds)
+    else:
+        raise ValueError(f"Unknown chain cache backend: {backend_name}")
+
+    semantic_index = None
+    threshold = os.getenv("CHAIN_CACHE_SEMANTIC_THRESHOLD")
+    if threshold:
+        from utils.embeddings import hashing_embedding
+
+        semantic_index = SemanticIndex(hashing_embedding, threshold=float(threshold))
+
+    return ResponseCache(backend, semantic_index)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_loaded = False
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the process-wide response cache, for use as a FastAPI dependency.
+    """
+    global _response_cache, _response_cache_loaded
+    if not _response_cache_loaded:
+        _response_cache = build_response_cache_from_env()
+        _response_cache_loaded = True
+    return _response_cache
@@ -0,0 +1,250 @@
+"""LLM providers used by the chains module, including a deterministic fake for local runs and tests."""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, List, Mapping, Optional, Tuple
+
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain.llms.base import LLM
+from pydantic import PrivateAttr
+
+from chains.chains_prompt import split_tokens
+from chains.chains_registry import chain_registry
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_llm_provider: Optional[Any] = None
+
+
+class FakeStreamingLLM(LLM):
+    """
+    Deterministic LLM that cycles through canned responses and reports
+    each token to the callback manager as it is produced.
+    """
+
+    responses: List[str] = ["This is a fake response."]
+    token_delay: float = 0.0
+    i: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        """Return type of llm."""
+        return "fake-streaming"
+
+    def _next_response(self) -> str:
+        response = self.responses[self.i]
+        self.i = (self.i + 1) % len(self.responses)
+        return response
+
+    def _token_interval(self) -> float:
+        return self.token_delay
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Return the next response, emitting it token by token."""
+        response = self._next_response()
+        interval = self._token_interval()
+        for token in split_tokens(response):
+            if interval:
+                time.sleep(interval)
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+        return response
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Return the next response, emitting it token by token."""
+        response = self._next_response()
+        interval = self._token_interval()
+        for token in split_tokens(response):
+            if interval:
+                await asyncio.sleep(interval)
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+        return response
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        return {"responses": self.responses, "token_delay": self.token_delay}
+
+
+class MockLLMError(RuntimeError):
+    """
+    Raised by MockLLM for calls selected by failure injection.
+    """
+    pass
+
+
+class MockLLM(FakeStreamingLLM):
+    """
+    FakeStreamingLLM with a simulated serving profile, for load tests and benchmarks.
+
+    Each call first waits a time-to-first-token drawn from latency_distribution,
+    then streams its response at tokens_per_second. A failure_rate fraction of
+    calls raise MockLLMError after the wait instead. All draws come from a
+    Random seeded with seed, so the same sequence of calls always sees the same
+    latencies and failures.
+    """
+
+    latency: float = 0.0
+    latency_distribution: str = "fixed"
+    latency_spread: float = 0.0
+    tokens_per_second: Optional[float] = None
+    failure_rate: float = 0.0
+    seed: int = 0
+    _rng: random.Random = PrivateAttr()
+
+    def __init__(self, **data: Any) -> None:
+        """
+        :param latency: Seconds to first token: the exact value for "fixed", the centre
+            for "uniform", the mean for "exponential" and the median for "lognormal".
+        :param latency_distribution: One of LATENCY_DISTRIBUTIONS.
+        :param latency_spread: Half-width in seconds for "uniform", sigma for "lognormal".
+        :param tokens_per_second: Streaming rate; falls back to token_delay when None.
+        :param failure_rate: Fraction of calls that raise MockLLMError.
+        :param seed: Seed of the latency and failure draws.
+        :raises ValueError: If a setting is out of range.
+        """
+        super().__init__(**data)
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        if self.latency < 0 or self.latency_spread < 0:
+            raise ValueError("latency and latency_spread cannot be negative.")
+        if not 0.0 <= self.failure_rate <= 1.0:
+            raise ValueError("failure_rate must be between 0 and 1.")
+        if self.tokens_per_second is not None and self.tokens_per_second <= 0:
+            raise ValueError("tokens_per_second must be positive.")
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        """Return type of llm."""
+        return "mock"
+
+    def _token_interval(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else self.token_delay
+
+    def _draw(self) -> Tuple[float, bool]:
+        if self.latency_distribution == "uniform":
+            delay = self._rng.uniform(self.latency - self.latency_spread, self.latency + self.latency_spread)
+        elif self.latency_distribution == "exponential":
+            delay = self._rng.expovariate(1.0 / self.latency) if self.latency else 0.0
+        elif self.latency_distribution == "lognormal":
+            delay = self._rng.lognormvariate(0.0, self.latency_spread) * self.latency
+        else:
+            delay = self.latency
+        return max(0.0, delay), self._rng.random() < self.failure_rate
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Wait for the simulated first token, then stream the next response or fail."""
+        delay, fail = self._draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise MockLLMError("Injected LLM failure.")
+        return super()._call(prompt, stop, run_manager, **kwargs)
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Wait for the simulated first token, then stream the next response or fail."""
+        delay, fail = self._draw()
+        if delay:
+            await asyncio.sleep(delay)
+        if fail:
+            raise MockLLMError("Injected LLM failure.")
+        return await super()._acall(prompt, stop, run_manager, **kwargs)
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        return {
+            **super()._identifying_params,
+            "latency": self.latency,
+            "latency_distribution": self.latency_distribution,
+            "latency_spread": self.latency_spread,
+            "tokens_per_second": self.tokens_per_second,
+            "failure_rate": self.failure_rate,
+            "seed": self.seed,
+        }
+
+
+def build_mock_llm_from_env() -> MockLLM:
+    """
+    Builds a MockLLM from environment variables.
+
+    MOCK_LLM_LATENCY, MOCK_LLM_LATENCY_DISTRIBUTION, MOCK_LLM_LATENCY_SPREAD,
+    MOCK_LLM_TOKENS_PER_SECOND, MOCK_LLM_FAILURE_RATE and MOCK_LLM_SEED map to
+    the MockLLM settings of the same name.
+
+    :raises ValueError: If a setting is out of range.
+    :return: The configured mock provider.
+    """
+    tokens_per_second = os.getenv("MOCK_LLM_TOKENS_PER_SECOND")
+    return MockLLM(
+        latency=float(os.getenv("MOCK_LLM_LATENCY", "0")),
+        latency_distribution=os.getenv("MOCK_LLM_LATENCY_DISTRIBUTION", "fixed").lower(),
+        latency_spread=float(os.getenv("MOCK_LLM_LATENCY_SPREAD", "0")),
+        tokens_per_second=float(tokens_per_second) if tokens_per_second else None,
+        failure_rate=float(os.getenv("MOCK_LLM_FAILURE_RATE", "0")),
+        seed=int(os.getenv("MOCK_LLM_SEED", "0")),
+    )
+
+
+def get_llm_provider() -> Any:
+    """
+    Returns the process-wide LLM provider selected by the LLM_PROVIDER environment variable.
+
+    Supported values are "fake" (default), "mock" (see build_mock_llm_from_env) and "openai".
+
+    :raises ValueError: If LLM_PROVIDER names an unknown provider.
+    :return: A LangChain LLM instance.
+    """
+    global _llm_provider
+    if _llm_provider is None:
+        provider_name = os.getenv("LLM_PROVIDER", "fake").lower()
+        if provider_name == "fake":
+            _llm_provider = FakeStreamingLLM()
+        elif provider_name == "mock":
+            _llm_provider = build_mock_llm_from_env()
+        elif provider_name == "openai":
+            from langchain.llms import OpenAI
+
+            _llm_provider = OpenAI(streaming=True)
+        else:
+            raise ValueError(f"Unknown LLM provider: {provider_name}")
+    return _llm_provider
+
+
+def reset_llm_provider() -> None:
+    """
+    Forgets the cached provider so the next call re-reads LLM_PROVIDER,
+    and drops any chains compiled against the old configuration.
+    """
+    global _llm_provider
+    _llm_provider = None
+    chain_registry.invalidate()
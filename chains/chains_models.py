@@ -1,10 +1,12 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, validator
 
 """
 Pydantic models for request/response data related to chain usage.
 """
 
+MAX_BATCH_SIZE = 1000
+
 
 class ChainRequest(BaseModel):
     """
@@ -39,4 +41,64 @@ class ChainResponse(BaseModel):
     output: str = Field(..., description="The chain's response or result.")
     success: bool = Field(True, description="Indicates if the chain execution was successful.")
     error_message: Optional[str] = Field(None, description="Contains an error message if chain execution fails.")
-    # TODO: Extend with additional fields or nested models as needed
\ No newline at end of file
+    # TODO: Extend with additional fields or nested models as needed
+
+
+class ChainBatchRequest(BaseModel):
+    """
+    Model for a batch of chain requests dispatched concurrently.
+    """
+
+    items: List[ChainRequest] = Field(..., description="The chain requests to run, in order.")
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, le=64, description="Upper bound on in-flight LLM calls; defaults to the server setting."
+    )
+
+    @validator("items")
+    def validate_items(cls, value: List[ChainRequest]) -> List[ChainRequest]:
+        """
+        Validate that the batch is non-empty and within the size limit.
+
+        Raises:
+            ValueError: If the batch is empty or too large.
+
+        Returns:
+            List[ChainRequest]: The validated items.
+        """
+        if not value:
+            raise ValueError("Batch cannot be empty.")
+        if len(value) > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch cannot contain more than {MAX_BATCH_SIZE} items.")
+        return value
+
+
+class ChainBatchResponse(BaseModel):
+    """
+    Model for per-item batch results, in the same order as the request items.
+    """
+
+    results: List[ChainResponse] = Field(..., description="One response per request item.")
+
+
+class StreamMetrics(BaseModel):
+    """
+    Model for timing information collected while streaming a chain's output.
+    """
+
+    token_count: int = Field(0, description="Number of tokens emitted by the chain.")
+    time_to_first_token: Optional[float] = Field(None, description="Seconds until the first token was emitted.")
+    total_time: float = Field(0.0, description="Seconds spent generating the full output.")
+    tokens_per_second: float = Field(0.0, description="Token throughput over the whole generation.")
+
+
+class CacheStats(BaseModel):
+    """
+    Model for response cache counters, used to size the cache.
+    """
+
+    hits: int = Field(0, description="Lookups answered from the cache, including semantic hits.")
+    semantic_hits: int = Field(0, description="Lookups answered by the embedding-similarity tier.")
+    misses: int = Field(0, description="Lookups that had to call the LLM.")
+    evictions: int = Field(0, description="Entries dropped because of size limits or expiry.")
+    size: int = Field(0, description="Entries currently stored in the exact-match tier.")
+    hit_rate: float = Field(0.0, description="hits / (hits + misses).")
@@ -0,0 +1,213 @@
+"""Prompt templates compiled once into literal segments and slots, with the literal segments' token counts cached."""
+
+import re
+import string
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from langchain.prompts import PromptTemplate
+from pydantic import PrivateAttr
+
+from utils.tracing import traced
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+_CONVERSIONS = {"s": str, "r": repr, "a": ascii}
+
+PROMPT_CACHE_SIZE = 256
+
+TokenCounter = Callable[[str], int]
+
+
+def split_tokens(text: str) -> List[str]:
+    """
+    Splits text into whitespace-preserving pseudo tokens.
+
+    :param text: The text to split.
+    :return: A list of tokens that join back into the original text.
+    """
+    return _TOKEN_PATTERN.findall(text)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Returns the number of pseudo tokens split_tokens would produce for text.
+
+    :param text: The text to measure.
+    :return: The token count.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class CompiledPrompt:
+    """
+    An f-string style template parsed once into a list of literal segments
+    with the slots between them.
+
+    Formatting copies the segment list and fills the slots, without re-parsing
+    the template. The literal segments are counted once, so a prompt's token
+    count costs only the counting of its variable parts. Because counting is
+    per segment, a token that straddles a segment boundary is counted on both
+    sides, so the count is an upper bound: at most one token high per segment
+    boundary, which is safe for budget checks.
+    """
+
+    __slots__ = ("template", "input_variables", "static_tokens", "_parts", "_slots", "_count")
+
+    def __init__(self, template: str, token_counter: TokenCounter = count_tokens) -> None:
+        """
+        Parses and compiles a template.
+
+        :param template: The template, e.g. "Question: {user_input}". Literal braces are doubled.
+        :param token_counter: Counts the tokens of a piece of text.
+        :raises ValueError: If the template is malformed or a field uses attribute or index access.
+        """
+        parts: List[str] = []
+        slots: List[Tuple[int, str, Optional[str], str]] = []
+        after_literal = False
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            if literal:
+                # Escaped braces split a literal in two; keep it one segment so it is counted as one.
+                if after_literal:
+                    parts[-1] += literal
+                else:
+                    parts.append(literal)
+                after_literal = True
+            if field is None:
+                continue
+            after_literal = False
+            if not field.isidentifier():
+                raise ValueError(f"Unsupported template field: {{{field}}}")
+            if "{" in (format_spec or ""):
+                raise ValueError(f"Nested fields are not supported: {{{field}:{format_spec}}}")
+            slots.append((len(parts), field, conversion, format_spec or ""))
+            parts.append("")
+
+        self.template = template
+        self.input_variables: List[str] = list(dict.fromkeys(name for _, name, _, _ in slots))
+        slot_indexes = {index for index, _, _, _ in slots}
+        self.static_tokens = sum(token_counter(part) for i, part in enumerate(parts) if i not in slot_indexes)
+        self._parts = parts
+        self._slots = slots
+        self._count = token_counter
+
+    @traced("prompt.format")
+    def format(self, **kwargs: Any) -> str:
+        """
+        Fills the slots with the given values.
+
+        :raises KeyError: If a template variable is missing.
+        """
+        parts = self._parts.copy()
+        for index, name, conversion, format_spec in self._slots:
+            parts[index] = self._render(kwargs[name], conversion, format_spec)
+        return "".join(parts)
+
+    def token_count(self, **kwargs: Any) -> int:
+        """
+        Returns the token count of the formatted prompt: the cached count of the
+        literal segments plus the counts of the given values.
+
+        :raises KeyError: If a template variable is missing.
+        """
+        return self.static_tokens + sum(
+            self._count(self._render(kwargs[name], conversion, format_spec))
+            for _, name, conversion, format_spec in self._slots
+        )
+
+    @traced("prompt.format")
+    def format_with_token_count(self, **kwargs: Any) -> Tuple[str, int]:
+        """
+        Formats the prompt and returns it with its token count, rendering each value once.
+
+        :raises KeyError: If a template variable is missing.
+        """
+        parts = self._parts.copy()
+        tokens = self.static_tokens
+        for index, name, conversion, format_spec in self._slots:
+            value = parts[index] = self._render(kwargs[name], conversion, format_spec)
+            tokens += self._count(value)
+        return "".join(parts), tokens
+
+    def partial(self, **values: Any) -> "CompiledPrompt":
+        """
+        Returns a new prompt with some variables fixed, so their text becomes
+        literal segments that are counted once.
+        """
+        pieces = [part.replace("{", "{{").replace("}", "}}") for part in self._parts]
+        for index, name, conversion, format_spec in self._slots:
+            if name in values:
+                rendered = self._render(values[name], conversion, format_spec)
+                pieces[index] = rendered.replace("{", "{{").replace("}", "}}")
+            else:
+                pieces[index] = "{" + name + (f"!{conversion}" if conversion else "") + (
+                    f":{format_spec}" if format_spec else "") + "}"
+        return CompiledPrompt("".join(pieces), self._count)
+
+    @staticmethod
+    def _render(value: Any, conversion: Optional[str], format_spec: str) -> str:
+        if conversion is None and not format_spec:
+            return value if isinstance(value, str) else str(value)
+        if conversion is not None:
+            value = _CONVERSIONS[conversion](value)
+        return format(value, format_spec)
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def compile_prompt(template: str) -> CompiledPrompt:
+    """
+    Returns the compiled form of a template, compiling each distinct template once.
+
+    :param template: The f-string style template.
+    :raises ValueError: If the template is malformed.
+    """
+    return CompiledPrompt(template)
+
+
+class CompiledPromptTemplate(PromptTemplate):
+    """
+    PromptTemplate that formats through a CompiledPrompt, so chains built from
+    it skip template parsing on every call and can report prompt token counts.
+    """
+
+    _compiled: CompiledPrompt = PrivateAttr()
+
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        if self.template_format != "f-string":
+            raise ValueError("Only f-string templates can be compiled.")
+        self._compiled = compile_prompt(self.template)
+
+    @property
+    def compiled(self) -> CompiledPrompt:
+        return self._compiled
+
+    def format(self, **kwargs: Any) -> str:
+        return self._compiled.format(**self._merge_partial_and_user_variables(**kwargs))
+
+    def token_count(self, **kwargs: Any) -> int:
+        """
+        Returns the token count of the formatted prompt without formatting it.
+        """
+        return self._compiled.token_count(**self._merge_partial_and_user_variables(**kwargs))
+
+
+def to_compiled_template(prompt: Any) -> CompiledPromptTemplate:
+    """
+    Converts a template string or f-string PromptTemplate into a CompiledPromptTemplate.
+
+    :param prompt: A template string, PromptTemplate or CompiledPromptTemplate.
+    :raises ValueError: If the prompt is not an f-string template.
+    :return: The compiled template.
+    """
+    if isinstance(prompt, CompiledPromptTemplate):
+        return prompt
+    if isinstance(prompt, str):
+        return CompiledPromptTemplate.from_template(prompt)
+    if isinstance(prompt, PromptTemplate):
+        return CompiledPromptTemplate(
+            input_variables=list(prompt.input_variables),
+            template=prompt.template,
+            template_format=prompt.template_format,
+            partial_variables=dict(prompt.partial_variables),
+        )
+    raise ValueError("Prompt must be a PromptTemplate or a template string.")
@@ -0,0 +1,173 @@
+"""Process-wide registry of compiled chains, so prompts are parsed and chains built once per chain name and LLM instance."""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.chains import LLMChain
+
+from chains.chains_prompt import CompiledPromptTemplate, to_compiled_template
+from chains.chains_service import SIMPLE_PROMPT, build_simple_chain
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHAIN_NAME = "simple"
+MAX_COMPILED_CHAINS = 256
+
+
+class ChainNotFoundError(KeyError):
+    """
+    Raised when a chain name has not been registered.
+    """
+    pass
+
+
+def llm_config_key(llm_provider: Any) -> str:
+    """
+    Returns a stable string describing an LLM's type and configuration.
+
+    Equal keys mean the models answer alike, which is what response caching
+    needs; they do not mean the instances are interchangeable, since settings
+    such as API keys, clients or a mock's response cursor are left out.
+
+    :param llm_provider: The language model provider.
+    :return: A JSON string built from the provider's identifying parameters.
+    """
+    params: Dict[str, Any] = {"type": type(llm_provider).__name__}
+    llm_type = getattr(llm_provider, "_llm_type", None)
+    if isinstance(llm_type, str):
+        params["llm_type"] = llm_type
+    identifying_params = getattr(llm_provider, "_identifying_params", None)
+    if isinstance(identifying_params, dict):
+        params.update(identifying_params)
+    else:
+        # Without identifying params the instance itself is the only safe key.
+        params["id"] = id(llm_provider)
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class ChainRegistry:
+    """
+    Holds prompt definitions by chain name and caches one compiled LLMChain
+    per (chain name, LLM instance). Compiled chains are stateless and shared
+    by all concurrent requests.
+
+    Chains are keyed by the LLM's id() rather than its configuration, so each
+    chain calls exactly the instance it was requested for. A cached chain holds
+    its LLM, so the id cannot be reused while the entry exists; at most
+    max_chains chains are kept, oldest dropped first.
+    """
+
+    def __init__(self, max_chains: int = MAX_COMPILED_CHAINS) -> None:
+        """
+        :param max_chains: Maximum number of compiled chains kept.
+        :raises ValueError: If max_chains is not positive.
+        """
+        if max_chains <= 0:
+            raise ValueError("max_chains must be positive.")
+        self._max_chains = max_chains
+        self._prompts: Dict[str, CompiledPromptTemplate] = {}
+        self._chains: Dict[Tuple[str, int], LLMChain] = {}
+        self._lock = threading.Lock()
+        self.register(DEFAULT_CHAIN_NAME, SIMPLE_PROMPT)
+
+    def register(self, chain_name: str, prompt: Any) -> None:
+        """
+        Registers (or replaces) the prompt used by a chain name.
+
+        Replacing a prompt invalidates every chain compiled from the old one.
+
+        :param chain_name: The name requests use to select the chain.
+        :param prompt: A PromptTemplate or a template string with a {user_input} slot;
+            it is compiled into a CompiledPromptTemplate.
+        :raises ValueError: If the name is empty, the prompt is not an f-string template,
+            or it does not take exactly user_input.
+        """
+        if not chain_name:
+            raise ValueError("Chain name cannot be empty.")
+        prompt = to_compiled_template(prompt)
+        if list(prompt.input_variables) != ["user_input"]:
+            raise ValueError("Chain prompts must take exactly one input variable: user_input.")
+
+        with self._lock:
+            self._prompts[chain_name] = prompt
+            self._drop(chain_name)
+
+    def chain_names(self) -> List[str]:
+        """
+        Returns the names of all registered chains.
+        """
+        return sorted(self._prompts)
+
+    def prompt_token_count(self, chain_name: str, user_input: str) -> int:
+        """
+        Returns the token count of a chain's prompt for an input without formatting it,
+        for budget checks before the chain runs.
+
+        :param chain_name: The registered chain name.
+        :param user_input: The user input the prompt would be filled with.
+        :raises ChainNotFoundError: If the chain name is not registered.
+        :return: The cached token count of the template text plus the count of user_input.
+        """
+        prompt = self._prompts.get(chain_name)
+        if prompt is None:
+            raise ChainNotFoundError(chain_name)
+        return prompt.token_count(user_input=user_input)
+
+    def get_chain(self, chain_name: str, llm_provider: Any) -> LLMChain:
+        """
+        Returns the compiled chain for a name and LLM, building it on first use.
+
+        :param chain_name: The registered chain name.
+        :param llm_provider: The language model provider to bind.
+        :raises ChainNotFoundError: If the chain name is not registered.
+        :raises ValueError: If llm_provider is None.
+        :return: A shared LLMChain instance.
+        """
+        key = (chain_name, id(llm_provider))
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                prompt = self._prompts.get(chain_name)
+                if prompt is None:
+                    raise ChainNotFoundError(chain_name)
+                chain = build_simple_chain(llm_provider, prompt=prompt)
+                self._chains[key] = chain
+                while len(self._chains) > self._max_chains:
+                    del self._chains[next(iter(self._chains))]
+                logger.debug("Compiled chain '%s'.", chain_name)
+        return chain
+
+    def invalidate(self, chain_name: Optional[str] = None) -> None:
+        """
+        Drops compiled chains so they are rebuilt on next use.
+
+        :param chain_name: Only drop chains with this name; drops everything when None.
+        """
+        with self._lock:
+            self._drop(chain_name)
+
+    def _drop(self, chain_name: Optional[str]) -> None:
+        if chain_name is None:
+            self._chains.clear()
+            return
+        for key in [key for key in self._chains if key[0] == chain_name]:
+            del self._chains[key]
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+
+chain_registry = ChainRegistry()
+
+
+def get_chain_registry() -> ChainRegistry:
+    """
+    Returns the process-wide chain registry, for use as a FastAPI dependency.
+    """
+    return chain_registry
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict
+from typing import Any, AsyncIterator, Dict, Optional
+import json
 import logging
 
+from chains.chains_batch import run_chain_batch, run_chain_request
+from chains.chains_cache import ResponseCache, get_response_cache
+from chains.chains_llm import get_llm_provider
+from chains.chains_models import CacheStats, ChainBatchRequest, ChainBatchResponse
+from chains.chains_registry import (
+    DEFAULT_CHAIN_NAME,
+    ChainNotFoundError,
+    ChainRegistry,
+    get_chain_registry,
+)
+from chains.chains_service import ChainTokenStream
+from jobs.jobs_router import job_accepted_response
+from jobs.jobs_service import JobQueue, get_job_queue
+from metrics.metrics_service import record_llm_tokens
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -13,28 +30,162 @@ router = APIRouter(
 
 class GenerateTextRequest(BaseModel):
     """
-    Request model containing the user input.
+    Request model containing the user input and the registered chain to run.
     """
     user_input: str
+    chain_name: str = DEFAULT_CHAIN_NAME
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Serializes a single server-sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chain_not_found(chain_name: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Unknown chain: {chain_name}"
+    )
 
 
 @router.post("/generate", response_model=Dict[str, str])
-def generate_text_endpoint(request_data: GenerateTextRequest) -> Dict[str, str]:
+async def generate_text_endpoint(
+    request_data: GenerateTextRequest,
+    llm_provider: Any = Depends(get_llm_provider),
+    registry: ChainRegistry = Depends(get_chain_registry),
+    cache: Optional[ResponseCache] = Depends(get_response_cache),
+    run_async: bool = Query(False, alias="async"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> Dict[str, str]:
     """
     Accepts user input, passes it to a chain, and returns the LLM-generated output.
 
+    Responses are served from the response cache when an identical (or, with the
+    semantic tier enabled, similar enough) prompt was already answered, and
+    concurrent identical requests share one chain call. With async=true the
+    request is enqueued as a background job instead, and the response is 202
+    with the job id to poll or stream under /jobs.
+
     :param request_data: The request model containing user input.
+    :param llm_provider: The LLM used to build the chain.
+    :param registry: The registry holding compiled chains.
+    :param cache: The response cache, or None when caching is disabled.
+    :param run_async: Enqueue the request as a background job.
+    :param job_queue: The queue background jobs are submitted to.
     :return: A dictionary containing the generated text.
     """
+    if run_async:
+        if request_data.chain_name not in registry.chain_names():
+            raise _chain_not_found(request_data.chain_name)
+        job = job_queue.submit(
+            "chain_generate",
+            request_data.dict(),
+            context={"llm_provider": llm_provider, "registry": registry, "cache": cache},
+        )
+        return job_accepted_response(job)
     try:
-        # TODO: Implement chain logic here (e.g., call an external LLM service or local chain function)
-        # Placeholder for chain output
-        chain_output = f"Echo: {request_data.user_input}"
-
+        chain_output = await run_chain_request(
+            request_data.chain_name, request_data.user_input, llm_provider, registry, cache
+        )
         return {"generated_text": chain_output}
+    except ChainNotFoundError:
+        raise _chain_not_found(request_data.chain_name)
     except Exception as e:
         logger.error("Error in generate_text_endpoint: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while generating text."
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/generate_batch", response_model=ChainBatchResponse)
+async def generate_batch_endpoint(
+    request_data: ChainBatchRequest,
+    llm_provider: Any = Depends(get_llm_provider),
+    registry: ChainRegistry = Depends(get_chain_registry),
+    cache: Optional[ResponseCache] = Depends(get_response_cache),
+) -> ChainBatchResponse:
+    """
+    Runs a batch of chain requests concurrently and returns per-item results in input order.
+
+    :param request_data: The batch of chain requests and an optional concurrency limit.
+    :param llm_provider: The LLM used to build the chains.
+    :param registry: The registry holding compiled chains.
+    :param cache: The response cache, or None when caching is disabled.
+    :return: One ChainResponse per request item.
+    """
+    results = await run_chain_batch(
+        request_data.items,
+        llm_provider,
+        registry,
+        cache=cache,
+        max_concurrency=request_data.max_concurrency,
+    )
+    return ChainBatchResponse(results=results)
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def cache_stats_endpoint(cache: Optional[ResponseCache] = Depends(get_response_cache)) -> CacheStats:
+    """
+    Returns the response cache's hit/miss/eviction counters.
+
+    :param cache: The response cache, or None when caching is disabled.
+    :return: The current counters; all zero when caching is disabled.
+    """
+    if cache is None:
+        return CacheStats()
+    return cache.stats()
+
+
+@router.post("/generate/stream")
+async def generate_text_stream_endpoint(
+    request_data: GenerateTextRequest,
+    llm_provider: Any = Depends(get_llm_provider),
+    registry: ChainRegistry = Depends(get_chain_registry),
+) -> StreamingResponse:
+    """
+    Streams the chain output as server-sent events while the LLM produces it.
+
+    Each token is sent as a ``token`` event. A final ``metrics`` event carries
+    time-to-first-token and tokens/sec; failures are reported as an ``error`` event.
+
+    :param request_data: The request model containing user input.
+    :param llm_provider: The LLM used to build the chain.
+    :param registry: The registry holding compiled chains.
+    :return: A text/event-stream response.
+    """
+    try:
+        chain = registry.get_chain(request_data.chain_name, llm_provider)
+        token_stream = ChainTokenStream(chain, request_data.user_input)
+    except ChainNotFoundError:
+        raise _chain_not_found(request_data.chain_name)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Error in generate_text_stream_endpoint: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while generating text."
+        )
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            async for token in token_stream:
+                yield _format_sse("token", {"token": token})
+        except Exception as e:
+            logger.error("Error while streaming generated text: %s", e)
+            yield _format_sse("error", {"detail": "An error occurred while generating text."})
+            return
+        record_llm_tokens(
+            "chain",
+            registry.prompt_token_count(request_data.chain_name, request_data.user_input),
+            token_stream.metrics.token_count,
+        )
+        yield _format_sse("metrics", token_stream.metrics.dict())
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
@@ -1,16 +1,33 @@
 """Business logic for building/maintaining LangChain 'Chain' objects, including prompt templates and flow definitions."""
 
-from typing import Any
+import asyncio
+import time
+from typing import Any, AsyncIterator, Optional
+
+from langchain.callbacks.base import AsyncCallbackHandler
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 
+from chains.chains_models import StreamMetrics
+from chains.chains_prompt import CompiledPromptTemplate
+from utils.tracing import span
+
+_STREAM_END = object()
+
+SIMPLE_PROMPT = CompiledPromptTemplate(
+    input_variables=["user_input"],
+    template="You are a helpful assistant. Please answer the following question: {user_input}"
+)
 
-def build_simple_chain(llm_provider: Any) -> LLMChain:
+
+def build_simple_chain(llm_provider: Any, prompt: Optional[PromptTemplate] = None) -> LLMChain:
     """
     Returns a basic LangChain chain instance with a single prompt step.
 
     :param llm_provider: The language model provider to use for building the chain.
     :type llm_provider: Any
+    :param prompt: A pre-built prompt template; defaults to SIMPLE_PROMPT.
+    :type prompt: Optional[PromptTemplate]
     :raises ValueError: If the provided llm_provider is None.
     :return: A LangChain chain with one prompt step.
     :rtype: LLMChain
@@ -18,17 +35,93 @@ def build_simple_chain(llm_provider: Any) -> LLMChain:
     if llm_provider is None:
         raise ValueError("llm_provider cannot be None")
 
-    prompt = PromptTemplate(
-        input_variables=["user_input"],
-        template="You are a helpful assistant. Please answer the following question: {user_input}"
-    )
+    if prompt is None:
+        prompt = SIMPLE_PROMPT
 
     chain = LLMChain(
         llm=llm_provider,
         prompt=prompt
     )
+    # pydantic copies model fields on validation; bind the caller's instance so
+    # its state (clients, response cursors) is the one the chain uses.
+    chain.llm = llm_provider
 
     # TODO: Add error handling for unexpected model behavior.
     # TODO: Extend this chain with additional steps or logic as needed.
 
-    return chain
\ No newline at end of file
+    return chain
+
+
+class _TokenQueueHandler(AsyncCallbackHandler):
+    """
+    Callback handler that forwards every new LLM token onto an asyncio queue.
+    """
+
+    def __init__(self, queue: "asyncio.Queue[Any]") -> None:
+        self.queue = queue
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.queue.put_nowait(token)
+
+
+class ChainTokenStream:
+    """
+    Async iterator over the tokens an LLMChain produces for a single input.
+
+    Timing information is collected in ``metrics`` while iterating and is
+    complete once the iterator is exhausted.
+    """
+
+    def __init__(self, chain: LLMChain, user_input: str) -> None:
+        """
+        :param chain: The chain to run, typically built by build_simple_chain.
+        :param user_input: The user's prompt.
+        :raises ValueError: If chain is None or user_input is empty.
+        """
+        if chain is None:
+            raise ValueError("chain cannot be None")
+        if not user_input:
+            raise ValueError("user_input cannot be empty")
+        self._chain = chain
+        self._user_input = user_input
+        self.metrics = StreamMetrics()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        handler = _TokenQueueHandler(queue)
+
+        async def _run() -> str:
+            try:
+                with span("llm.call", **{"llm.streaming": True}):
+                    return await self._chain.arun(self._user_input, callbacks=[handler])
+            finally:
+                queue.put_nowait(_STREAM_END)
+
+        start = time.perf_counter()
+        task = asyncio.ensure_future(_run())
+        try:
+            while True:
+                token = await queue.get()
+                if token is _STREAM_END:
+                    break
+                self._record_token(start)
+                yield token
+
+            output = await task
+            # Providers that do not stream still produce a single final chunk.
+            if self.metrics.token_count == 0 and output:
+                self._record_token(start)
+                yield output
+        finally:
+            if not task.done():
+                task.cancel()
+
+        self.metrics.total_time = time.perf_counter() - start
+        if self.metrics.total_time > 0:
+            self.metrics.tokens_per_second = self.metrics.token_count / self.metrics.total_time
+
+    def _record_token(self, start: float) -> None:
+        if self.metrics.time_to_first_token is None:
+            self.metrics.time_to_first_token = time.perf_counter() - start
+        self.metrics.token_count += 1
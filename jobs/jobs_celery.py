@@ -0,0 +1,98 @@
+"""
+Celery backend for the job queue.
+
+Start workers with:
+
+    celery -A jobs.jobs_celery:celery_app worker
+
+Workers build their LLM, chains and tools from their own environment. For
+tests, create_celery_app("memory://", "cache+memory://", eager=True) runs jobs
+in-process without a broker.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from celery import Celery
+from celery.result import AsyncResult
+
+from jobs.jobs_models import JobInfo, JobStatus
+from jobs.jobs_service import JOB_HANDLERS, JobQueue, run_job
+
+RUN_JOB_TASK = "jobs.run_job"
+
+_CELERY_STATES = {
+    "PENDING": JobStatus.QUEUED,
+    "RECEIVED": JobStatus.QUEUED,
+    "STARTED": JobStatus.RUNNING,
+    "RETRY": JobStatus.RUNNING,
+    "SUCCESS": JobStatus.SUCCEEDED,
+    "FAILURE": JobStatus.FAILED,
+    "REVOKED": JobStatus.FAILED,
+}
+
+
+def _run_job_task(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return asyncio.run(run_job(kind, payload))
+
+
+def create_celery_app(broker_url: str, result_backend: str, eager: bool = False) -> Celery:
+    """
+    Creates a Celery app with the job task registered.
+
+    :param broker_url: Where jobs are queued, e.g. redis://localhost:6379/0 or memory://.
+    :param result_backend: Where job results are stored, e.g. redis://... or cache+memory://.
+    :param eager: Run jobs synchronously on submit, for tests.
+    :return: The configured app.
+    """
+    app = Celery("mini_langchain", broker=broker_url, backend=result_backend)
+    app.conf.update(
+        task_serializer="json",
+        result_serializer="json",
+        accept_content=["json"],
+        # Report "running" while a worker holds the job instead of staying "queued".
+        task_track_started=True,
+        task_always_eager=eager,
+        task_store_eager_result=eager,
+    )
+    app.task(name=RUN_JOB_TASK)(_run_job_task)
+    return app
+
+
+class CeleryJobQueue(JobQueue):
+    """
+    Hands jobs to Celery workers; job ids are Celery task ids.
+
+    Celery cannot tell an unknown task id from one still waiting in the broker,
+    so unknown ids report as queued rather than raising JobNotFoundError.
+    """
+
+    def __init__(self, app: Celery) -> None:
+        self._app = app
+
+    def submit(
+        self, kind: str, payload: Mapping[str, Any], context: Optional[Mapping[str, Any]] = None
+    ) -> JobInfo:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        created_at = time.time()
+        result = self._app.tasks[RUN_JOB_TASK].apply_async(args=[kind, dict(payload)])
+        return JobInfo(job_id=result.id, kind=kind, status=JobStatus.QUEUED, created_at=created_at)
+
+    def get(self, job_id: str) -> JobInfo:
+        result = AsyncResult(job_id, app=self._app)
+        status = _CELERY_STATES.get(result.state, JobStatus.RUNNING)
+        job = JobInfo(job_id=job_id, status=status)
+        if status is JobStatus.SUCCEEDED:
+            job.result = result.result
+        elif status is JobStatus.FAILED:
+            job.error = str(result.result)
+        return job
+
+
+celery_app = create_celery_app(
+    os.getenv("JOB_BROKER_URL", "redis://localhost:6379/0"),
+    os.getenv("JOB_RESULT_BACKEND", os.getenv("JOB_BROKER_URL", "redis://localhost:6379/0")),
+)
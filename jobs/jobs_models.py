@@ -0,0 +1,38 @@
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+"""
+Pydantic models for background jobs.
+"""
+
+
+class JobStatus(str, Enum):
+    """
+    Lifecycle states of a background job.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobInfo(BaseModel):
+    """
+    Model for the state and, once finished, the outcome of a background job.
+    """
+
+    job_id: str = Field(..., description="The identifier used to poll or stream the job.")
+    kind: Optional[str] = Field(None, description="The job type, e.g. agent_query or chain_generate.")
+    status: JobStatus = Field(JobStatus.QUEUED, description="The current lifecycle state.")
+    result: Optional[Dict[str, Any]] = Field(None, description="The response body, once the job succeeded.")
+    error: Optional[str] = Field(None, description="The error message, if the job failed.")
+    created_at: Optional[float] = Field(None, description="Unix time the job was enqueued.")
+    started_at: Optional[float] = Field(None, description="Unix time a worker picked the job up.")
+    finished_at: Optional[float] = Field(None, description="Unix time the job finished.")
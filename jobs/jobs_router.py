@@ -0,0 +1,89 @@
+import json
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from jobs.jobs_models import JobInfo
+from jobs.jobs_service import JobNotFoundError, JobQueue, get_job_queue
+
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def job_accepted_response(job: JobInfo) -> JSONResponse:
+    """
+    Builds the 202 response returned when a request is enqueued with async=true.
+
+    Args:
+        job (JobInfo): The job as returned by JobQueue.submit.
+
+    Returns:
+        JSONResponse: The job state, with a Location header pointing at its status endpoint.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=json.loads(job.json()),
+        headers={"Location": f"{router.prefix}/{job.job_id}"},
+    )
+
+
+def _job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Unknown job: {job_id}"
+    )
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job_endpoint(job_id: str, job_queue: JobQueue = Depends(get_job_queue)) -> JobInfo:
+    """
+    Returns the state of a job, including its result once it has finished.
+
+    Args:
+        job_id (str): The id returned when the job was enqueued.
+        job_queue (JobQueue): The queue the job was submitted to.
+
+    Returns:
+        JobInfo: The job's current state.
+    """
+    try:
+        return job_queue.get(job_id)
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+
+
+@router.get("/{job_id}/stream")
+async def stream_job_endpoint(job_id: str, job_queue: JobQueue = Depends(get_job_queue)) -> StreamingResponse:
+    """
+    Streams a job's state as server-sent events until it finishes.
+
+    Each event is named after the job status and carries the full job state;
+    while the job is pending the current state is re-sent periodically as a
+    heartbeat. The last event is either succeeded or failed.
+
+    Args:
+        job_id (str): The id returned when the job was enqueued.
+        job_queue (JobQueue): The queue the job was submitted to.
+
+    Returns:
+        StreamingResponse: A text/event-stream response.
+    """
+    try:
+        job = job_queue.get(job_id)
+    except JobNotFoundError:
+        raise _job_not_found(job_id)
+
+    async def event_source() -> AsyncIterator[str]:
+        current = job
+        while True:
+            yield f"event: {current.status.value}\ndata: {current.json()}\n\n"
+            if current.status.finished:
+                return
+            current = await job_queue.wait(job_id, STREAM_HEARTBEAT_SECONDS)
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
@@ -0,0 +1,306 @@
+"""
+Background job queue for long-running agent and chain requests.
+
+POST /agents/query and /chains/generate accept async=true to enqueue the
+request here instead of running it on the HTTP worker; clients then poll or
+stream /jobs/{job_id}. JOB_BACKEND selects where jobs run: "local" (default)
+runs them on a dedicated event-loop thread in this process, "celery" hands
+them to Celery workers (see jobs.jobs_celery) so executors scale separately.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+
+from agents.agents_pool import get_agent_pool
+from agents.agents_service import arun_agent_query
+from chains.chains_batch import run_chain_batch
+from chains.chains_cache import get_response_cache
+from chains.chains_llm import get_llm_provider
+from chains.chains_models import ChainRequest
+from chains.chains_registry import DEFAULT_CHAIN_NAME, get_chain_registry
+from jobs.jobs_models import JobInfo, JobStatus
+from tools.tools_registry import get_tool_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_CONCURRENCY = 4
+DEFAULT_MAX_RETAINED_JOBS = 10000
+POLL_INTERVAL_SECONDS = 0.25
+
+JobHandler = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class JobNotFoundError(KeyError):
+    """
+    Raised when a job id is unknown, or its record has already been discarded.
+    """
+    pass
+
+
+async def run_agent_job(
+    payload: Mapping[str, Any],
+    llm_provider: Optional[Any] = None,
+    tool_registry: Optional[Any] = None,
+    agent_pool: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Runs an agent query job; the result matches the /agents/query response body.
+
+    :param payload: {"user_query": ...}.
+    :param llm_provider: The LLM to plan with; the process-wide provider by default.
+    :param tool_registry: The tools to run; the process-wide registry by default.
+    :param agent_pool: Where the agent comes from; the process-wide pool by default.
+    :return: {"answer": ...}.
+    """
+    registry = tool_registry or get_tool_registry()
+    agent = (agent_pool or get_agent_pool()).get_agent(registry.tool_names(), registry)
+    answer = await arun_agent_query(
+        agent, payload["user_query"], llm_provider=llm_provider or get_llm_provider(), tool_registry=registry
+    )
+    return {"answer": answer}
+
+
+async def run_chain_job(
+    payload: Mapping[str, Any],
+    llm_provider: Optional[Any] = None,
+    registry: Optional[Any] = None,
+    cache: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Runs a chain generation job; the result matches the /chains/generate response body.
+
+    :param payload: {"user_input": ..., "chain_name": ...}.
+    :param llm_provider: The LLM bound to the chain; the process-wide provider by default.
+    :param registry: The chain registry; the process-wide registry by default.
+    :param cache: The response cache; the process-wide cache by default.
+    :raises ValueError: If the chain is unknown or the chain call fails.
+    :return: {"generated_text": ...}.
+    """
+    request = ChainRequest(
+        user_input=payload["user_input"], chain_name=payload.get("chain_name") or DEFAULT_CHAIN_NAME
+    )
+    [response] = await run_chain_batch(
+        [request],
+        llm_provider or get_llm_provider(),
+        registry or get_chain_registry(),
+        cache=cache if cache is not None else get_response_cache(),
+    )
+    if not response.success:
+        raise ValueError(response.error_message)
+    return {"generated_text": response.output}
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    "agent_query": run_agent_job,
+    "chain_generate": run_chain_job,
+}
+
+
+async def run_job(kind: str, payload: Mapping[str, Any], **context: Any) -> Dict[str, Any]:
+    """
+    Runs one job with the handler registered for its kind.
+
+    :param kind: A key of JOB_HANDLERS.
+    :param payload: JSON-serializable job arguments.
+    :param context: In-process overrides passed to the handler, such as llm_provider.
+    :raises ValueError: If no handler is registered for kind.
+    :return: The handler's JSON-serializable result.
+    """
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return await handler(payload, **context)
+
+
+class JobQueue(ABC):
+    """
+    Interface for job backends. Implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def submit(
+        self, kind: str, payload: Mapping[str, Any], context: Optional[Mapping[str, Any]] = None
+    ) -> JobInfo:
+        """
+        Enqueues a job and returns its initial state.
+
+        :param kind: A key of JOB_HANDLERS.
+        :param payload: JSON-serializable job arguments.
+        :param context: In-process handler overrides; backends that run jobs in
+            other processes ignore it and use the workers' own configuration.
+        :raises ValueError: If no handler is registered for kind.
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> JobInfo:
+        """
+        Returns the current state of a job.
+
+        :raises JobNotFoundError: If the job id is unknown.
+        """
+
+    async def wait(self, job_id: str, timeout: float) -> JobInfo:
+        """
+        Waits up to timeout seconds for a job to finish and returns its state then.
+
+        :raises JobNotFoundError: If the job id is unknown.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job.status.finished or remaining <= 0:
+                return job
+            await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+
+class LocalJobQueue(JobQueue):
+    """
+    Runs jobs on a dedicated event-loop thread in this process, at most
+    max_concurrency at a time, so they never occupy the HTTP worker's loop.
+
+    Finished jobs are kept for polling until more than max_retained jobs
+    exist, then the oldest finished ones are discarded.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_JOB_CONCURRENCY,
+        max_retained: int = DEFAULT_MAX_RETAINED_JOBS,
+    ) -> None:
+        """
+        Initializes the queue; the worker thread starts with the first job.
+
+        :param max_concurrency: Maximum number of jobs running at once.
+        :param max_retained: Number of job records kept for polling.
+        :raises ValueError: If a limit is not positive.
+        """
+        if max_concurrency <= 0 or max_retained <= 0:
+            raise ValueError("max_concurrency and max_retained must be positive.")
+        self._max_concurrency = max_concurrency
+        self._max_retained = max_retained
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self, kind: str, payload: Mapping[str, Any], context: Optional[Mapping[str, Any]] = None
+    ) -> JobInfo:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = JobInfo(job_id=uuid.uuid4().hex, kind=kind, created_at=time.time())
+        loop = self._ensure_loop()
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        future = asyncio.run_coroutine_threadsafe(self._run(job.job_id, kind, payload, dict(context or {})), loop)
+        with self._lock:
+            if job.job_id in self._jobs:
+                self._futures[job.job_id] = future
+        return job
+
+    def get(self, job_id: str) -> JobInfo:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> JobInfo:
+        job = self.get(job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if not job.status.finished and future is not None:
+            # asyncio.wait leaves the future running on timeout, unlike wait_for.
+            await asyncio.wait({asyncio.wrap_future(future)}, timeout=timeout)
+        return self.get(job_id)
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker thread; jobs still running are abandoned.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self._max_concurrency)
+                threading.Thread(target=self._loop.run_forever, name="job-queue", daemon=True).start()
+            return self._loop
+
+    async def _run(self, job_id: str, kind: str, payload: Mapping[str, Any], context: Dict[str, Any]) -> None:
+        async with self._semaphore:
+            self._update(job_id, status=JobStatus.RUNNING, started_at=time.time())
+            try:
+                result = await run_job(kind, payload, **context)
+            except Exception as e:
+                logger.error("Job %s (%s) failed: %s", job_id, kind, e)
+                self._update(job_id, status=JobStatus.FAILED, error=str(e), finished_at=time.time())
+            else:
+                self._update(job_id, status=JobStatus.SUCCEEDED, result=result, finished_at=time.time())
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs[job_id] = job.copy(update=fields)
+            if fields.get("finished_at") is not None:
+                self._futures.pop(job_id, None)
+
+    def _prune(self) -> None:
+        excess = len(self._jobs) - self._max_retained
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status.finished][:excess]:
+            del self._jobs[job_id]
+
+
+def build_job_queue_from_env() -> JobQueue:
+    """
+    Builds a JobQueue from environment variables.
+
+    JOB_BACKEND selects "local" (default) or "celery". JOB_CONCURRENCY and
+    JOB_MAX_RETAINED bound the local queue; JOB_BROKER_URL and
+    JOB_RESULT_BACKEND configure Celery.
+
+    :raises ValueError: If JOB_BACKEND names an unknown backend.
+    :return: The configured queue.
+    """
+    backend_name = os.getenv("JOB_BACKEND", "local").lower()
+    if backend_name == "local":
+        return LocalJobQueue(
+            max_concurrency=int(os.getenv("JOB_CONCURRENCY", str(DEFAULT_JOB_CONCURRENCY))),
+            max_retained=int(os.getenv("JOB_MAX_RETAINED", str(DEFAULT_MAX_RETAINED_JOBS))),
+        )
+    if backend_name == "celery":
+        from jobs.jobs_celery import CeleryJobQueue, celery_app
+
+        return CeleryJobQueue(celery_app)
+    raise ValueError(f"Unknown job backend: {backend_name}")
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the process-wide job queue, for use as a FastAPI dependency.
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = build_job_queue_from_env()
+    return _job_queue
@@ -1,17 +1,42 @@
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+
+from agents import agents_router
+from chains import chains_router
+from jobs import jobs_router
+from memory import memory_router
+from metrics import metrics_router
+from metrics.metrics_service import MetricsMiddleware
+from tools import tools_router
+from utils.auth import auth_enabled, require_auth
+from utils.logger import configure_logging_from_env
+from utils.tracing import RequestTracingMiddleware, configure_tracing_from_env
 
-def create_app() -> FastAPI:
+def create_app(auth: Optional[bool] = None) -> FastAPI:
     """
     Initializes and configures the FastAPI application.
 
+    Args:
+        auth (Optional[bool]): Require a bearer JWT on every API router; /metrics stays
+            open for scrapers. Defaults to the AUTH_ENABLED environment variable.
+
     Returns:
         FastAPI: A FastAPI application instance with necessary routers mounted.
     """
+    configure_logging_from_env()
+    configure_tracing_from_env()
     app = FastAPI(title="LangChain_MVP")
-    # TODO: Include routers from chains, agents, etc.
-    # Example: app.include_router(chains.router, prefix="/chains", tags=["chains"])
-    # Example: app.include_router(agents.router, prefix="/agents", tags=["agents"])
+    app.add_middleware(RequestTracingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    protected = [Depends(require_auth)] if (auth_enabled() if auth is None else auth) else []
+    app.include_router(chains_router.router, dependencies=protected)
+    app.include_router(agents_router.router, dependencies=protected)
+    app.include_router(tools_router.router, dependencies=protected)
+    app.include_router(memory_router.router, dependencies=protected)
+    app.include_router(jobs_router.router, dependencies=protected)
+    app.include_router(metrics_router.router)
     return app
 
 def run_app() -> None:
@@ -22,4 +47,4 @@ def run_app() -> None:
         uvicorn.run("main:create_app", host="0.0.0.0", port=8000, reload=True)
     except Exception as error:
         # Logging can be handled here in production code
-        print(f"Failed to start server: {error}")
\ No newline at end of file
+        print(f"Failed to start server: {error}")
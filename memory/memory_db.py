@@ -0,0 +1,193 @@
+"""Database-backed MemoryService that persists conversation history through SQLAlchemy."""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from config import get_database_url
+from memory.memory_models import Base, ConversationMemory, MemoryStats
+from memory.memory_service import MemoryService
+from utils.tracing import traced
+
+
+def create_memory_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Creates a pooled SQLAlchemy engine for conversation memory.
+
+    Pool sizing is read from DB_POOL_SIZE and DB_MAX_OVERFLOW. In-memory SQLite
+    databases use a single shared connection so every thread sees the same data.
+
+    :param database_url: The database URL; defaults to config.get_database_url().
+    :return: A configured Engine.
+    :raises ValueError: If no database URL is given or configured.
+    """
+    url = database_url or get_database_url()
+    engine_kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+
+    if url.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            engine_kwargs["poolclass"] = StaticPool
+            return create_engine(url, **engine_kwargs)
+
+    engine_kwargs["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+    engine_kwargs["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    return create_engine(url, **engine_kwargs)
+
+
+class DatabaseMemoryService(MemoryService):
+    """
+    MemoryService that stores every message as a ConversationMemory row, so
+    history survives restarts and is shared by all worker processes.
+    """
+
+    def __init__(self, engine: Optional[Engine] = None, create_tables: bool = True) -> None:
+        """
+        Initializes the service on a pooled engine.
+
+        :param engine: The engine to use; one is created from config when omitted.
+        :param create_tables: Create the memory tables if they do not exist yet.
+        """
+        self._engine = engine or create_memory_engine()
+        self._session_factory = sessionmaker(bind=self._engine, expire_on_commit=False)
+        if create_tables:
+            Base.metadata.create_all(bind=self._engine)
+
+    def store_message(self, session_id: str, message: str) -> None:
+        """
+        Persists a user or AI message for a specific session.
+
+        :param session_id: Unique identifier for the chat session.
+        :param message: The message to be stored.
+        :raises ValueError: If session_id or message is empty.
+        """
+        self.store_messages(session_id, [message])
+
+    @traced("memory.store", **{"memory.backend": "database"})
+    def store_messages(self, session_id: str, messages: List[str]) -> None:
+        """
+        Persists several messages for a session with a single bulk insert.
+
+        :param session_id: Unique identifier for the chat session.
+        :param messages: The messages to append, in order.
+        :raises ValueError: If session_id or any message is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if not messages or not all(messages):
+            raise ValueError("Message cannot be empty.")
+
+        created_at = datetime.utcnow()
+        rows = [
+            {"conversation_id": session_id, "content": message, "created_at": created_at}
+            for message in messages
+        ]
+        with self._session_factory.begin() as session:
+            session.execute(insert(ConversationMemory), rows)
+
+    @traced("memory.retrieve", **{"memory.backend": "database"})
+    def retrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """
+        Retrieves the conversation history for a session, oldest first.
+
+        :param session_id: Unique identifier for the chat session.
+        :param limit: Maximum number of messages to return; all when None.
+        :param offset: Number of messages to skip from the start of the history.
+        :return: A list of messages corresponding to the session.
+        :raises ValueError: If session_id is empty or the page bounds are negative.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset cannot be negative.")
+
+        query = (
+            select(ConversationMemory.content)
+            .where(ConversationMemory.conversation_id == session_id)
+            .order_by(ConversationMemory.created_at, ConversationMemory.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        with self._session_factory() as session:
+            return list(session.scalars(query))
+
+    @traced("memory.clear", **{"memory.backend": "database"})
+    def clear_memory(self, session_id: str) -> bool:
+        """
+        Deletes the conversation history for a specific session.
+
+        :param session_id: Unique identifier for the chat session.
+        :return: True if any messages were deleted, False otherwise.
+        :raises ValueError: If session_id is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+
+        with self._session_factory.begin() as session:
+            result = session.execute(
+                delete(ConversationMemory).where(ConversationMemory.conversation_id == session_id)
+            )
+            return result.rowcount > 0
+
+    def stats(self) -> MemoryStats:
+        """
+        Returns session and message counts for the whole database.
+
+        :return: Counts plus the total stored content length in bytes.
+        """
+        query = select(
+            func.count(func.distinct(ConversationMemory.conversation_id)),
+            func.count(ConversationMemory.id),
+            func.coalesce(func.sum(func.length(ConversationMemory.content)), 0),
+        )
+        with self._session_factory() as session:
+            sessions, messages, content_bytes = session.execute(query).one()
+        return MemoryStats(sessions=sessions, messages=messages, approximate_bytes=content_bytes)
+
+    async def astore_message(self, session_id: str, message: str) -> None:
+        """
+        Async counterpart of store_message; the database call runs in a worker thread.
+        """
+        await asyncio.to_thread(self.store_message, session_id, message)
+
+    async def astore_messages(self, session_id: str, messages: List[str]) -> None:
+        """
+        Async counterpart of store_messages.
+        """
+        await asyncio.to_thread(self.store_messages, session_id, messages)
+
+    async def aretrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """
+        Async counterpart of retrieve_memory.
+        """
+        return await asyncio.to_thread(self.retrieve_memory, session_id, limit, offset)
+
+    async def aclear_memory(self, session_id: str) -> bool:
+        """
+        Async counterpart of clear_memory.
+        """
+        return await asyncio.to_thread(self.clear_memory, session_id)
+
+    async def astats(self) -> MemoryStats:
+        """
+        Async counterpart of stats.
+        """
+        return await asyncio.to_thread(self.stats)
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -25,9 +25,13 @@ class ConversationMemory(Base):
     SQLAlchemy model for persisting conversation memory in the database.
     """
     __tablename__ = "conversation_memories"
+    __table_args__ = (
+        # Serves the per-conversation, time-ordered reads done by the memory service.
+        Index("ix_conversation_memories_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    conversation_id = Column(String, nullable=False, index=True)
+    conversation_id = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, nullable=False)
 
@@ -50,4 +54,26 @@ class RelatedDataModel(Base):
     conversation_memories = relationship("ConversationMemory", back_populates="related_data")
 
     # TODO: Implement any necessary methods or properties for related data
-    # Example: error handling or additional validation logic could be placed here if needed.
\ No newline at end of file
+    # Example: error handling or additional validation logic could be placed here if needed.
+
+
+class MemoryPolicy(BaseModel):
+    """
+    Pydantic model describing how much conversation memory is kept and returned.
+    Unset limits are unbounded.
+    """
+    max_messages: Optional[int] = Field(None, ge=1, description="Messages kept per session (last-N window).")
+    max_tokens: Optional[int] = Field(None, ge=1, description="Token budget for the window returned by retrieve_memory.")
+    max_sessions: Optional[int] = Field(None, ge=1, description="Sessions kept per process; least recently used are evicted.")
+    session_ttl_seconds: Optional[float] = Field(None, gt=0, description="Idle time after which a session is evicted.")
+
+
+class MemoryStats(BaseModel):
+    """
+    Pydantic model for per-process memory usage metrics.
+    """
+    sessions: int = Field(0, description="Number of live sessions.")
+    messages: int = Field(0, description="Number of stored messages across all sessions.")
+    approximate_bytes: int = Field(0, description="Approximate size of the stored message strings.")
+    evicted_sessions: int = Field(0, description="Sessions evicted by the LRU or TTL policy.")
+    dropped_messages: int = Field(0, description="Messages dropped by the last-N window.")
@@ -1,49 +1,93 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from memory.memory_models import MemoryStats
+from memory.memory_service import MemoryService, get_memory_service
+from memory.memory_vector import VectorMemoryService
 
 router = APIRouter(prefix="/memory", tags=["Memory"])
 
-def get_memory_state_endpoint(session_id: str) -> dict:
+async def get_memory_state_endpoint(
+    session_id: str,
+    memory_service: MemoryService,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    query: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> dict:
     """
     Returns the memory content associated with a given session.
 
     Args:
         session_id (str): The unique identifier for the session.
+        memory_service (MemoryService): The service holding session memory.
+        limit (Optional[int]): Maximum number of messages to return.
+        offset (int): Number of messages to skip from the start of the history.
+        query (Optional[str]): Return only the messages most relevant to this text.
+        top_k (Optional[int]): Number of relevant messages to return for a query.
 
     Returns:
         dict: The memory content for the supplied session, if found.
     """
-    # TODO: Implement memory retrieval logic.
-    # Example error handling:
-    # if memory_not_found:
-    #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory not found.")
-    return {"session_id": session_id, "memory": "Sample memory content"}
+    if query and not isinstance(memory_service, VectorMemoryService):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The configured memory backend does not support query retrieval."
+        )
+    try:
+        if query:
+            memory = await memory_service.aretrieve_memory(
+                session_id, limit, offset, query=query, top_k=top_k
+            )
+        else:
+            memory = await memory_service.aretrieve_memory(session_id, limit, offset)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"session_id": session_id, "memory": memory}
 
-def clear_memory_endpoint(session_id: str) -> dict:
+async def clear_memory_endpoint(session_id: str, memory_service: MemoryService) -> dict:
     """
     Clears memory for a specified session.
 
     Args:
         session_id (str): The unique identifier for the session.
+        memory_service (MemoryService): The service holding session memory.
 
     Returns:
         dict: A message indicating the memory has been cleared.
     """
-    # TODO: Implement memory clearing logic.
-    # Example error handling:
-    # if no_memory_to_clear:
-    #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No memory to clear.")
+    try:
+        await memory_service.aclear_memory(session_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return {"session_id": session_id, "message": "Memory cleared successfully"}
 
+@router.get("/stats", response_model=MemoryStats)
+async def get_memory_stats(memory_service: MemoryService = Depends(get_memory_service)) -> MemoryStats:
+    """
+    Endpoint to report this process's memory usage metrics.
+    """
+    return await memory_service.astats()
+
 @router.get("/{session_id}", response_model=dict)
-def get_memory(session_id: str) -> dict:
+async def get_memory(
+    session_id: str,
+    limit: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    query: Optional[str] = None,
+    top_k: Optional[int] = Query(None, ge=1),
+    memory_service: MemoryService = Depends(get_memory_service),
+) -> dict:
     """
-    Endpoint to retrieve the memory content for a given session.
+    Endpoint to retrieve the memory content for a given session, optionally one page at a time
+    or only the messages relevant to a query.
     """
-    return get_memory_state_endpoint(session_id)
+    return await get_memory_state_endpoint(session_id, memory_service, limit, offset, query, top_k)
 
 @router.delete("/{session_id}", response_model=dict)
-def clear_memory(session_id: str) -> dict:
+async def clear_memory(session_id: str, memory_service: MemoryService = Depends(get_memory_service)) -> dict:
     """
     Endpoint to clear the memory for a given session.
     """
-    return clear_memory_endpoint(session_id)
\ No newline at end of file
+    return await clear_memory_endpoint(session_id, memory_service)
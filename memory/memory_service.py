@@ -1,4 +1,9 @@
-from typing import Dict, List
+import os
+import sys
+from typing import Dict, List, Optional
+
+from memory.memory_models import MemoryPolicy, MemoryStats
+from utils.tracing import traced
 
 
 class MemoryService:
@@ -11,10 +16,11 @@ class MemoryService:
         """
         Initializes the MemoryService with an in-memory data structure.
 
-        TODO: Replace with DB or external store implementation if needed.
+        See memory.memory_db.DatabaseMemoryService for the persistent implementation.
         """
         self._sessions: Dict[str, List[str]] = {}
 
+    @traced("memory.store", **{"memory.backend": "in_memory"})
     def store_message(self, session_id: str, message: str) -> None:
         """
         Persists a user or AI message in memory for a specific session.
@@ -33,15 +39,171 @@ class MemoryService:
 
         self._sessions[session_id].append(message)
 
-    def retrieve_memory(self, session_id: str) -> List[str]:
+    def store_messages(self, session_id: str, messages: List[str]) -> None:
+        """
+        Persists several messages for a session, in order.
+
+        :param session_id: Unique identifier for the chat session.
+        :param messages: The messages to be stored.
+        :raises ValueError: If session_id or any message is empty.
+        """
+        if not messages or not all(messages):
+            raise ValueError("Message cannot be empty.")
+        for message in messages:
+            self.store_message(session_id, message)
+
+    @traced("memory.retrieve", **{"memory.backend": "in_memory"})
+    def retrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
         """
-        Retrieves the full conversation history for a specific session.
+        Retrieves the conversation history for a specific session.
         
         :param session_id: Unique identifier for the chat session.
+        :param limit: Maximum number of messages to return; all when None.
+        :param offset: Number of messages to skip from the start of the history.
         :return: A list of messages corresponding to the session.
+        :raises ValueError: If session_id is empty or the page bounds are negative.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset cannot be negative.")
+
+        history = self._sessions.get(session_id, [])
+        if limit is None and offset == 0:
+            return history
+        end = None if limit is None else offset + limit
+        return history[offset:end]
+
+    @traced("memory.clear", **{"memory.backend": "in_memory"})
+    def clear_memory(self, session_id: str) -> bool:
+        """
+        Removes the conversation history for a specific session.
+
+        :param session_id: Unique identifier for the chat session.
+        :return: True if the session existed, False otherwise.
         :raises ValueError: If session_id is empty.
         """
         if not session_id:
             raise ValueError("Session ID cannot be empty.")
 
-        return self._sessions.get(session_id, [])
\ No newline at end of file
+        return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> MemoryStats:
+        """
+        Returns memory usage metrics for this process.
+
+        :return: Session and message counts plus an approximate size in bytes.
+        """
+        histories = list(self._sessions.values())
+        return MemoryStats(
+            sessions=len(histories),
+            messages=sum(len(history) for history in histories),
+            approximate_bytes=sum(sys.getsizeof(message) for history in histories for message in history),
+        )
+
+    async def astore_message(self, session_id: str, message: str) -> None:
+        """
+        Async counterpart of store_message.
+        """
+        self.store_message(session_id, message)
+
+    async def astore_messages(self, session_id: str, messages: List[str]) -> None:
+        """
+        Async counterpart of store_messages.
+        """
+        self.store_messages(session_id, messages)
+
+    async def aretrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """
+        Async counterpart of retrieve_memory.
+        """
+        return self.retrieve_memory(session_id, limit, offset)
+
+    async def aclear_memory(self, session_id: str) -> bool:
+        """
+        Async counterpart of clear_memory.
+        """
+        return self.clear_memory(session_id)
+
+    async def astats(self) -> MemoryStats:
+        """
+        Async counterpart of stats.
+        """
+        return self.stats()
+
+
+def _memory_policy_from_env() -> MemoryPolicy:
+    def _env(name: str) -> Optional[str]:
+        return os.getenv(name) or None
+
+    return MemoryPolicy(
+        max_messages=_env("MEMORY_MAX_MESSAGES"),
+        max_tokens=_env("MEMORY_MAX_TOKENS"),
+        max_sessions=_env("MEMORY_MAX_SESSIONS"),
+        session_ttl_seconds=_env("MEMORY_SESSION_TTL"),
+    )
+
+
+def build_memory_service_from_env() -> MemoryService:
+    """
+    Builds the MemoryService selected by the MEMORY_BACKEND environment variable.
+
+    Supported values are "memory" (default, per-process, unbounded), "windowed"
+    (per-process, bounded by MEMORY_MAX_MESSAGES, MEMORY_MAX_TOKENS,
+    MEMORY_MAX_SESSIONS and MEMORY_SESSION_TTL), "summary" (rolling LLM summary
+    plus MEMORY_SUMMARY_RECENT_MESSAGES recent messages, re-summarized past
+    MEMORY_SUMMARY_TOKEN_THRESHOLD tokens), "vector" (per-process, with
+    query-relevant retrieval; MEMORY_VECTOR_ANN enables the LSH index) and
+    "database" (persistent, using config.get_database_url()).
+
+    :raises ValueError: If MEMORY_BACKEND names an unknown backend.
+    :return: A MemoryService instance.
+    """
+    backend_name = os.getenv("MEMORY_BACKEND", "memory").lower()
+    if backend_name == "memory":
+        return MemoryService()
+    if backend_name == "windowed":
+        from memory.memory_window import WindowedMemoryService
+
+        return WindowedMemoryService(_memory_policy_from_env())
+    if backend_name == "summary":
+        from chains.chains_llm import get_llm_provider
+        from memory.memory_summary import SummaryBufferMemoryService, build_llm_summarizer
+
+        return SummaryBufferMemoryService(
+            build_llm_summarizer(get_llm_provider()),
+            max_recent_messages=int(os.getenv("MEMORY_SUMMARY_RECENT_MESSAGES", "6")),
+            token_threshold=int(os.getenv("MEMORY_SUMMARY_TOKEN_THRESHOLD", "500")),
+        )
+    if backend_name == "vector":
+        from memory.memory_vector import VectorMemoryService
+
+        return VectorMemoryService(use_ann=os.getenv("MEMORY_VECTOR_ANN", "").lower() in ("1", "true", "yes"))
+    if backend_name == "database":
+        from memory.memory_db import DatabaseMemoryService
+
+        return DatabaseMemoryService()
+    raise ValueError(f"Unknown memory backend: {backend_name}")
+
+
+_memory_service: Optional[MemoryService] = None
+
+
+def get_memory_service() -> MemoryService:
+    """
+    Returns the process-wide MemoryService, for use as a FastAPI dependency.
+    """
+    global _memory_service
+    if _memory_service is None:
+        _memory_service = build_memory_service_from_env()
+    return _memory_service
@@ -0,0 +1,260 @@
+"""Summary-buffer MemoryService: a rolling summary plus the most recent messages, summarized in the background."""
+
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.chains import LLMChain
+from langchain.prompts import PromptTemplate
+
+from memory.memory_models import MemoryStats
+from memory.memory_service import MemoryService
+from memory.memory_window import TokenCounter, count_words
+from utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+Summarizer = Callable[[str, List[str]], str]
+
+SUMMARY_PREFIX = "Summary: "
+
+SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["summary", "new_lines"],
+    template=(
+        "Progressively summarize the lines of conversation provided, adding onto the previous "
+        "summary and returning a new summary.\n\n"
+        "Current summary:\n{summary}\n\n"
+        "New lines of conversation:\n{new_lines}\n\n"
+        "New summary:"
+    ),
+)
+
+
+def build_llm_summarizer(llm_provider: Any) -> Summarizer:
+    """
+    Builds a summarizer that folds new messages into the running summary with an LLM.
+
+    :param llm_provider: The language model provider to summarize with.
+    :raises ValueError: If llm_provider is None.
+    :return: A callable taking (previous summary, new messages) and returning the new summary.
+    """
+    if llm_provider is None:
+        raise ValueError("llm_provider cannot be None")
+    chain = LLMChain(llm=llm_provider, prompt=SUMMARY_PROMPT)
+
+    def summarize(summary: str, messages: List[str]) -> str:
+        return chain.predict(summary=summary, new_lines="\n".join(messages)).strip()
+
+    return summarize
+
+
+class _SummarySession:
+    """
+    Rolling summary and not-yet-summarized messages for one session.
+    """
+
+    __slots__ = ("summary", "buffer", "buffer_tokens", "token_total", "pending", "generation")
+
+    def __init__(self) -> None:
+        self.summary = ""
+        self.buffer: List[str] = []
+        self.buffer_tokens: List[int] = []
+        self.token_total = 0
+        self.pending: Optional[Future] = None
+        self.generation = 0
+
+
+class SummaryBufferMemoryService(MemoryService):
+    """
+    MemoryService that keeps a rolling summary plus the most recent messages.
+
+    When a session's buffer grows past token_threshold, every message except the
+    newest max_recent_messages is folded into the summary on a background thread.
+    Until that finishes, those messages stay in the buffer, so nothing is lost
+    from retrieve_memory in the meantime.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        max_recent_messages: int = 6,
+        token_threshold: int = 500,
+        token_counter: TokenCounter = count_words,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        """
+        Initializes the service.
+
+        :param summarizer: Folds a list of messages into the previous summary.
+        :param max_recent_messages: Messages always kept verbatim after summarization.
+        :param token_threshold: Buffer size in tokens that triggers summarization.
+        :param token_counter: Counts the tokens in a message.
+        :param executor: Runs summarization; a single background thread by default.
+        :raises ValueError: If max_recent_messages is negative or token_threshold is not positive.
+        """
+        if max_recent_messages < 0:
+            raise ValueError("max_recent_messages cannot be negative.")
+        if token_threshold <= 0:
+            raise ValueError("token_threshold must be positive.")
+        self._summarize = summarizer
+        self._max_recent = max_recent_messages
+        self._threshold = token_threshold
+        self._count_tokens = token_counter
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+        self._summaries: Dict[str, _SummarySession] = {}
+        self._lock = threading.Lock()
+
+    @traced("memory.store", **{"memory.backend": "summary"})
+    def store_message(self, session_id: str, message: str) -> None:
+        """
+        Appends a message and schedules background summarization if the buffer overflows.
+
+        :param session_id: Unique identifier for the chat session.
+        :param message: The message to be stored.
+        :raises ValueError: If session_id or message is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if not message:
+            raise ValueError("Message cannot be empty.")
+
+        tokens = self._count_tokens(message)
+        with self._lock:
+            session = self._summaries.get(session_id)
+            if session is None:
+                session = self._summaries[session_id] = _SummarySession()
+            session.buffer.append(message)
+            session.buffer_tokens.append(tokens)
+            session.token_total += tokens
+            self._maybe_schedule(session_id, session)
+
+    @traced("memory.retrieve", **{"memory.backend": "summary"})
+    def retrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """
+        Returns the rolling summary (prefixed with "Summary: ") followed by the unsummarized messages.
+
+        :param session_id: Unique identifier for the chat session.
+        :param limit: Maximum number of entries to return; all when None.
+        :param offset: Number of entries to skip.
+        :return: The summary entry, if any, then the recent messages, oldest first.
+        :raises ValueError: If session_id is empty or the page bounds are negative.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset cannot be negative.")
+
+        with self._lock:
+            session = self._summaries.get(session_id)
+            if session is None:
+                return []
+            memory = [SUMMARY_PREFIX + session.summary] if session.summary else []
+            memory.extend(session.buffer)
+
+        end = None if limit is None else offset + limit
+        return memory[offset:end]
+
+    def get_summary(self, session_id: str) -> str:
+        """
+        Returns the current rolling summary for a session, or an empty string.
+        """
+        with self._lock:
+            session = self._summaries.get(session_id)
+            return session.summary if session else ""
+
+    @traced("memory.clear", **{"memory.backend": "summary"})
+    def clear_memory(self, session_id: str) -> bool:
+        """
+        Removes the summary and buffer for a session. In-flight summaries for it are discarded.
+
+        :param session_id: Unique identifier for the chat session.
+        :return: True if the session existed, False otherwise.
+        :raises ValueError: If session_id is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+
+        with self._lock:
+            session = self._summaries.pop(session_id, None)
+            if session is None:
+                return False
+            session.generation += 1
+            return True
+
+    def wait_for_summaries(self, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until every scheduled summarization has finished.
+
+        :param timeout: Maximum number of seconds to wait.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = [s.pending for s in self._summaries.values() if s.pending is not None]
+            if not pending:
+                return
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            wait(pending, timeout=remaining)
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+    def stats(self) -> MemoryStats:
+        """
+        Returns memory usage metrics for this process, including summaries.
+        """
+        with self._lock:
+            sessions = list(self._summaries.values())
+            return MemoryStats(
+                sessions=len(sessions),
+                messages=sum(len(s.buffer) for s in sessions),
+                approximate_bytes=sum(
+                    sys.getsizeof(s.summary) + sum(sys.getsizeof(m) for m in s.buffer) for s in sessions
+                ),
+            )
+
+    def _maybe_schedule(self, session_id: str, session: _SummarySession) -> None:
+        if session.pending is not None or session.token_total <= self._threshold:
+            return
+        fold_count = len(session.buffer) - self._max_recent
+        if fold_count <= 0:
+            return
+
+        to_fold = session.buffer[:fold_count]
+        session.pending = self._executor.submit(
+            self._fold, session_id, session, session.generation, session.summary, to_fold
+        )
+
+    def _fold(
+        self,
+        session_id: str,
+        session: _SummarySession,
+        generation: int,
+        previous_summary: str,
+        to_fold: List[str],
+    ) -> None:
+        try:
+            new_summary = self._summarize(previous_summary, to_fold)
+        except Exception as e:
+            logger.error("Summarization failed for session '%s': %s", session_id, e)
+            with self._lock:
+                session.pending = None
+            return
+
+        with self._lock:
+            session.pending = None
+            if session.generation != generation:
+                return
+            session.summary = new_summary
+            # Only appends happen while a fold is in flight, so the folded messages are still the head.
+            del session.buffer[:len(to_fold)]
+            session.token_total -= sum(session.buffer_tokens[:len(to_fold)])
+            del session.buffer_tokens[:len(to_fold)]
+            self._maybe_schedule(session_id, session)
@@ -0,0 +1,284 @@
+"""Retrieval-based MemoryService backed by an in-process NumPy vector index."""
+
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memory.memory_models import MemoryStats
+from memory.memory_service import MemoryService
+from utils.embeddings import hashing_embedding
+from utils.tracing import traced
+
+EmbeddingFunction = Callable[[str], Sequence[float]]
+
+DEFAULT_TOP_K = 5
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
+
+
+class VectorIndex:
+    """
+    Brute-force cosine-similarity index over an append-only float32 matrix.
+    Rows are addressed by insertion order.
+    """
+
+    def __init__(self, initial_capacity: int = 64) -> None:
+        self._capacity = max(1, initial_capacity)
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self._matrix is None else self._matrix.nbytes
+
+    def add(self, vector: Sequence[float]) -> int:
+        """
+        Appends a vector, growing the matrix geometrically when full.
+
+        :param vector: The embedding to add; it is L2-normalized on insert.
+        :return: The row number of the new vector.
+        :raises ValueError: If the dimensionality differs from earlier vectors.
+        """
+        row = _normalize(vector)
+        if self._matrix is None:
+            self._matrix = np.empty((self._capacity, row.shape[0]), dtype=np.float32)
+        elif row.shape[0] != self._matrix.shape[1]:
+            raise ValueError("Embedding dimension does not match the index.")
+        if self._size == self._matrix.shape[0]:
+            grown = np.empty((self._matrix.shape[0] * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size] = row
+        self._size += 1
+        return self._size - 1
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """
+        Returns the k most similar rows, best first.
+
+        :param query: The query embedding.
+        :param k: Number of results to return.
+        :return: A list of (row, cosine similarity) pairs.
+        """
+        if self._matrix is None or k <= 0:
+            return []
+        scores = self._matrix[:self._size] @ _normalize(query)
+        return self._top_k(np.arange(self._size), scores, k)
+
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if len(scores) > k:
+            # argpartition selects the top k in linear time; only those k get sorted.
+            selected = np.argpartition(-scores, k - 1)[:k]
+        else:
+            selected = np.arange(len(scores))
+        ordered = selected[np.argsort(-scores[selected], kind="stable")]
+        return [(int(rows[i]), float(scores[i])) for i in ordered]
+
+
+class LSHVectorIndex(VectorIndex):
+    """
+    Approximate index using random-hyperplane locality-sensitive hashing.
+
+    Vectors are bucketed by the sign pattern of n_bits random projections. A
+    search scores only rows in the query's bucket and the buckets one bit away,
+    falling back to brute force when they hold fewer than k rows.
+    """
+
+    def __init__(self, n_bits: int = 12, seed: int = 0, initial_capacity: int = 64) -> None:
+        super().__init__(initial_capacity)
+        if not 1 <= n_bits <= 62:
+            raise ValueError("n_bits must be between 1 and 62.")
+        self._n_bits = n_bits
+        self._seed = seed
+        self._planes: Optional[np.ndarray] = None
+        self._buckets: Dict[int, List[int]] = {}
+        self._bit_weights = 1 << np.arange(n_bits, dtype=np.int64)
+
+    def _signature(self, vector: np.ndarray) -> int:
+        if self._planes is None:
+            rng = np.random.default_rng(self._seed)
+            self._planes = rng.standard_normal((self._n_bits, vector.shape[0])).astype(np.float32)
+        bits = (self._planes @ vector) > 0
+        return int(bits.astype(np.int64) @ self._bit_weights)
+
+    def add(self, vector: Sequence[float]) -> int:
+        row = super().add(vector)
+        signature = self._signature(self._matrix[row])
+        self._buckets.setdefault(signature, []).append(row)
+        return row
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        if self._matrix is None or k <= 0:
+            return []
+        normalized = _normalize(query)
+        signature = self._signature(normalized)
+        candidates: List[int] = list(self._buckets.get(signature, ()))
+        for bit in range(self._n_bits):
+            candidates.extend(self._buckets.get(signature ^ (1 << bit), ()))
+        if len(candidates) < k:
+            return super().search(query, k)
+
+        rows = np.asarray(candidates, dtype=np.int64)
+        scores = self._matrix[rows] @ normalized
+        return self._top_k(rows, scores, k)
+
+
+class VectorMemoryService(MemoryService):
+    """
+    MemoryService that embeds every stored message so that retrieve_memory can
+    return only the messages most relevant to a query, instead of the full history.
+    """
+
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction = hashing_embedding,
+        use_ann: bool = False,
+        default_top_k: int = DEFAULT_TOP_K,
+    ) -> None:
+        """
+        Initializes the service with one vector index per session.
+
+        :param embedding_function: Maps a message to its embedding.
+        :param use_ann: Use the approximate LSH index instead of brute force.
+        :param default_top_k: Messages returned for a query when top_k is not given.
+        """
+        self._embed = embedding_function
+        self._use_ann = use_ann
+        self._default_top_k = default_top_k
+        self._histories: Dict[str, List[str]] = {}
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+
+    @traced("memory.store", **{"memory.backend": "vector"})
+    def store_message(self, session_id: str, message: str) -> None:
+        """
+        Stores a message and adds its embedding to the session's index.
+
+        :param session_id: Unique identifier for the chat session.
+        :param message: The message to be stored.
+        :raises ValueError: If session_id or message is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if not message:
+            raise ValueError("Message cannot be empty.")
+
+        embedding = self._embed(message)
+        with self._lock:
+            index = self._indexes.get(session_id)
+            if index is None:
+                index = self._indexes[session_id] = LSHVectorIndex() if self._use_ann else VectorIndex()
+                self._histories[session_id] = []
+            index.add(embedding)
+            self._histories[session_id].append(message)
+
+    @traced("memory.retrieve", **{"memory.backend": "vector"})
+    def retrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        query: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Retrieves the session history, or only the messages most relevant to a query.
+
+        :param session_id: Unique identifier for the chat session.
+        :param limit: Maximum number of messages to return; all when None.
+        :param offset: Number of messages to skip.
+        :param query: When given, return the top_k messages most similar to it.
+        :param top_k: Number of relevant messages to return for a query.
+        :return: A list of messages in conversation order.
+        :raises ValueError: If session_id is empty or the page bounds are negative.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset cannot be negative.")
+
+        if query:
+            history = self.search_memory(session_id, query, top_k)
+        else:
+            with self._lock:
+                history = list(self._histories.get(session_id, []))
+
+        end = None if limit is None else offset + limit
+        return history[offset:end]
+
+    def search_memory(self, session_id: str, query: str, top_k: Optional[int] = None) -> List[str]:
+        """
+        Returns the top_k stored messages most similar to the query, in conversation order.
+
+        :param session_id: Unique identifier for the chat session.
+        :param query: The text to compare stored messages against.
+        :param top_k: Number of messages to return; defaults to default_top_k.
+        :raises ValueError: If session_id or query is empty, or top_k is not positive.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if not query:
+            raise ValueError("Query cannot be empty.")
+        k = self._default_top_k if top_k is None else top_k
+        if k <= 0:
+            raise ValueError("top_k must be positive.")
+
+        embedding = self._embed(query)
+        with self._lock:
+            index = self._indexes.get(session_id)
+            if index is None:
+                return []
+            rows = sorted(row for row, _ in index.search(embedding, k))
+            history = self._histories[session_id]
+            return [history[row] for row in rows]
+
+    @traced("memory.clear", **{"memory.backend": "vector"})
+    def clear_memory(self, session_id: str) -> bool:
+        """
+        Removes the history and index for a specific session.
+
+        :param session_id: Unique identifier for the chat session.
+        :return: True if the session existed, False otherwise.
+        :raises ValueError: If session_id is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+
+        with self._lock:
+            self._histories.pop(session_id, None)
+            return self._indexes.pop(session_id, None) is not None
+
+    def stats(self) -> MemoryStats:
+        """
+        Returns memory usage metrics, including the size of the vector indexes.
+        """
+        with self._lock:
+            return MemoryStats(
+                sessions=len(self._histories),
+                messages=sum(len(history) for history in self._histories.values()),
+                approximate_bytes=sum(index.nbytes for index in self._indexes.values())
+                + sum(sys.getsizeof(m) for history in self._histories.values() for m in history),
+            )
+
+    async def aretrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        query: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Async counterpart of retrieve_memory.
+        """
+        return self.retrieve_memory(session_id, limit, offset, query=query, top_k=top_k)
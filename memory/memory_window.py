@@ -0,0 +1,224 @@
+"""Bounded in-process MemoryService with last-N, token-budget and idle-session eviction policies."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, Optional
+
+from memory.memory_models import MemoryPolicy, MemoryStats
+from memory.memory_service import MemoryService
+from utils.tracing import traced
+
+TokenCounter = Callable[[str], int]
+
+
+def count_words(text: str) -> int:
+    """
+    Default token counter: the number of whitespace-separated words.
+    """
+    return len(text.split())
+
+
+class _SessionWindow:
+    """
+    Per-session message window plus the bookkeeping needed for cheap metrics.
+    """
+
+    __slots__ = ("messages", "token_counts", "nbytes", "last_access")
+
+    def __init__(self, max_messages: Optional[int]) -> None:
+        self.messages: Deque[str] = deque(maxlen=max_messages)
+        self.token_counts: Deque[int] = deque(maxlen=max_messages)
+        self.nbytes = 0
+        self.last_access = time.monotonic()
+
+
+class WindowedMemoryService(MemoryService):
+    """
+    MemoryService whose memory is bounded by a MemoryPolicy.
+
+    Each session keeps at most max_messages in a fixed-size deque; retrieve_memory
+    returns the newest messages that fit in max_tokens; whole sessions are evicted
+    least-recently-used first beyond max_sessions, or once idle for session_ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[MemoryPolicy] = None,
+        token_counter: TokenCounter = count_words,
+    ) -> None:
+        """
+        Initializes the service with an empty, policy-bounded store.
+
+        :param policy: The limits to enforce; unbounded when omitted.
+        :param token_counter: Counts the tokens in a message for the token budget.
+        """
+        self._policy = policy or MemoryPolicy()
+        self._count_tokens = token_counter
+        self._windows: "OrderedDict[str, _SessionWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._messages = 0
+        self._bytes = 0
+        self._evicted_sessions = 0
+        self._dropped_messages = 0
+
+    @property
+    def policy(self) -> MemoryPolicy:
+        return self._policy
+
+    @traced("memory.store", **{"memory.backend": "window"})
+    def store_message(self, session_id: str, message: str) -> None:
+        """
+        Appends a message to the session window, dropping the oldest one when the window is full.
+
+        :param session_id: Unique identifier for the chat session.
+        :param message: The message to be stored.
+        :raises ValueError: If session_id or message is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if not message:
+            raise ValueError("Message cannot be empty.")
+
+        tokens = self._count_tokens(message)
+        nbytes = sys.getsizeof(message)
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now)
+            window = self._touch(session_id, now, create=True)
+
+            if window.messages.maxlen is not None and len(window.messages) == window.messages.maxlen:
+                dropped = window.messages[0]
+                dropped_bytes = sys.getsizeof(dropped)
+                window.nbytes -= dropped_bytes
+                self._bytes -= dropped_bytes
+                self._messages -= 1
+                self._dropped_messages += 1
+
+            window.messages.append(message)
+            window.token_counts.append(tokens)
+            window.nbytes += nbytes
+            self._bytes += nbytes
+            self._messages += 1
+
+            max_sessions = self._policy.max_sessions
+            while max_sessions is not None and len(self._windows) > max_sessions:
+                _, evicted = self._windows.popitem(last=False)
+                self._forget(evicted)
+
+    @traced("memory.retrieve", **{"memory.backend": "window"})
+    def retrieve_memory(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        """
+        Retrieves the session's window, trimmed to the newest messages within the token budget.
+
+        :param session_id: Unique identifier for the chat session.
+        :param limit: Maximum number of messages to return; all when None.
+        :param offset: Number of messages to skip from the start of the window.
+        :return: A list of messages, oldest first.
+        :raises ValueError: If session_id is empty or the page bounds are negative.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset cannot be negative.")
+
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now)
+            window = self._touch(session_id, now, create=False)
+            if window is None:
+                return []
+
+            start = 0
+            max_tokens = self._policy.max_tokens
+            if max_tokens is not None:
+                budget = max_tokens
+                start = len(window.token_counts)
+                for tokens in reversed(window.token_counts):
+                    if tokens > budget:
+                        break
+                    budget -= tokens
+                    start -= 1
+            history = list(window.messages)[start:]
+
+        end = None if limit is None else offset + limit
+        return history[offset:end]
+
+    @traced("memory.clear", **{"memory.backend": "window"})
+    def clear_memory(self, session_id: str) -> bool:
+        """
+        Removes the window for a specific session.
+
+        :param session_id: Unique identifier for the chat session.
+        :return: True if the session existed, False otherwise.
+        :raises ValueError: If session_id is empty.
+        """
+        if not session_id:
+            raise ValueError("Session ID cannot be empty.")
+
+        with self._lock:
+            window = self._windows.pop(session_id, None)
+            if window is None:
+                return False
+            self._messages -= len(window.messages)
+            self._bytes -= window.nbytes
+            return True
+
+    def evict_idle_sessions(self) -> int:
+        """
+        Evicts every session idle for longer than the policy's TTL.
+
+        :return: The number of sessions evicted.
+        """
+        with self._lock:
+            before = self._evicted_sessions
+            self._evict_idle(time.monotonic())
+            return self._evicted_sessions - before
+
+    def stats(self) -> MemoryStats:
+        """
+        Returns memory usage metrics for this process, maintained incrementally.
+        """
+        with self._lock:
+            return MemoryStats(
+                sessions=len(self._windows),
+                messages=self._messages,
+                approximate_bytes=self._bytes,
+                evicted_sessions=self._evicted_sessions,
+                dropped_messages=self._dropped_messages,
+            )
+
+    def _touch(self, session_id: str, now: float, create: bool) -> Optional[_SessionWindow]:
+        window = self._windows.get(session_id)
+        if window is None:
+            if not create:
+                return None
+            window = _SessionWindow(self._policy.max_messages)
+            self._windows[session_id] = window
+        else:
+            self._windows.move_to_end(session_id)
+        window.last_access = now
+        return window
+
+    def _evict_idle(self, now: float) -> None:
+        ttl = self._policy.session_ttl_seconds
+        if ttl is None:
+            return
+        # Windows are kept in access order, so idle sessions are always at the front.
+        while self._windows:
+            session_id, window = next(iter(self._windows.items()))
+            if now - window.last_access <= ttl:
+                break
+            del self._windows[session_id]
+            self._forget(window)
+
+    def _forget(self, window: _SessionWindow) -> None:
+        self._messages -= len(window.messages)
+        self._bytes -= window.nbytes
+        self._evicted_sessions += 1
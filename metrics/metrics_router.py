@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Response, status
+
+from metrics.metrics_service import METRICS_AVAILABLE, refresh_memory_gauges, render_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", include_in_schema=False)
+async def metrics_endpoint() -> Response:
+    """
+    Exposes every metric in the Prometheus text format for scraping.
+
+    Returns:
+        Response: The metrics, aggregated across workers in multiprocess mode.
+    """
+    if not METRICS_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metrics are unavailable: prometheus_client is not installed."
+        )
+    await refresh_memory_gauges(force=True)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
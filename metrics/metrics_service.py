@@ -0,0 +1,241 @@
+"""
+Prometheus metrics for capacity planning: request counts and latencies per
+router, LLM token usage, cache hit rates, memory sessions and tool errors.
+
+Metrics are recorded with prometheus_client. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers before
+they start: each worker then writes its values to memory-mapped files in that
+directory and /metrics aggregates the files of every worker. Call
+mark_worker_dead from gunicorn's child_exit hook so the gauges of exited
+workers are dropped:
+
+    # gunicorn.conf.py
+    from metrics.metrics_service import mark_worker_dead
+
+    def child_exit(server, worker):
+        mark_worker_dead(worker.pid)
+
+Without prometheus_client installed every recording function is a no-op and
+/metrics answers 503.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:
+    Counter = None
+
+from memory.memory_service import get_memory_service
+
+METRICS_AVAILABLE = Counter is not None
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+ROUTERS = ("chains", "agents", "tools", "memory", "jobs", "metrics")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MEMORY_REFRESH_SECONDS = float(os.getenv("METRICS_MEMORY_REFRESH_SECONDS", "15"))
+
+if METRICS_AVAILABLE:
+    HTTP_REQUESTS = Counter(
+        "http_requests_total", "HTTP requests handled, by router, method and status code.",
+        ["router", "method", "status"],
+    )
+    HTTP_REQUEST_DURATION = Histogram(
+        "http_request_duration_seconds", "Time to handle an HTTP request, including streamed bodies.",
+        ["router", "method"], buckets=LATENCY_BUCKETS,
+    )
+    LLM_TOKENS = Counter(
+        "llm_tokens_total", "Tokens sent to and generated by the LLM, by caller and kind.",
+        ["source", "kind"],
+    )
+    CACHE_LOOKUPS = Counter(
+        "cache_lookups_total", "Cache lookups, by cache and result (hit, semantic_hit or miss).",
+        ["cache", "result"],
+    )
+    TOOL_CALLS = Counter(
+        "tool_calls_total", "Tool calls, by tool and outcome (ok, error or timeout).",
+        ["tool", "outcome"],
+    )
+    # Per-worker values: in-memory backends hold different sessions in every worker.
+    MEMORY_SESSIONS = Gauge(
+        "memory_sessions", "Sessions held by the memory service.", multiprocess_mode="liveall",
+    )
+    MEMORY_MESSAGES = Gauge(
+        "memory_messages", "Messages held by the memory service.", multiprocess_mode="liveall",
+    )
+
+# Bound children by label values. Looking one up in a dict avoids the lock
+# prometheus_client takes on every labels() call; a racing first use at worst
+# calls labels() twice, which returns the same child.
+_children: Dict[Tuple[Any, ...], Any] = {}
+
+
+def _child(metric: Any, *labels: str) -> Any:
+    key = (metric, *labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def router_label(path: str) -> str:
+    """
+    Maps a request path to its router, so label values stay bounded.
+
+    :param path: The request path, e.g. "/chains/generate".
+    :return: The router name, or "other" for paths outside the known routers.
+    """
+    prefix = path.lstrip("/").split("/", 1)[0]
+    return prefix if prefix in ROUTERS else "other"
+
+
+def observe_request(router: str, method: str, status: int, seconds: float) -> None:
+    """
+    Records one handled HTTP request.
+
+    :param router: The router label, see router_label.
+    :param method: The HTTP method.
+    :param status: The response status code.
+    :param seconds: Time from receiving the request to sending the last body chunk.
+    """
+    if not METRICS_AVAILABLE:
+        return
+    _child(HTTP_REQUESTS, router, method, str(status)).inc()
+    _child(HTTP_REQUEST_DURATION, router, method).observe(seconds)
+
+
+def record_llm_tokens(source: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """
+    Records the tokens of one LLM call.
+
+    :param source: What made the call, e.g. "chain" or "agent".
+    :param prompt_tokens: Tokens in the prompt.
+    :param completion_tokens: Tokens in the generated text.
+    """
+    if not METRICS_AVAILABLE:
+        return
+    _child(LLM_TOKENS, source, "prompt").inc(prompt_tokens)
+    _child(LLM_TOKENS, source, "completion").inc(completion_tokens)
+
+
+def record_cache_lookup(cache: str, hit: bool, semantic: bool = False) -> None:
+    """
+    Records one cache lookup.
+
+    :param cache: The cache, e.g. "response" or "tool_memo".
+    :param hit: Whether the lookup found a value.
+    :param semantic: Whether the hit came from the semantic tier.
+    """
+    if not METRICS_AVAILABLE:
+        return
+    result = ("semantic_hit" if semantic else "hit") if hit else "miss"
+    _child(CACHE_LOOKUPS, cache, result).inc()
+
+
+def record_tool_call(tool: str, outcome: str) -> None:
+    """
+    Records the outcome of one tool call.
+
+    :param tool: The registered tool name.
+    :param outcome: "ok", "error" or "timeout".
+    """
+    if not METRICS_AVAILABLE:
+        return
+    _child(TOOL_CALLS, tool, outcome).inc()
+
+
+_memory_refreshed_at = 0.0
+_memory_refresh_lock = threading.Lock()
+
+
+async def refresh_memory_gauges(force: bool = False) -> None:
+    """
+    Updates the memory gauges from this process's memory service, at most
+    once every METRICS_MEMORY_REFRESH_SECONDS unless force is set.
+
+    :param force: Refresh even if the last refresh is recent, e.g. when scraped.
+    """
+    global _memory_refreshed_at
+    if not METRICS_AVAILABLE:
+        return
+    now = time.monotonic()
+    with _memory_refresh_lock:
+        if not force and now - _memory_refreshed_at < MEMORY_REFRESH_SECONDS:
+            return
+        _memory_refreshed_at = now
+    stats = await get_memory_service().astats()
+    MEMORY_SESSIONS.set(stats.sessions)
+    MEMORY_MESSAGES.set(stats.messages)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Renders every metric in the Prometheus text format. In multiprocess mode
+    the values of all workers are aggregated from PROMETHEUS_MULTIPROC_DIR.
+
+    :raises RuntimeError: If prometheus_client is not installed.
+    :return: The response body and its content type.
+    """
+    if not METRICS_AVAILABLE:
+        raise RuntimeError("prometheus_client is not installed.")
+    if os.getenv(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """
+    Drops the live gauges of an exited worker in multiprocess mode; call it
+    from gunicorn's child_exit hook.
+
+    :param pid: The exited worker's process id.
+    """
+    if METRICS_AVAILABLE and os.getenv(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that counts and times every HTTP request by router.
+
+    The duration runs until the last body chunk is sent, so streamed
+    responses are timed in full.
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not METRICS_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+        router = router_label(scope["path"])
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe_request(router, scope["method"], status, time.perf_counter() - start)
+            if router == "memory":
+                await refresh_memory_gauges()
@@ -0,0 +1,68 @@
+import pytest
+from pydantic import BaseModel
+
+from agents.agents_pool import AgentPool
+from tools.tools_registry import ToolRegistry
+
+
+class TextInput(BaseModel):
+    text: str
+
+
+def shout(text: str) -> str:
+    """Upper-cases text."""
+    return text.upper()
+
+
+@pytest.fixture
+def registry():
+    """
+    Fixture that returns a registry with one tool.
+    """
+    reg = ToolRegistry()
+    reg.register("shout", shout, TextInput)
+    return reg
+
+
+def test_pool_reuses_agents_for_the_same_tools(registry):
+    """
+    Test that repeated requests for the same tool set return the same prepared agent.
+    """
+    pool = AgentPool()
+    first = pool.get_agent(["shout"], registry)
+    assert pool.get_agent(["shout"], registry) is first
+    assert (pool.hits, pool.misses) == (1, 1)
+    assert "shout: Upper-cases text." in first.render_prompt("Q?", "")
+
+
+def test_pool_rebuilds_after_registry_changes(registry):
+    """
+    Test that re-registering a tool invalidates pooled agents built from the old descriptions.
+    """
+    pool = AgentPool()
+    first = pool.get_agent(["shout"], registry)
+    registry.register("shout", shout, TextInput, description="Shouts.")
+    second = pool.get_agent(["shout"], registry)
+    assert second is not first
+    assert "shout: Shouts." in second.render_prompt("Q?", "")
+
+
+def test_pool_evicts_least_recently_used(registry):
+    """
+    Test that the pool stays within max_size.
+    """
+    pool = AgentPool(max_size=2)
+    a = pool.get_agent(["shout"], registry)
+    pool.get_agent([], registry)
+    pool.get_agent(["shout"], registry)
+    pool.get_agent([shout], registry)
+    assert len(pool) == 2
+    assert pool.get_agent(["shout"], registry) is a
+
+
+def test_pool_rejects_invalid_size():
+    """
+    Test that a non-positive max_size raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        AgentPool(max_size=0)
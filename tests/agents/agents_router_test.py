@@ -1,9 +1,17 @@
+import asyncio
+import json
+import time
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 from main import create_app
+from agents.agents_models import AgentInput
+from agents.agents_pool import get_agent_pool
+from agents.agents_router import agent_query_stream_endpoint
 from agents.agents_service import run_agent_query
+from tools.tools_registry import get_tool_registry
+from chains.chains_llm import FakeStreamingLLM, get_llm_provider
 
 # --------------------------------------------------------------------------------
 # FIXTURES
@@ -89,4 +97,77 @@ class TestAgentQueryEndpoint:
 
         json_response = response.json()
         assert "detail" in json_response
-        assert "Internal service error" in json_response["detail"]
\ No newline at end of file
+        assert "Internal service error" in json_response["detail"]
+
+
+def test_agent_query_endpoint_returns_answer():
+    """
+    Test that /agents/query runs the agent loop with the configured LLM and tools.
+    """
+    app = create_app()
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]", "Final Answer: 4"])
+    app.dependency_overrides[get_llm_provider] = lambda: llm
+    response = TestClient(app).post("/agents/query", json={"user_query": "What is 2 + 2?"})
+    assert response.status_code == 200
+    assert response.json()["answer"] == "4"
+
+
+def test_agent_query_endpoint_rejects_missing_query(client):
+    """
+    Test that /agents/query validates the request body.
+    """
+    response = client.post("/agents/query", json={})
+    assert response.status_code == 422
+
+
+def test_agent_query_stream_endpoint_emits_sse_trace():
+    """
+    Test that /agents/query/stream sends the agent trace as server-sent events.
+    """
+    app = create_app()
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]", "Final Answer: 4"])
+    app.dependency_overrides[get_llm_provider] = lambda: llm
+    response = TestClient(app).post("/agents/query/stream", json={"user_query": "What is 2 + 2?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    names = [event for event, _ in events if event != "token"]
+    assert names == ["thought", "tool_call", "tool_result", "thought", "final_answer"]
+    assert events[-1][1] == {"step": 1, "answer": "4", "tokens_used": events[-1][1]["tokens_used"]}
+
+
+def test_agent_query_stream_endpoint_rejects_empty_query(client):
+    """
+    Test that an invalid query is rejected before the stream starts.
+    """
+    response = client.post("/agents/query/stream", json={"user_query": ""})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_agent_query_stream_endpoint_cancels_run_when_client_disconnects():
+    """
+    Test that the response is returned before the first LLM step finishes, and
+    that closing the stream early cancels the agent run.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[1 + 1]"], token_delay=0.3)
+    before = asyncio.all_tasks()
+    start = time.perf_counter()
+    response = await agent_query_stream_endpoint(
+        AgentInput(user_query="Loop"), llm_provider=llm,
+        tool_registry=get_tool_registry(), agent_pool=get_agent_pool(),
+    )
+    assert time.perf_counter() - start < 0.2
+
+    body = response.body_iterator
+    assert (await body.__anext__()).startswith("event: token")
+    started = asyncio.all_tasks() - before
+    assert started
+
+    await body.aclose()
+    await asyncio.sleep(0.05)
+    assert all(task.done() for task in started)
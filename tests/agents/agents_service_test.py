@@ -1,6 +1,24 @@
+import asyncio
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
-from agents.agents_service import create_basic_agent, run_agent_query
+from agents.agents_models import AgentBudget, ToolCall
+from agents.agents_service import (
+    Agent,
+    AgentBudgetExceededError,
+    AgentServiceError,
+    arun_agent,
+    arun_agent_query,
+    astream_agent,
+    create_basic_agent,
+    parse_agent_output,
+    run_agent_query,
+    run_tool_calls,
+)
+from chains.chains_cache import LRUCacheBackend
+from chains.chains_llm import FakeStreamingLLM
+from tools.tools_registry import ToolRegistry
 
 """
 Tests for agents.agents_service.py
@@ -79,4 +97,258 @@ def test_run_agent_query_with_empty_query(mock_agent):
     it might raise an error or return a default response.
     """
     with pytest.raises(ValueError, match="User query cannot be empty"):
-        run_agent_query(mock_agent, "")
\ No newline at end of file
+        run_agent_query(mock_agent, "")
+
+
+@pytest.mark.asyncio
+async def test_arun_agent_query_returns_response(mock_agent):
+    """
+    Test that the async entry point validates input and returns the agent's response.
+    """
+    llm = FakeStreamingLLM(responses=["Final Answer: Hello, user!"])
+    response = await arun_agent_query(mock_agent, "Hello, agent!", llm_provider=llm)
+    assert response == "Hello, user!"
+
+    with pytest.raises(AgentServiceError):
+        await arun_agent_query(mock_agent, "", llm_provider=llm)
+
+
+def _sleeping_tool(delay, log):
+    async def tool(tool_input: str) -> str:
+        log.append(("start", tool_input))
+        await asyncio.sleep(delay)
+        return f"result for {tool_input}"
+    return tool
+
+
+def test_parse_agent_output_extracts_calls_in_order():
+    """
+    Test that every Action line becomes a ToolCall, in order, and the final answer is detected.
+    """
+    calls, final = parse_agent_output(
+        "Thought: I need facts.\nAction: search[capital of France]\nAction: calculator[2 * 21]\n"
+    )
+    assert calls == [ToolCall(tool="search", tool_input="capital of France"),
+                     ToolCall(tool="calculator", tool_input="2 * 21")]
+    assert final is None
+    assert parse_agent_output("Final Answer: Paris") == ([], "Paris")
+
+
+@pytest.mark.asyncio
+async def test_run_tool_calls_runs_concurrently_in_deterministic_order():
+    """
+    Test that a step's tool calls overlap in time and results follow the planned order.
+    """
+    log = []
+    tools = {"slow": _sleeping_tool(0.2, log), "fast": _sleeping_tool(0.01, log)}
+    calls = [ToolCall(tool="slow", tool_input="a"), ToolCall(tool="fast", tool_input="b"),
+             ToolCall(tool="slow", tool_input="c")]
+
+    start = time.perf_counter()
+    results = await run_tool_calls(calls, tools, ToolRegistry(), timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.35
+    assert [r.tool_input for r in results] == ["a", "b", "c"]
+    assert [r.output for r in results] == ["result for a", "result for b", "result for c"]
+
+
+@pytest.mark.asyncio
+async def test_run_tool_calls_shared_deadline_and_errors():
+    """
+    Test that calls still running at the deadline time out while finished and failed calls are reported.
+    """
+    log = []
+    tools = {"slow": _sleeping_tool(5, log), "fast": _sleeping_tool(0, log)}
+    calls = [ToolCall(tool="slow", tool_input="a"), ToolCall(tool="fast", tool_input="b"),
+             ToolCall(tool="missing", tool_input="c")]
+
+    results = await run_tool_calls(calls, tools, ToolRegistry(), timeout=0.1)
+    assert "Timed out" in results[0].error
+    assert results[1].output == "result for b"
+    assert "Unknown tool" in results[2].error
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_feeds_parallel_observations_back():
+    """
+    Test that the loop runs a multi-call step through the registry and returns the final answer.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]\nAction: calculator[3 * 3]", "Final Answer: 4 and 9"])
+    agent = create_basic_agent(["calculator"])
+    run = await arun_agent(agent, "Compute both", llm_provider=llm)
+
+    assert run.final_answer == "4 and 9"
+    [first, second] = run.steps
+    assert [r.output for r in first.tool_results] == ["4.0", "9.0"]
+    assert second.tool_calls == []
+
+
+@pytest.mark.asyncio
+async def test_agent_loop_stops_at_step_limit():
+    """
+    Test that an agent that never answers raises AgentServiceError after max_steps.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[1 + 1]"])
+    with pytest.raises(AgentBudgetExceededError, match="step limit of 2") as exc_info:
+        await arun_agent_query(create_basic_agent(["calculator"]), "Loop", llm_provider=llm,
+                               budget=AgentBudget(max_steps=2))
+    assert len(exc_info.value.run.steps) == 2
+
+
+def test_run_agent_query_sync_wrapper():
+    """
+    Test that the blocking entry point runs the async loop to completion.
+    """
+    with patch("agents.agents_service.get_llm_provider", return_value=FakeStreamingLLM(responses=["Final Answer: ok"])):
+        assert run_agent_query(create_basic_agent([]), "Anything") == "ok"
+
+
+def test_agent_is_immutable_and_prerenders_prompt():
+    """
+    Test that Agent bindings cannot be mutated and the tool section of the prompt is rendered once.
+    """
+    agent = create_basic_agent(["calculator", "search"])
+    assert list(agent.tools) == ["calculator", "search"]
+    prompt = agent.render_prompt("Q?", "")
+    assert "calculator: " in prompt
+    assert prompt.endswith("Question: Q?\n")
+    with pytest.raises(AttributeError):
+        agent.name = "other"
+    with pytest.raises(TypeError):
+        agent.tools["new"] = "tool"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_one_agent():
+    """
+    Test that concurrent queries on one Agent keep their run state separate.
+    """
+    agent = create_basic_agent(["calculator"])
+    llm_a = FakeStreamingLLM(responses=["Action: calculator[1 + 1]", "Final Answer: a"])
+    llm_b = FakeStreamingLLM(responses=["Final Answer: b"])
+    run_a, run_b = await asyncio.gather(
+        arun_agent(agent, "first", llm_provider=llm_a), arun_agent(agent, "second", llm_provider=llm_b)
+    )
+    assert (run_a.final_answer, len(run_a.steps)) == ("a", 2)
+    assert (run_b.final_answer, len(run_b.steps)) == ("b", 1)
+
+
+def _counting_tool(counter):
+    async def tool(tool_input: str) -> str:
+        counter.append(tool_input)
+        return f"found {tool_input}"
+    return tool
+
+
+@pytest.mark.asyncio
+async def test_identical_tool_calls_are_memoized_within_a_run():
+    """
+    Test that repeated identical calls, in one step or across steps, execute once.
+    """
+    executed = []
+    agent = create_basic_agent([_counting_tool(executed)])
+    llm = FakeStreamingLLM(responses=[
+        "Action: tool[python]\nAction: tool[python]",
+        "Action: tool[ python ]\nAction: tool[rust]",
+        "Final Answer: done",
+    ])
+    run = await arun_agent(agent, "Search", llm_provider=llm, tool_memo=LRUCacheBackend())
+
+    assert executed == ["python", "rust"]
+    assert [r.cached for r in run.steps[1].tool_results] == [True, False]
+    assert run.steps[0].tool_results[1].output == "found python"
+
+
+@pytest.mark.asyncio
+async def test_shared_memo_serves_later_runs_until_expiry():
+    """
+    Test that the cross-run memo skips re-execution within its TTL.
+    """
+    executed = []
+    agent = create_basic_agent([_counting_tool(executed)])
+    memo = LRUCacheBackend(ttl_seconds=60)
+    for _ in range(2):
+        llm = FakeStreamingLLM(responses=["Action: tool[python]", "Final Answer: done"])
+        await arun_agent(agent, "Search", llm_provider=llm, tool_memo=memo)
+    assert executed == ["python"]
+
+    llm = FakeStreamingLLM(responses=["Action: tool[python]", "Final Answer: done"])
+    await arun_agent(agent, "Search", llm_provider=llm, tool_memo=LRUCacheBackend(ttl_seconds=60))
+    assert executed == ["python", "python"]
+
+
+@pytest.mark.asyncio
+async def test_final_answer_exits_before_running_tools():
+    """
+    Test that a reply containing a final answer ends the run without executing its actions.
+    """
+    executed = []
+    agent = create_basic_agent([_counting_tool(executed)])
+    llm = FakeStreamingLLM(responses=["Action: tool[x]\nFinal Answer: early"])
+    run = await arun_agent(agent, "Q", llm_provider=llm, tool_memo=LRUCacheBackend())
+    assert run.final_answer == "early"
+    assert executed == []
+
+
+@pytest.mark.asyncio
+async def test_token_budget_and_deadline_stop_the_run():
+    """
+    Test that exhausting the token budget or the deadline raises AgentBudgetExceededError.
+    """
+    agent = create_basic_agent(["calculator"])
+    llm = FakeStreamingLLM(responses=["Action: calculator[1 + 1]"])
+    with pytest.raises(AgentBudgetExceededError, match="token budget") as exc_info:
+        await arun_agent(agent, "Q", llm_provider=llm, budget=AgentBudget(max_steps=50, max_tokens=200))
+    assert exc_info.value.run.stop_reason.startswith("token budget")
+    assert exc_info.value.run.tokens_used <= 200
+
+    slow_llm = FakeStreamingLLM(responses=["Final Answer: too late"], token_delay=0.05)
+    with pytest.raises(AgentBudgetExceededError, match="deadline"):
+        await arun_agent(agent, "Q", llm_provider=slow_llm, budget=AgentBudget(deadline_seconds=0.05))
+
+
+@pytest.mark.asyncio
+async def test_astream_agent_yields_trace_events_in_order():
+    """
+    Test that streaming yields planner tokens, the thought, each tool call and result, then the answer.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]", "Final Answer: 4"])
+    agent = create_basic_agent(["calculator"])
+    events = [event async for event in astream_agent(agent, "What is 2 + 2?", llm_provider=llm)]
+
+    trace = [(e.event, e.step) for e in events if e.event != "token"]
+    assert trace == [("thought", 0), ("tool_call", 0), ("tool_result", 0), ("thought", 1), ("final_answer", 1)]
+    tokens = "".join(e.data["token"] for e in events if e.event == "token" and e.step == 0)
+    assert tokens == "Action: calculator[2 + 2]"
+    tool_result = next(e for e in events if e.event == "tool_result")
+    assert tool_result.data["output"] == "4.0" and tool_result.data["index"] == 0
+    assert events[-1].data["answer"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_astream_agent_ends_with_error_event_when_budget_runs_out():
+    """
+    Test that an exhausted budget is reported as a final error event instead of raised.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[1 + 1]"])
+    agent = create_basic_agent(["calculator"])
+    events = [e async for e in astream_agent(agent, "Loop", llm_provider=llm, budget=AgentBudget(max_steps=1))]
+
+    assert events[-1].event == "error"
+    assert "step limit" in events[-1].data["stop_reason"]
+    with pytest.raises(AgentServiceError):
+        await astream_agent(agent, "", llm_provider=llm).__anext__()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_run():
+    """
+    Test that identical in-flight agent queries are answered by a single run.
+    """
+    llm = FakeStreamingLLM(responses=["Final Answer: shared"], token_delay=0.01)
+    agent = create_basic_agent(["calculator"])
+    with patch("agents.agents_service.arun_agent", wraps=arun_agent) as wrapped:
+        answers = await asyncio.gather(*(arun_agent_query(agent, "Same question", llm_provider=llm) for _ in range(3)))
+    assert answers == ["shared"] * 3
+    assert wrapped.call_count == 1
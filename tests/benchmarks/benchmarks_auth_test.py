@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from benchmarks.benchmarks_auth import AUTH_MODES, main, make_tokens, measure_requests, measure_verify
+from utils.auth import KeyRing
+
+# -----------------------------------------------------------------------
+# Test suite for benchmarks.benchmarks_auth.py
+# -----------------------------------------------------------------------
+
+KEY_RING = KeyRing({"bench": "benchmark-secret-of-at-least-32-bytes"}, "bench")
+
+def test_measure_verify_reports_both_modes():
+    """
+    Test that per-call verification timings are reported with and without the cache.
+    """
+    tokens = make_tokens(4, KEY_RING)
+    uncached = measure_verify(tokens, 40, KEY_RING, cached=False)
+    cached = measure_verify(tokens, 40, KEY_RING, cached=True)
+
+    assert (uncached["mode"], cached["mode"]) == ("uncached", "cached")
+    assert uncached["calls"] == cached["calls"] == 40
+    assert cached["latency_us"]["p50"] > 0
+
+@pytest.mark.asyncio
+async def test_measure_requests_authenticates_every_request():
+    """
+    Test that every mode runs through the app without errors and reports its overhead.
+    """
+    results = await measure_requests(make_tokens(3, KEY_RING), KEY_RING, requests=6, concurrency=2)
+
+    assert [r["auth"] for r in results] == list(AUTH_MODES)
+    assert all(r["errors"] == 0 for r in results), results
+    assert results[0]["overhead_us"] == 0.0
+
+def test_main_writes_results(tmp_path):
+    """
+    Test that the CLI writes a JSON report with both measurements.
+    """
+    output = tmp_path / "auth.json"
+    main(["--tokens", "2", "--iterations", "10", "--requests", "4", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert [r["mode"] for r in report["verify"]] == ["uncached", "cached"]
+    assert len(report["requests"]) == len(AUTH_MODES)
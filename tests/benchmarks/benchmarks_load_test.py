@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from benchmarks.benchmarks_load import SCENARIOS, compare, main, run_benchmarks, summarize
+from chains.chains_llm import MockLLM
+
+# -----------------------------------------------------------------------
+# Test suite for benchmarks.benchmarks_load.py
+# -----------------------------------------------------------------------
+
+def test_summarize_reports_percentiles_and_rps():
+    """
+    Test that latencies are reduced to millisecond percentiles and requests per second.
+    """
+    summary = summarize([i / 1000 for i in range(1, 101)], errors=2, wall_seconds=2.0)
+    assert summary["requests"] == 100 and summary["errors"] == 2
+    assert summary["rps"] == 50.0
+    assert summary["latency_ms"]["p50"] == pytest.approx(50.5)
+    assert summary["latency_ms"]["p99"] == pytest.approx(99.01)
+
+@pytest.mark.asyncio
+async def test_run_benchmarks_drives_every_scenario_through_the_app():
+    """
+    Test that each scenario runs at each concurrency level and succeeds against the mock LLM.
+    """
+    llm = MockLLM(responses=["Final Answer: 4"], latency=0.001)
+    results = await run_benchmarks(list(SCENARIOS.values()), [1, 4], requests=8, llm=llm)
+
+    assert [(r["endpoint"], r["concurrency"]) for r in results] == [
+        (name, level) for name in SCENARIOS for level in (1, 4)
+    ]
+    for result in results:
+        assert result["requests"] == 8
+        assert result["errors"] == 0, result
+        assert result["rss_mb"] > 0
+
+def test_main_writes_results_and_compares(tmp_path, capsys):
+    """
+    Test that the CLI writes a JSON report and prints a comparison against a previous run.
+    """
+    baseline = tmp_path / "before.json"
+    args = ["--scenarios", "tools.calculator", "--concurrency", "2", "--requests", "5", "--latency", "0"]
+    main(args + ["--output", str(baseline)])
+    report = main(args + ["--compare", str(baseline), "--failure-rate", "1"])
+
+    saved = json.loads(baseline.read_text())
+    assert saved["results"][0]["endpoint"] == "tools.calculator"
+    assert saved["config"]["requests"] == 5
+    assert "Compared with" in capsys.readouterr().out
+    assert len(compare(report["results"], saved["results"])) == 1
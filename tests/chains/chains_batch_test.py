@@ -0,0 +1,152 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+
+from chains.chains_batch import chain_flight, run_chain_batch, run_chain_request
+from chains.chains_cache import LRUCacheBackend, ResponseCache
+from chains.chains_llm import FakeStreamingLLM
+from chains.chains_models import ChainRequest
+from chains.chains_registry import ChainRegistry
+from utils.singleflight import SingleFlight
+
+# -----------------------------------------------------------------------
+# Test suite for chains.chains_batch.py
+# -----------------------------------------------------------------------
+
+class ConcurrencyTrackingLLM(FakeStreamingLLM):
+    """
+    Fake LLM that echoes the prompt tail and records peak concurrency.
+    """
+
+    in_flight: int = 0
+    peak: int = 0
+    calls: int = 0
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later items finish first so ordering must not depend on completion order.
+            await asyncio.sleep(0.05 / (1 + len(prompt) % 5))
+            if "fail" in prompt:
+                raise RuntimeError("LLM failure")
+            return prompt.rsplit(": ", 1)[-1].upper()
+        finally:
+            self.in_flight -= 1
+
+@pytest.fixture
+def llm():
+    return ConcurrencyTrackingLLM()
+
+@pytest.mark.asyncio
+async def test_run_chain_batch_preserves_input_order(llm):
+    """
+    Test that results come back in input order regardless of completion order.
+    """
+    requests = [ChainRequest(user_input=f"item {'x' * i}", chain_name="simple") for i in range(6)]
+    results = await run_chain_batch(requests, llm, ChainRegistry(), max_concurrency=6)
+    assert [r.output for r in results] == [r.user_input.upper() for r in requests]
+    assert all(r.success for r in results)
+
+@pytest.mark.asyncio
+async def test_run_chain_batch_bounds_concurrency(llm):
+    """
+    Test that no more than max_concurrency LLM calls are in flight at once.
+    """
+    requests = [ChainRequest(user_input=f"item {i}", chain_name="simple") for i in range(10)]
+    await run_chain_batch(requests, llm, ChainRegistry(), max_concurrency=3)
+    assert 1 < llm.peak <= 3
+
+@pytest.mark.asyncio
+async def test_run_chain_batch_reports_per_item_errors(llm):
+    """
+    Test that failing items carry an error_message while the others succeed.
+    """
+    requests = [
+        ChainRequest(user_input="ok", chain_name="simple"),
+        ChainRequest(user_input="please fail", chain_name="simple"),
+        ChainRequest(user_input="ok", chain_name="missing"),
+    ]
+    results = await run_chain_batch(requests, llm, ChainRegistry())
+
+    assert results[0].success and results[0].output == "OK"
+    assert not results[1].success and results[1].error_message == "LLM failure"
+    assert not results[2].success and results[2].error_message == "Unknown chain: missing"
+
+@pytest.mark.asyncio
+async def test_run_chain_batch_uses_cache(llm):
+    """
+    Test that cached prompts are answered without an LLM call.
+    """
+    cache = ResponseCache(LRUCacheBackend())
+    registry = ChainRegistry()
+    requests = [ChainRequest(user_input="cached", chain_name="simple")]
+    await run_chain_batch(requests, llm, registry, cache=cache)
+    await run_chain_batch(requests, llm, registry, cache=cache)
+    assert cache.stats().hits == 1
+
+@pytest.mark.asyncio
+async def test_run_chain_batch_rejects_invalid_concurrency(llm):
+    """
+    Test that a non-positive concurrency limit raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        await run_chain_batch([], llm, ChainRegistry(), max_concurrency=0)
+
+@pytest.mark.asyncio
+async def test_run_chain_request_coalesces_identical_concurrent_requests(llm):
+    """
+    Test that concurrent identical requests share one LLM call, and normalized spellings count as identical.
+    """
+    registry = ChainRegistry()
+    inputs = ["popular prompt", "Popular  prompt", "popular prompt", "other prompt"]
+    outputs = await asyncio.gather(*(run_chain_request("simple", text, llm, registry) for text in inputs))
+
+    assert llm.calls == 2
+    assert outputs[:3] == ["POPULAR PROMPT"] * 3
+    assert chain_flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_run_chain_request_propagates_errors_to_every_waiter(llm):
+    """
+    Test that a failing shared call raises the same error in every coalesced caller.
+    """
+    registry = ChainRegistry()
+    results = await asyncio.gather(
+        *(run_chain_request("simple", "please fail", llm, registry) for _ in range(3)), return_exceptions=True
+    )
+    assert llm.calls == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "LLM failure" for r in results)
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_callers():
+    """
+    Test that cancelling one caller leaves the shared call running for the others,
+    and that it is cancelled once every caller is gone.
+    """
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_call() -> str:
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", slow_call))
+    second = asyncio.ensure_future(flight.do("key", slow_call))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "done"
+    assert flight.calls == 1 and flight.coalesced == 1
+
+    release.clear()
+    abandoned = asyncio.ensure_future(flight.do("key", slow_call))
+    await asyncio.sleep(0.01)
+    abandoned.cancel()
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 0
@@ -0,0 +1,179 @@
+import time
+
+import pytest
+
+from chains.chains_cache import (
+    CacheBackend,
+    LRUCacheBackend,
+    ResponseCache,
+    SQLiteCacheBackend,
+    SemanticIndex,
+    build_response_cache_from_env,
+    make_cache_key,
+    normalize_prompt,
+)
+from utils.embeddings import hashing_embedding
+
+# -----------------------------------------------------------------------
+# Test suite for chains.chains_cache.py
+# -----------------------------------------------------------------------
+
+LLM_KEY = '{"llm_type": "fake"}'
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """
+    Fixture that yields each exact-match backend implementation.
+    """
+    if request.param == "memory":
+        return LRUCacheBackend(max_size=2)
+    return SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_size=2)
+
+def test_normalize_prompt_collapses_whitespace_and_case():
+    """
+    Test that prompts differing only in case and spacing normalize identically.
+    """
+    assert normalize_prompt("  What IS   the\tanswer? ") == normalize_prompt("what is the\tanswer?")
+    assert normalize_prompt("  What IS   the answer? ") == "what is the answer?"
+
+def test_make_cache_key_depends_on_chain_and_llm():
+    """
+    Test that keys differ across chain names and LLM configs but not across prompt spacing.
+    """
+    base = make_cache_key("simple", "Hello world", LLM_KEY)
+    assert base == make_cache_key("simple", "hello   WORLD", LLM_KEY)
+    assert base != make_cache_key("other", "Hello world", LLM_KEY)
+    assert base != make_cache_key("simple", "Hello world", '{"llm_type": "other"}')
+
+def test_backend_round_trip_and_lru_eviction(backend):
+    """
+    Test that backends store values and evict the least recently used entry when full.
+    """
+    backend.set("a", "1")
+    backend.set("b", "2")
+    assert backend.get("a") == "1"
+    backend.set("c", "3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+    assert backend.evictions == 1
+    assert len(backend) == 2
+
+def test_backend_expires_entries_after_ttl(tmp_path):
+    """
+    Test that entries older than the TTL are treated as misses and counted as evictions.
+    """
+    for backend in (
+        LRUCacheBackend(ttl_seconds=0.01),
+        SQLiteCacheBackend(str(tmp_path / "ttl.sqlite3"), ttl_seconds=0.01),
+    ):
+        backend.set("a", "1")
+        time.sleep(0.02)
+        assert backend.get("a") is None
+        assert backend.evictions == 1
+
+def test_backend_len_excludes_expired_entries(tmp_path):
+    """
+    Test that both backends count only entries that have not expired.
+    """
+    for backend in (
+        LRUCacheBackend(ttl_seconds=0.05),
+        SQLiteCacheBackend(str(tmp_path / "len.sqlite3"), ttl_seconds=0.05),
+    ):
+        backend.set("old", "1")
+        time.sleep(0.1)
+        backend.set("new", "2")
+        assert len(backend) == 1
+
+def test_response_cache_exact_hits_and_stats():
+    """
+    Test that the exact tier answers repeated prompts and counts hits and misses.
+    """
+    cache = ResponseCache(LRUCacheBackend())
+    assert cache.get("simple", "Hello", LLM_KEY) is None
+    cache.set("simple", "Hello", LLM_KEY, "Hi!")
+
+    assert cache.get("simple", " hello ", LLM_KEY) == "Hi!"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+def test_response_cache_semantic_tier_matches_near_duplicates():
+    """
+    Test that the semantic tier answers prompts above the similarity threshold only.
+    """
+    cache = ResponseCache(LRUCacheBackend(), SemanticIndex(hashing_embedding, threshold=0.8))
+    cache.set("simple", "What is the capital city of France?", LLM_KEY, "Paris")
+
+    assert cache.get("simple", "What is the capital city of France", LLM_KEY) == "Paris"
+    assert cache.get("simple", "How do I bake sourdough bread?", LLM_KEY) is None
+    assert cache.get("other", "What is the capital city of France", LLM_KEY) is None
+    assert cache.stats().semantic_hits == 1
+
+def test_semantic_index_drops_oldest_entries_beyond_max_entries():
+    """
+    Test that each scope keeps its newest max_entries embeddings, overwriting the oldest.
+    """
+    index = SemanticIndex(hashing_embedding, threshold=0.99, max_entries=20)
+    prompts = [f"question number {i} about topic {i * 7}" for i in range(50)]
+    for i, prompt in enumerate(prompts):
+        index.add("scope", prompt, f"key-{i}")
+
+    assert index.lookup("scope", prompts[0]) is None
+    assert index.lookup("scope", prompts[29]) is None
+    assert [index.lookup("scope", p) for p in prompts[30:]] == [f"key-{i}" for i in range(30, 50)]
+    assert index.lookup("missing", prompts[49]) is None
+
+def test_semantic_index_discard_forgets_key():
+    """
+    Test that a discarded key is never returned again, even for its own prompt.
+    """
+    index = SemanticIndex(hashing_embedding, threshold=0.8)
+    index.add("scope", "What is the capital city of France?", "paris")
+    index.add("scope", "How do I bake sourdough bread?", "bread")
+    index.discard("scope", "paris")
+
+    assert index.lookup("scope", "What is the capital city of France?") is None
+    assert index.lookup("scope", "How do I bake sourdough bread?") == "bread"
+
+def test_incomplete_cache_backend_cannot_be_created():
+    """
+    Test that a backend missing part of the interface fails at construction.
+    """
+    class GetOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+def test_response_cache_clear_resets_everything():
+    """
+    Test that clear() drops entries and resets counters.
+    """
+    cache = ResponseCache(LRUCacheBackend())
+    cache.set("simple", "Hello", LLM_KEY, "Hi!")
+    cache.get("simple", "Hello", LLM_KEY)
+    cache.clear()
+    assert cache.stats().dict() == {
+        "hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "size": 0, "hit_rate": 0.0
+    }
+
+def test_build_response_cache_from_env(monkeypatch, tmp_path):
+    """
+    Test that environment variables select the backend and the semantic tier.
+    """
+    monkeypatch.setenv("CHAIN_CACHE_BACKEND", "none")
+    assert build_response_cache_from_env() is None
+
+    monkeypatch.setenv("CHAIN_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CHAIN_CACHE_SQLITE_PATH", str(tmp_path / "env.sqlite3"))
+    monkeypatch.setenv("CHAIN_CACHE_SEMANTIC_THRESHOLD", "0.9")
+    cache = build_response_cache_from_env()
+    assert isinstance(cache.backend, SQLiteCacheBackend)
+    assert cache.semantic_index is not None
+
+    monkeypatch.setenv("CHAIN_CACHE_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        build_response_cache_from_env()
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from chains.chains_llm import (
+    FakeStreamingLLM,
+    MockLLM,
+    MockLLMError,
+    get_llm_provider,
+    reset_llm_provider,
+    split_tokens,
+)
+from chains.chains_service import build_simple_chain
+
+# -----------------------------------------------------------------------
+# Test suite for chains.chains_llm.py
+# -----------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def clean_llm_provider():
+    """
+    Fixture that clears the cached process-wide provider around each test.
+    """
+    reset_llm_provider()
+    yield
+    reset_llm_provider()
+
+def test_split_tokens_round_trips_text():
+    """
+    Test that split_tokens preserves whitespace so tokens join back into the input.
+    """
+    text = "  Hello   streaming\nworld "
+    assert "".join(split_tokens(text)) == text
+
+def test_fake_streaming_llm_cycles_responses_and_emits_tokens():
+    """
+    Test that FakeStreamingLLM returns its responses in order and reports every token.
+    """
+    llm = FakeStreamingLLM(responses=["first answer", "second"])
+    run_manager = MagicMock()
+
+    assert llm._call("prompt", run_manager=run_manager) == "first answer"
+    assert [c.args[0] for c in run_manager.on_llm_new_token.call_args_list] == ["first ", "answer"]
+    assert llm("prompt") == "second"
+    assert llm("prompt") == "first answer"
+
+def test_get_llm_provider_defaults_to_fake(monkeypatch):
+    """
+    Test that get_llm_provider returns a shared fake provider when LLM_PROVIDER is unset.
+    """
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    provider = get_llm_provider()
+    assert isinstance(provider, FakeStreamingLLM)
+    assert get_llm_provider() is provider
+
+def test_get_llm_provider_unknown_name(monkeypatch):
+    """
+    Test that an unknown LLM_PROVIDER value raises a ValueError.
+    """
+    monkeypatch.setenv("LLM_PROVIDER", "does-not-exist")
+    with pytest.raises(ValueError):
+        get_llm_provider()
+
+def test_mock_llm_is_deterministic_per_seed():
+    """
+    Test that MockLLM draws the same latencies and failures for the same seed.
+    """
+    def draws(seed):
+        llm = MockLLM(latency=0.1, latency_distribution="lognormal", latency_spread=0.5, failure_rate=0.3, seed=seed)
+        return [llm._draw() for _ in range(50)]
+
+    assert draws(7) == draws(7)
+    assert draws(7) != draws(8)
+    failures = sum(fail for _, fail in draws(7))
+    assert 0 < failures < 50
+
+def test_mock_llm_applies_latency_and_token_rate():
+    """
+    Test that MockLLM waits for the first token and then streams at tokens_per_second.
+    """
+    llm = MockLLM(responses=["one two three four"], latency=0.02, tokens_per_second=200)
+    started = time.perf_counter()
+    assert llm("prompt") == "one two three four"
+    assert time.perf_counter() - started >= 0.02 + 4 / 200
+
+def test_mock_llm_injects_failures_through_chains():
+    """
+    Test that an always-failing MockLLM raises MockLLMError from a chain built with build_simple_chain.
+    """
+    chain = build_simple_chain(MockLLM(failure_rate=1.0))
+    with pytest.raises(MockLLMError):
+        asyncio.run(chain.arun("hello"))
+
+def test_mock_llm_rejects_invalid_settings():
+    """
+    Test that out-of-range MockLLM settings raise ValueError.
+    """
+    for settings in ({"latency_distribution": "pareto"}, {"failure_rate": 1.5}, {"tokens_per_second": 0}):
+        with pytest.raises(ValueError):
+            MockLLM(**settings)
+
+def test_get_llm_provider_builds_mock_from_env(monkeypatch):
+    """
+    Test that LLM_PROVIDER=mock configures a MockLLM from the MOCK_LLM_* variables.
+    """
+    monkeypatch.setenv("LLM_PROVIDER", "mock")
+    monkeypatch.setenv("MOCK_LLM_LATENCY", "0.25")
+    monkeypatch.setenv("MOCK_LLM_FAILURE_RATE", "0.1")
+    provider = get_llm_provider()
+    assert isinstance(provider, MockLLM)
+    assert provider.latency == 0.25 and provider.failure_rate == 0.1
@@ -1,5 +1,7 @@
 import pytest
 from pydantic import ValidationError
+
+from chains.chains_models import MAX_BATCH_SIZE, ChainBatchRequest
 # Replace the below imports with the actual model classes once known.
 # Example:
 # from chains.chains_models import ChainRequestModel, ChainResponseModel
@@ -92,4 +94,19 @@ def test_chain_response_model_invalid_input(invalid_response_data):
     # e.g.:
     # with pytest.raises(ValidationError):
     #     ChainResponseModel(**invalid_response_data)
-    pass
\ No newline at end of file
+    pass
+
+
+def test_chain_batch_request_validates_items():
+    """
+    Test that ChainBatchRequest rejects empty or oversized batches and bad concurrency limits.
+    """
+    item = {"user_input": "Hello", "chain_name": "simple"}
+    assert len(ChainBatchRequest(items=[item]).items) == 1
+
+    with pytest.raises(ValidationError):
+        ChainBatchRequest(items=[])
+    with pytest.raises(ValidationError):
+        ChainBatchRequest(items=[item] * (MAX_BATCH_SIZE + 1))
+    with pytest.raises(ValidationError):
+        ChainBatchRequest(items=[item], max_concurrency=0)
@@ -0,0 +1,87 @@
+import pytest
+from langchain.prompts import PromptTemplate
+
+from chains.chains_llm import FakeStreamingLLM
+from chains.chains_prompt import (
+    CompiledPrompt,
+    CompiledPromptTemplate,
+    compile_prompt,
+    count_tokens,
+    to_compiled_template,
+)
+from chains.chains_registry import ChainRegistry
+from chains.chains_service import build_simple_chain
+
+# -----------------------------------------------------------------------
+# Test suite for chains.chains_prompt.py
+# -----------------------------------------------------------------------
+
+@pytest.mark.parametrize("template, values", [
+    ("Question: {user_input}", {"user_input": "What is 2 + 2?"}),
+    ("{a}{b} and {a} again", {"a": "x", "b": 3}),
+    ("Literal {{braces}} around {name!r:>8}", {"name": "bob"}),
+    ("No slots at all", {}),
+])
+def test_compiled_prompt_matches_str_format(template, values):
+    """
+    Test that the compiled fast path formats exactly like str.format.
+    """
+    prompt = CompiledPrompt(template)
+    assert prompt.format(**values) == template.format(**values)
+
+def test_compiled_prompt_rejects_unsupported_fields():
+    """
+    Test that positional, attribute and malformed fields raise ValueError.
+    """
+    for template in ("Hi {}", "Hi {user.name}", "Hi {items[0]}", "Hi {unclosed"):
+        with pytest.raises(ValueError):
+            CompiledPrompt(template)
+
+def test_token_count_adds_variable_parts_to_cached_static_count():
+    """
+    Test that token counts are the cached static count plus the counts of the values.
+    """
+    prompt = CompiledPrompt("You are helpful. Question: {question}Context: {context}")
+    values = {"question": "how many tokens is this? ", "context": "some retrieved text"}
+    assert prompt.static_tokens == count_tokens("You are helpful. Question: ") + count_tokens("Context: ")
+    text, tokens = prompt.format_with_token_count(**values)
+    assert tokens == prompt.token_count(**values) == count_tokens(text)
+
+def test_token_count_is_an_upper_bound_across_boundaries():
+    """
+    Test that a token split across a segment boundary is over-counted by at most one per boundary.
+    """
+    prompt = CompiledPrompt("prefix{value}suffix\n{other}")
+    values = {"value": "middle", "other": "end"}
+    exact = count_tokens(prompt.format(**values))
+    assert exact < prompt.token_count(**values) <= exact + 3
+
+def test_partial_bakes_values_into_literals():
+    """
+    Test that partial() fixes a variable, escaping braces in its value.
+    """
+    prompt = CompiledPrompt("Tools: {tools}\nQ: {question}").partial(tools="calc {x}")
+    assert prompt.input_variables == ["question"]
+    assert prompt.format(question="why?") == "Tools: calc {x}\nQ: why?"
+    assert prompt.static_tokens == count_tokens("Tools: calc {x}\nQ: ")
+
+def test_compile_prompt_is_cached_and_templates_format_through_it():
+    """
+    Test that templates compile once and LangChain chains format through the compiled prompt.
+    """
+    assert compile_prompt("Hi {name}") is compile_prompt("Hi {name}")
+    template = to_compiled_template(PromptTemplate.from_template("Answer: {user_input}"))
+    assert isinstance(template, CompiledPromptTemplate)
+    assert template.compiled is compile_prompt("Answer: {user_input}")
+
+    chain = build_simple_chain(FakeStreamingLLM(), prompt=template)
+    assert chain.prompt.format_prompt(user_input="hi").to_string() == "Answer: hi"
+    assert template.token_count(user_input="hi") == count_tokens("Answer: hi")
+
+def test_registry_reports_prompt_token_counts():
+    """
+    Test that the registry counts a chain's prompt tokens without formatting it.
+    """
+    registry = ChainRegistry()
+    registry.register("short", "Be brief: {user_input}")
+    assert registry.prompt_token_count("short", "one two three") == count_tokens("Be brief: one two three")
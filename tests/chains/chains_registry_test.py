@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from chains.chains_llm import FakeStreamingLLM
+from chains.chains_registry import (
+    DEFAULT_CHAIN_NAME,
+    ChainNotFoundError,
+    ChainRegistry,
+    llm_config_key,
+)
+from chains.chains_service import build_simple_chain
+
+# -----------------------------------------------------------------------
+# Test suite for chains.chains_registry.py
+# -----------------------------------------------------------------------
+
+@pytest.fixture
+def registry():
+    """
+    Fixture that returns a fresh registry with only the default chain registered.
+    """
+    return ChainRegistry()
+
+def test_get_chain_builds_once_per_name_and_llm(registry):
+    """
+    Test that repeated lookups with the same LLM return the same compiled chain.
+    """
+    llm = FakeStreamingLLM()
+    with patch("chains.chains_registry.build_simple_chain", wraps=build_simple_chain) as mock_build:
+        first = registry.get_chain(DEFAULT_CHAIN_NAME, llm)
+        second = registry.get_chain(DEFAULT_CHAIN_NAME, llm)
+
+    assert first is second
+    mock_build.assert_called_once()
+
+def test_get_chain_binds_each_llm_instance(registry):
+    """
+    Test that equally configured LLM instances get their own chain, bound to that instance.
+    """
+    first_llm, second_llm = FakeStreamingLLM(responses=["a", "b"]), FakeStreamingLLM(responses=["a", "b"])
+    first = registry.get_chain(DEFAULT_CHAIN_NAME, first_llm)
+    second = registry.get_chain(DEFAULT_CHAIN_NAME, second_llm)
+
+    assert first is not second
+    assert first.llm is first_llm and second.llm is second_llm
+    assert first.predict(user_input="x") == second.predict(user_input="x") == "a"
+
+def test_compiled_chains_are_bounded():
+    """
+    Test that the oldest compiled chain is dropped once max_chains is exceeded.
+    """
+    registry = ChainRegistry(max_chains=2)
+    llms = [FakeStreamingLLM() for _ in range(3)]
+    chains = [registry.get_chain(DEFAULT_CHAIN_NAME, llm) for llm in llms]
+
+    assert len(registry) == 2
+    assert registry.get_chain(DEFAULT_CHAIN_NAME, llms[2]) is chains[2]
+    assert registry.get_chain(DEFAULT_CHAIN_NAME, llms[0]) is not chains[0]
+    with pytest.raises(ValueError):
+        ChainRegistry(max_chains=0)
+
+def test_get_chain_different_llm_config(registry):
+    """
+    Test that a different LLM configuration compiles a separate chain.
+    """
+    first = registry.get_chain(DEFAULT_CHAIN_NAME, FakeStreamingLLM(responses=["a"]))
+    second = registry.get_chain(DEFAULT_CHAIN_NAME, FakeStreamingLLM(responses=["b"]))
+    assert first is not second
+    assert len(registry) == 2
+
+def test_get_chain_unknown_name(registry):
+    """
+    Test that looking up an unregistered chain raises ChainNotFoundError.
+    """
+    with pytest.raises(ChainNotFoundError):
+        registry.get_chain("missing", FakeStreamingLLM())
+
+def test_register_uses_custom_template(registry):
+    """
+    Test that a registered template string is used by the compiled chain.
+    """
+    registry.register("shout", "Answer loudly: {user_input}")
+    chain = registry.get_chain("shout", FakeStreamingLLM())
+    assert chain.prompt.format(user_input="hi") == "Answer loudly: hi"
+    assert "shout" in registry.chain_names()
+
+def test_register_rejects_invalid_prompt(registry):
+    """
+    Test that prompts without exactly the user_input variable are rejected.
+    """
+    with pytest.raises(ValueError):
+        registry.register("bad", "Translate {text} to {language}")
+
+def test_register_replacement_invalidates_compiled_chain(registry):
+    """
+    Test that re-registering a chain name drops the chain compiled from the old prompt.
+    """
+    llm = FakeStreamingLLM()
+    old_chain = registry.get_chain(DEFAULT_CHAIN_NAME, llm)
+    registry.register(DEFAULT_CHAIN_NAME, "New prompt: {user_input}")
+    new_chain = registry.get_chain(DEFAULT_CHAIN_NAME, llm)
+    assert new_chain is not old_chain
+    assert new_chain.prompt.template == "New prompt: {user_input}"
+
+def test_invalidate_drops_compiled_chains(registry):
+    """
+    Test that invalidate() forces chains to be rebuilt on next use.
+    """
+    llm = FakeStreamingLLM()
+    registry.get_chain(DEFAULT_CHAIN_NAME, llm)
+    registry.invalidate()
+    assert len(registry) == 0
+
+def test_get_chain_concurrent_callers_share_one_chain(registry):
+    """
+    Test that concurrent lookups for the same key all receive one shared chain.
+    """
+    llm = FakeStreamingLLM()
+    results = []
+
+    def worker():
+        results.append(registry.get_chain(DEFAULT_CHAIN_NAME, llm))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(chain) for chain in results}) == 1
+
+def test_llm_config_key_is_stable():
+    """
+    Test that equal LLM configurations produce equal keys.
+    """
+    assert llm_config_key(FakeStreamingLLM()) == llm_config_key(FakeStreamingLLM())
+    assert llm_config_key(FakeStreamingLLM(token_delay=0.1)) != llm_config_key(FakeStreamingLLM())
@@ -1,7 +1,11 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+from chains.chains_cache import LRUCacheBackend, ResponseCache, get_response_cache
+from chains.chains_llm import FakeStreamingLLM, get_llm_provider
 from main import create_app
 
 
@@ -84,4 +88,138 @@ def test_generate_text_endpoint_error_handling(client, mocker):
     assert response.status_code == 500
     json_response = response.json()
     assert "detail" in json_response
-    assert json_response["detail"] == "Chain error"
\ No newline at end of file
+    assert json_response["detail"] == "Chain error"
+
+
+def _parse_sse(body):
+    """
+    Splits a text/event-stream body into (event, data) pairs.
+    """
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def streaming_client():
+    """
+    Fixture that wires a fake streaming LLM into the chains endpoints.
+    """
+    app = create_app()
+    app.dependency_overrides[get_llm_provider] = lambda: FakeStreamingLLM(
+        responses=["Streaming tokens one by one"]
+    )
+    cache = ResponseCache(LRUCacheBackend())
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    return TestClient(app)
+
+
+def test_generate_text_stream_endpoint_emits_tokens_then_metrics(streaming_client):
+    """
+    Test that the streaming endpoint sends one event per token followed by a metrics event.
+    """
+    response = streaming_client.post("/chains/generate/stream", json={"user_input": "Hello"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    tokens = [data["token"] for event, data in events if event == "token"]
+    assert "".join(tokens) == "Streaming tokens one by one"
+    assert events[-1][0] == "metrics"
+    assert events[-1][1]["token_count"] == len(tokens)
+    assert events[-1][1]["time_to_first_token"] is not None
+
+
+def test_generate_text_stream_endpoint_reports_llm_errors(streaming_client):
+    """
+    Test that an LLM failure mid-stream is reported as an error event.
+    """
+    failing_llm = FakeStreamingLLM()
+    streaming_client.app.dependency_overrides[get_llm_provider] = lambda: failing_llm
+
+    with patch.object(FakeStreamingLLM, "_acall", side_effect=RuntimeError("LLM down")):
+        response = streaming_client.post("/chains/generate/stream", json={"user_input": "Hello"})
+
+    assert response.status_code == 200
+    events = _parse_sse(response.text)
+    assert events[-1][0] == "error"
+
+
+def test_generate_text_stream_endpoint_rejects_empty_input(streaming_client):
+    """
+    Test that an empty prompt is rejected with 400 before the stream starts.
+    """
+    response = streaming_client.post("/chains/generate/stream", json={"user_input": ""})
+    assert response.status_code == 400
+    assert response.json()["detail"]
+
+def test_generate_text_endpoint_uses_registered_chain(streaming_client):
+    """
+    Test that /chains/generate runs the chain selected by chain_name.
+    """
+    response = streaming_client.post(
+        "/chains/generate",
+        json={"user_input": "Hello", "chain_name": "simple"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"generated_text": "Streaming tokens one by one"}
+
+
+def test_generate_text_endpoint_unknown_chain(streaming_client):
+    """
+    Test that an unregistered chain_name returns 404.
+    """
+    response = streaming_client.post(
+        "/chains/generate",
+        json={"user_input": "Hello", "chain_name": "does-not-exist"}
+    )
+    assert response.status_code == 404
+
+
+def test_generate_text_endpoint_serves_repeats_from_cache(streaming_client):
+    """
+    Test that a repeated prompt is answered from the response cache without calling the LLM.
+    """
+    request_data = {"user_input": "Cache me"}
+    first = streaming_client.post("/chains/generate", json=request_data)
+
+    with patch.object(FakeStreamingLLM, "_acall", side_effect=AssertionError("LLM called")):
+        second = streaming_client.post("/chains/generate", json={"user_input": "  cache ME "})
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    stats = streaming_client.get("/chains/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_generate_batch_endpoint_returns_results_in_order(streaming_client):
+    """
+    Test that the batch endpoint returns one ChainResponse per item, including per-item errors.
+    """
+    response = streaming_client.post(
+        "/chains/generate_batch",
+        json={
+            "items": [
+                {"user_input": "first", "chain_name": "simple"},
+                {"user_input": "second", "chain_name": "does-not-exist"},
+            ],
+            "max_concurrency": 2,
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {"output": "Streaming tokens one by one", "success": True, "error_message": None}
+    assert results[1]["success"] is False
+    assert results[1]["error_message"] == "Unknown chain: does-not-exist"
+
+
+def test_generate_batch_endpoint_rejects_empty_batch(streaming_client):
+    """
+    Test that an empty batch is rejected with 422.
+    """
+    response = streaming_client.post("/chains/generate_batch", json={"items": []})
+    assert response.status_code == 422
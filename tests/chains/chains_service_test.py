@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import MagicMock
-from chains.chains_service import build_simple_chain
+from langchain.llms.fake import FakeListLLM
+
+from chains.chains_llm import FakeStreamingLLM
+from chains.chains_service import ChainTokenStream, build_simple_chain
 
 # -----------------------------------------------------------------------
 # Test suite for build_simple_chain function in chains.chains_service.py
@@ -40,4 +43,47 @@ def test_build_simple_chain_with_invalid_provider():
         pass
 
     with pytest.raises(TypeError):
-        build_simple_chain(InvalidProvider())
\ No newline at end of file
+        build_simple_chain(InvalidProvider())
+
+
+# -----------------------------------------------------------------------
+# Test suite for ChainTokenStream in chains.chains_service.py
+# -----------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_chain_token_stream_yields_tokens_and_metrics():
+    """
+    Test that ChainTokenStream yields the LLM tokens in order and records timing metrics.
+    """
+    llm = FakeStreamingLLM(responses=["Paris is the capital."])
+    token_stream = ChainTokenStream(build_simple_chain(llm), "What is the capital of France?")
+
+    tokens = [token async for token in token_stream]
+
+    assert tokens == ["Paris ", "is ", "the ", "capital."]
+    assert token_stream.metrics.token_count == 4
+    assert token_stream.metrics.time_to_first_token is not None
+    assert token_stream.metrics.time_to_first_token <= token_stream.metrics.total_time
+    assert token_stream.metrics.tokens_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_chain_token_stream_non_streaming_llm_yields_single_chunk():
+    """
+    Test that an LLM which never emits tokens still produces its full output as one chunk.
+    """
+    llm = FakeListLLM(responses=["Whole answer"])
+    token_stream = ChainTokenStream(build_simple_chain(llm), "Question")
+
+    tokens = [token async for token in token_stream]
+
+    assert tokens == ["Whole answer"]
+    assert token_stream.metrics.token_count == 1
+
+
+def test_chain_token_stream_with_empty_input():
+    """
+    Test that ChainTokenStream rejects an empty user input.
+    """
+    with pytest.raises(ValueError):
+        ChainTokenStream(MagicMock(), "")
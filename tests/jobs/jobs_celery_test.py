@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("celery")
+
+from chains.chains_llm import reset_llm_provider
+from jobs.jobs_celery import CeleryJobQueue, create_celery_app
+from jobs.jobs_models import JobStatus
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """
+    Provides a Celery-backed queue using the in-memory broker and eager execution.
+    """
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    reset_llm_provider()
+    app = create_celery_app("memory://", "cache+memory://", eager=True)
+    return CeleryJobQueue(app)
+
+
+def test_celery_queue_runs_jobs_with_in_memory_broker(queue):
+    """
+    Test that a job submitted through Celery can be polled to its result.
+    """
+    job = queue.submit("chain_generate", {"user_input": "Hello"})
+    finished = queue.get(job.job_id)
+    assert finished.status == JobStatus.SUCCEEDED
+    assert "generated_text" in finished.result
+
+
+def test_celery_queue_reports_failed_jobs(queue):
+    """
+    Test that a job whose handler raises is reported as failed with the error message.
+    """
+    job = queue.submit("chain_generate", {"user_input": "Hello", "chain_name": "missing"})
+    finished = queue.get(job.job_id)
+    assert finished.status == JobStatus.FAILED
+    assert "Unknown chain" in finished.error
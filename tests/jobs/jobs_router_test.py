@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from chains.chains_llm import FakeStreamingLLM, get_llm_provider
+from jobs.jobs_service import LocalJobQueue, get_job_queue
+from main import create_app
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture to create a TestClient whose jobs run on a fresh local queue.
+    """
+    app = create_app()
+    queue = LocalJobQueue()
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    app.dependency_overrides[get_llm_provider] = lambda: FakeStreamingLLM(
+        responses=["Action: calculator[2 + 2]", "Final Answer: 4"]
+    )
+    yield TestClient(app)
+    queue.shutdown()
+
+
+def _parse_sse(body):
+    """
+    Splits a text/event-stream body into (event, data) pairs.
+    """
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_async_agent_query_returns_job_then_streams_result(client):
+    """
+    Test that /agents/query?async=true enqueues a job whose stream ends with the answer.
+    """
+    response = client.post("/agents/query", params={"async": "true"}, json={"user_query": "What is 2 + 2?"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+
+    events = _parse_sse(client.get(f"/jobs/{job_id}/stream").text)
+    assert events[-1][0] == "succeeded"
+    assert events[-1][1]["result"] == {"answer": "4"}
+
+    polled = client.get(f"/jobs/{job_id}")
+    assert polled.status_code == 200
+    assert polled.json()["status"] == "succeeded"
+
+
+def test_async_chain_generate_validates_chain_and_polls(client):
+    """
+    Test that /chains/generate?async=true rejects unknown chains and runs known ones as jobs.
+    """
+    missing = client.post("/chains/generate", params={"async": "true"},
+                          json={"user_input": "Hi", "chain_name": "missing"})
+    assert missing.status_code == 404
+
+    response = client.post("/chains/generate", params={"async": "true"}, json={"user_input": "Hi"})
+    assert response.status_code == 202
+    events = _parse_sse(client.get(f"/jobs/{response.json()['job_id']}/stream").text)
+    assert events[-1][0] == "succeeded"
+    assert "generated_text" in events[-1][1]["result"]
+
+
+def test_unknown_job_returns_404(client):
+    """
+    Test that polling or streaming an unknown job id returns 404.
+    """
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/stream").status_code == 404
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+from chains.chains_llm import FakeStreamingLLM
+from jobs.jobs_models import JobStatus
+from jobs.jobs_service import (
+    JOB_HANDLERS,
+    JobNotFoundError,
+    JobQueue,
+    LocalJobQueue,
+    run_agent_job,
+    run_chain_job,
+)
+
+
+@pytest.fixture
+def queue():
+    """
+    Provides a local job queue and stops its worker thread afterwards.
+    """
+    job_queue = LocalJobQueue(max_concurrency=2)
+    yield job_queue
+    job_queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_local_queue_runs_agent_job_off_the_calling_loop(queue):
+    """
+    Test that a submitted agent job runs on the queue's own thread and records its answer.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]", "Final Answer: 4"])
+    job = queue.submit("agent_query", {"user_query": "What is 2 + 2?"}, context={"llm_provider": llm})
+    assert job.status == JobStatus.QUEUED
+
+    finished = await queue.wait(job.job_id, timeout=5)
+    assert finished.status == JobStatus.SUCCEEDED
+    assert finished.result == {"answer": "4"}
+    assert finished.created_at <= finished.started_at <= finished.finished_at
+
+
+@pytest.mark.asyncio
+async def test_local_queue_records_failures_and_limits_concurrency(queue, monkeypatch):
+    """
+    Test that a failing handler marks its job failed and at most max_concurrency jobs run at once.
+    """
+    active, peak = 0, 0
+    release = threading.Event()
+
+    async def blocking_handler(payload):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        active -= 1
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    monkeypatch.setitem(JOB_HANDLERS, "blocking", blocking_handler)
+    jobs = [queue.submit("blocking", {"fail": i == 0}) for i in range(4)]
+    await asyncio.sleep(0.1)
+    release.set()
+    results = [await queue.wait(job.job_id, timeout=5) for job in jobs]
+
+    assert peak == 2
+    assert results[0].status == JobStatus.FAILED and results[0].error == "boom"
+    assert all(r.status == JobStatus.SUCCEEDED for r in results[1:])
+
+
+def test_local_queue_rejects_unknown_kinds_and_ids(queue):
+    """
+    Test that unknown job kinds raise ValueError and unknown ids raise JobNotFoundError.
+    """
+    with pytest.raises(ValueError):
+        queue.submit("nope", {})
+    with pytest.raises(JobNotFoundError):
+        queue.get("missing")
+
+
+def test_incomplete_job_queue_cannot_be_created():
+    """
+    Test that a backend missing part of the interface fails at construction.
+    """
+    class SubmitOnlyQueue(JobQueue):
+        def submit(self, kind, payload, context=None):
+            raise ValueError(kind)
+
+    with pytest.raises(TypeError):
+        SubmitOnlyQueue()
+
+
+@pytest.mark.asyncio
+async def test_local_queue_discards_oldest_finished_jobs(monkeypatch):
+    """
+    Test that only max_retained job records are kept once jobs finish.
+    """
+    async def quick_handler(payload):
+        return payload
+
+    monkeypatch.setitem(JOB_HANDLERS, "quick", quick_handler)
+    queue = LocalJobQueue(max_retained=2)
+    try:
+        first = queue.submit("quick", {"n": 1})
+        await queue.wait(first.job_id, timeout=5)
+        second = queue.submit("quick", {"n": 2})
+        await queue.wait(second.job_id, timeout=5)
+        third = queue.submit("quick", {"n": 3})
+        await queue.wait(third.job_id, timeout=5)
+        with pytest.raises(JobNotFoundError):
+            queue.get(first.job_id)
+        assert queue.get(second.job_id).result == {"n": 2}
+    finally:
+        queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_handlers_return_endpoint_response_bodies():
+    """
+    Test that job handlers produce the same bodies as the synchronous endpoints.
+    """
+    llm = FakeStreamingLLM(responses=["Final Answer: done"])
+    assert await run_agent_job({"user_query": "Q"}, llm_provider=llm) == {"answer": "done"}
+
+    chain_llm = FakeStreamingLLM(responses=["generated"])
+    assert await run_chain_job({"user_input": "Hi"}, llm_provider=chain_llm) == {"generated_text": "generated"}
+    with pytest.raises(ValueError, match="Unknown chain"):
+        await run_chain_job({"user_input": "Hi", "chain_name": "missing"}, llm_provider=chain_llm)
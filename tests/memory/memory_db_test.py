@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import inspect
+
+from memory.memory_db import DatabaseMemoryService, create_memory_engine
+from memory.memory_service import build_memory_service_from_env
+
+@pytest.fixture
+def db_service():
+    """
+    Fixture that returns a DatabaseMemoryService on a fresh in-memory SQLite database.
+    """
+    return DatabaseMemoryService(create_memory_engine("sqlite://"))
+
+def test_store_and_retrieve_messages_in_order(db_service):
+    """
+    Messages appended one by one and in bulk should come back in insertion order.
+    """
+    db_service.store_message("session", "User: Hi")
+    db_service.store_messages("session", ["AI: Hello", "User: How are you?"])
+
+    assert db_service.retrieve_memory("session") == ["User: Hi", "AI: Hello", "User: How are you?"]
+    assert db_service.retrieve_memory("other") == []
+
+def test_retrieve_memory_paginates(db_service):
+    """
+    limit/offset should page through the history.
+    """
+    db_service.store_messages("session", [f"message {i}" for i in range(5)])
+
+    assert db_service.retrieve_memory("session", limit=2) == ["message 0", "message 1"]
+    assert db_service.retrieve_memory("session", limit=2, offset=2) == ["message 2", "message 3"]
+    assert db_service.retrieve_memory("session", offset=4) == ["message 4"]
+    with pytest.raises(ValueError):
+        db_service.retrieve_memory("session", offset=-1)
+
+def test_clear_memory_deletes_only_that_session(db_service):
+    """
+    clear_memory() should remove a session's rows and leave others untouched.
+    """
+    db_service.store_message("a", "keep me")
+    db_service.store_message("b", "drop me")
+
+    assert db_service.clear_memory("b") is True
+    assert db_service.clear_memory("b") is False
+    assert db_service.retrieve_memory("a") == ["keep me"]
+
+def test_store_message_validation(db_service):
+    """
+    Empty session ids and messages should raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        db_service.store_message("", "message")
+    with pytest.raises(ValueError):
+        db_service.store_messages("session", ["ok", ""])
+
+def test_history_persists_across_service_instances(tmp_path):
+    """
+    A second service on the same database file should see the stored history.
+    """
+    url = f"sqlite:///{tmp_path / 'memory.db'}"
+    DatabaseMemoryService(create_memory_engine(url)).store_message("session", "persisted")
+
+    assert DatabaseMemoryService(create_memory_engine(url)).retrieve_memory("session") == ["persisted"]
+
+def test_conversation_index_is_created(db_service):
+    """
+    The (conversation_id, created_at) index should exist on the memory table.
+    """
+    indexes = inspect(db_service._engine).get_indexes("conversation_memories")
+    columns_by_name = {index["name"]: index["column_names"] for index in indexes}
+    assert columns_by_name["ix_conversation_memories_conversation_id_created_at"] == [
+        "conversation_id", "created_at"
+    ]
+
+@pytest.mark.asyncio
+async def test_async_api_round_trip(db_service):
+    """
+    The async API should run the database calls and return the same results.
+    """
+    await db_service.astore_messages("session", ["one", "two"])
+    assert await db_service.aretrieve_memory("session", limit=1, offset=1) == ["two"]
+    assert await db_service.aclear_memory("session") is True
+
+def test_build_memory_service_from_env_database(monkeypatch):
+    """
+    MEMORY_BACKEND=database should build a DatabaseMemoryService from DATABASE_URL.
+    """
+    monkeypatch.setenv("MEMORY_BACKEND", "database")
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    assert isinstance(build_memory_service_from_env(), DatabaseMemoryService)
+
+    monkeypatch.setenv("MEMORY_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        build_memory_service_from_env()
+
+
+def test_stats_counts_sessions_and_messages(db_service):
+    """
+    stats() should count distinct sessions and stored rows.
+    """
+    db_service.store_messages("a", ["one", "two"])
+    db_service.store_message("b", "three")
+
+    stats = db_service.stats()
+    assert (stats.sessions, stats.messages) == (2, 3)
+    assert stats.approximate_bytes == len("onetwothree")
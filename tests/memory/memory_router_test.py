@@ -4,6 +4,8 @@ from unittest.mock import patch, MagicMock
 
 # Import the FastAPI app factory
 from main import create_app
+from memory.memory_service import MemoryService, get_memory_service
+from memory.memory_vector import VectorMemoryService
 
 """
 Tests for memory_router.py
@@ -78,4 +80,56 @@ def test_clear_memory_endpoint_no_session(client):
     response = client.delete(f"/memory/{session_id}")
 
     # Depending on how the endpoint is implemented, it might return 200 or 404.
-    assert response.status_code in [200, 404]
\ No newline at end of file
+    assert response.status_code in [200, 404]
+
+
+def test_memory_endpoints_read_and_clear_service_state():
+    """
+    Test that the memory endpoints read from and clear the injected MemoryService.
+    """
+    app = create_app()
+    svc = MemoryService()
+    svc.store_message("router-session", "User: Hello")
+    app.dependency_overrides[get_memory_service] = lambda: svc
+    client = TestClient(app)
+
+    response = client.get("/memory/router-session")
+    assert response.status_code == 200
+    assert response.json() == {"session_id": "router-session", "memory": ["User: Hello"]}
+
+    assert client.delete("/memory/router-session").status_code == 200
+    assert client.get("/memory/router-session").json()["memory"] == []
+
+
+def test_memory_stats_endpoint_reports_usage():
+    """
+    Test that /memory/stats reports the injected service's metrics.
+    """
+    app = create_app()
+    svc = MemoryService()
+    svc.store_messages("stats-session", ["User: Hello", "AI: Hi"])
+    app.dependency_overrides[get_memory_service] = lambda: svc
+
+    response = TestClient(app).get("/memory/stats")
+    assert response.status_code == 200
+    assert response.json()["sessions"] == 1
+    assert response.json()["messages"] == 2
+
+
+def test_memory_query_requires_vector_backend():
+    """
+    Test that ?query= is served by the vector backend and rejected by others.
+    """
+    app = create_app()
+    svc = VectorMemoryService()
+    svc.store_messages("vector-session", ["User: I love hiking", "User: Pasta for dinner"])
+    app.dependency_overrides[get_memory_service] = lambda: svc
+    client = TestClient(app)
+
+    response = client.get("/memory/vector-session", params={"query": "hiking trip", "top_k": 1})
+    assert response.status_code == 200
+    assert response.json()["memory"] == ["User: I love hiking"]
+
+    app.dependency_overrides[get_memory_service] = lambda: MemoryService()
+    response = client.get("/memory/vector-session", params={"query": "hiking"})
+    assert response.status_code == 400
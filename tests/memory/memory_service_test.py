@@ -82,4 +82,42 @@ def test_store_message_none_message(memory_service_mock):
     """
     svc = MemoryService()
     with pytest.raises(ValueError):
-        svc.store_message("test_session", None)
\ No newline at end of file
+        svc.store_message("test_session", None)
+
+
+def test_clear_memory_removes_session():
+    """
+    clear_memory() should drop the session and report whether it existed.
+    """
+    svc = MemoryService()
+    svc.store_message("test_session", "Hello")
+
+    assert svc.clear_memory("test_session") is True
+    assert svc.retrieve_memory("test_session") == []
+    assert svc.clear_memory("test_session") is False
+
+@pytest.mark.asyncio
+async def test_async_memory_api_round_trip():
+    """
+    The async API should store, retrieve and clear messages like the sync one.
+    """
+    svc = MemoryService()
+    await svc.astore_message("async_session", "User: Hi")
+    await svc.astore_message("async_session", "AI: Hello")
+
+    assert await svc.aretrieve_memory("async_session") == ["User: Hi", "AI: Hello"]
+    assert await svc.aclear_memory("async_session") is True
+    assert await svc.aretrieve_memory("async_session") == []
+
+
+def test_retrieve_memory_paginates():
+    """
+    retrieve_memory() should support limit/offset paging.
+    """
+    svc = MemoryService()
+    svc.store_messages("page_session", ["m0", "m1", "m2", "m3"])
+
+    assert svc.retrieve_memory("page_session", limit=2, offset=1) == ["m1", "m2"]
+    assert svc.retrieve_memory("page_session", offset=3) == ["m3"]
+    with pytest.raises(ValueError):
+        svc.retrieve_memory("page_session", limit=-1)
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from chains.chains_llm import FakeStreamingLLM
+from memory.memory_summary import SUMMARY_PREFIX, SummaryBufferMemoryService, build_llm_summarizer
+
+class RecordingSummarizer:
+    """
+    Deterministic summarizer that records every call it receives.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, messages):
+        self.calls.append((summary, list(messages)))
+        return " | ".join(filter(None, [summary] + [m.split(":")[0] for m in messages]))
+
+@pytest.fixture
+def summarizer():
+    return RecordingSummarizer()
+
+def test_no_summarization_below_threshold(summarizer):
+    """
+    Messages under the token threshold should be returned verbatim without summarizing.
+    """
+    svc = SummaryBufferMemoryService(summarizer, max_recent_messages=2, token_threshold=100)
+    svc.store_messages("session", ["m1: hello", "m2: there", "m3: friend"])
+    svc.wait_for_summaries()
+
+    assert summarizer.calls == []
+    assert svc.retrieve_memory("session") == ["m1: hello", "m2: there", "m3: friend"]
+
+def test_overflow_folds_all_but_recent_messages(summarizer):
+    """
+    Past the threshold, all but the newest K messages should be folded into the summary.
+    """
+    svc = SummaryBufferMemoryService(summarizer, max_recent_messages=2, token_threshold=6)
+    for message in ["m1: a b", "m2: c d", "m3: e f", "m4: g h"]:
+        svc.store_message("session", message)
+        svc.wait_for_summaries()
+
+    assert summarizer.calls == [("", ["m1: a b"]), ("m1", ["m2: c d"])]
+    assert svc.get_summary("session") == "m1 | m2"
+    assert svc.retrieve_memory("session") == [SUMMARY_PREFIX + "m1 | m2", "m3: e f", "m4: g h"]
+
+def test_summary_is_built_incrementally(summarizer):
+    """
+    Later overflows should extend the previous summary rather than re-summarizing everything.
+    """
+    svc = SummaryBufferMemoryService(summarizer, max_recent_messages=1, token_threshold=4)
+    for i in range(1, 7):
+        svc.store_message("session", f"m{i}: x y")
+        svc.wait_for_summaries()
+
+    assert all(len(messages) <= 2 for _, messages in summarizer.calls)
+    assert svc.get_summary("session").startswith("m1 | m2")
+    assert svc.retrieve_memory("session")[-1] == "m6: x y"
+    assert len(svc.retrieve_memory("session")) <= 3
+
+def test_messages_remain_visible_while_summarizing():
+    """
+    Messages being summarized should stay in retrieve_memory until the fold completes.
+    """
+    release = threading.Event()
+
+    def slow_summarizer(summary, messages):
+        release.wait(timeout=5)
+        return "folded"
+
+    svc = SummaryBufferMemoryService(slow_summarizer, max_recent_messages=1, token_threshold=2)
+    svc.store_messages("session", ["one two", "three four"])
+    assert svc.retrieve_memory("session") == ["one two", "three four"]
+
+    release.set()
+    svc.wait_for_summaries()
+    assert svc.retrieve_memory("session") == [SUMMARY_PREFIX + "folded", "three four"]
+
+def test_failed_summarization_keeps_buffer():
+    """
+    A failing summarizer should leave the buffer intact.
+    """
+    def failing_summarizer(summary, messages):
+        raise RuntimeError("LLM down")
+
+    svc = SummaryBufferMemoryService(failing_summarizer, max_recent_messages=0, token_threshold=1)
+    svc.store_messages("session", ["one two"])
+    svc.wait_for_summaries()
+    assert svc.retrieve_memory("session") == ["one two"]
+
+def test_clear_memory_discards_session(summarizer):
+    """
+    clear_memory() should drop the summary and buffer.
+    """
+    svc = SummaryBufferMemoryService(summarizer, max_recent_messages=0, token_threshold=1)
+    svc.store_messages("session", ["one two"])
+    svc.wait_for_summaries()
+
+    assert svc.clear_memory("session") is True
+    assert svc.retrieve_memory("session") == []
+    assert svc.stats().sessions == 0
+
+def test_build_llm_summarizer_uses_llm():
+    """
+    The LLM summarizer should return the model's (stripped) output.
+    """
+    summarize = build_llm_summarizer(FakeStreamingLLM(responses=[" A short summary. "]))
+    assert summarize("", ["User: Hi", "AI: Hello"]) == "A short summary."
+
+    with pytest.raises(ValueError):
+        build_llm_summarizer(None)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from memory.memory_service import build_memory_service_from_env
+from memory.memory_vector import LSHVectorIndex, VectorIndex, VectorMemoryService
+from utils.embeddings import hashing_embedding
+
+MESSAGES = [
+    "User: My dog is called Biscuit and loves the park",
+    "AI: Biscuit sounds like a happy dog",
+    "User: I am planning a trip to Japan in April",
+    "AI: April is cherry blossom season in Japan",
+    "User: What is a good pasta recipe for dinner?",
+    "AI: Try a simple garlic and olive oil pasta",
+]
+
+@pytest.fixture(params=[False, True], ids=["brute-force", "lsh"])
+def vector_service(request):
+    """
+    Fixture that returns a populated VectorMemoryService for each index type.
+    """
+    svc = VectorMemoryService(use_ann=request.param)
+    svc.store_messages("session", MESSAGES)
+    return svc
+
+def test_hashing_embedding_is_deterministic_and_normalized():
+    """
+    The local embedding should be reproducible and unit length.
+    """
+    first = hashing_embedding("Cherry blossom season")
+    assert np.array_equal(first, hashing_embedding("Cherry blossom season"))
+    assert np.isclose(np.linalg.norm(first), 1.0)
+
+def test_query_returns_top_k_relevant_messages_in_order(vector_service):
+    """
+    A query should return the most relevant messages, in conversation order.
+    """
+    result = vector_service.retrieve_memory("session", query="trip to Japan in April", top_k=2)
+    assert result == [MESSAGES[2], MESSAGES[3]]
+
+def test_without_query_returns_full_history(vector_service):
+    """
+    Without a query, retrieve_memory should behave like the base service.
+    """
+    assert vector_service.retrieve_memory("session") == MESSAGES
+    assert vector_service.retrieve_memory("session", limit=2, offset=1) == MESSAGES[1:3]
+
+def test_search_memory_validation(vector_service):
+    """
+    Empty queries, bad top_k values and unknown sessions should be handled.
+    """
+    with pytest.raises(ValueError):
+        vector_service.search_memory("session", "")
+    with pytest.raises(ValueError):
+        vector_service.search_memory("session", "dog", top_k=0)
+    assert vector_service.search_memory("unknown", "dog") == []
+
+def test_clear_memory_drops_index(vector_service):
+    """
+    clear_memory() should remove both the history and the index.
+    """
+    assert vector_service.clear_memory("session") is True
+    assert vector_service.search_memory("session", "dog") == []
+    assert vector_service.stats().sessions == 0
+
+def test_vector_index_grows_and_finds_exact_match():
+    """
+    The brute-force index should grow past its initial capacity and rank exact matches first.
+    """
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((100, 16))
+    index = VectorIndex(initial_capacity=4)
+    for vector in vectors:
+        index.add(vector)
+
+    results = index.search(vectors[42], k=3)
+    assert len(index) == 100
+    assert results[0][0] == 42
+    assert np.isclose(results[0][1], 1.0)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+def test_lsh_index_recall_on_near_duplicates():
+    """
+    The LSH index should find slightly perturbed copies of stored vectors.
+    """
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((500, 32))
+    index = LSHVectorIndex(n_bits=8)
+    for vector in vectors:
+        index.add(vector)
+
+    hits = sum(
+        index.search(vectors[i] + 0.05 * rng.standard_normal(32), k=1)[0][0] == i for i in range(50)
+    )
+    assert hits >= 45
+
+def test_vector_index_rejects_dimension_mismatch():
+    """
+    Adding a vector with a different dimensionality should raise ValueError.
+    """
+    index = VectorIndex()
+    index.add([1.0, 0.0])
+    with pytest.raises(ValueError):
+        index.add([1.0, 0.0, 0.0])
+
+def test_build_memory_service_from_env_vector(monkeypatch):
+    """
+    MEMORY_BACKEND=vector should build a VectorMemoryService.
+    """
+    monkeypatch.setenv("MEMORY_BACKEND", "vector")
+    assert isinstance(build_memory_service_from_env(), VectorMemoryService)
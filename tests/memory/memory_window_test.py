@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from memory.memory_models import MemoryPolicy
+from memory.memory_service import build_memory_service_from_env
+from memory.memory_window import WindowedMemoryService
+
+def test_last_n_window_drops_oldest_messages():
+    """
+    Only the last max_messages messages should be kept per session.
+    """
+    svc = WindowedMemoryService(MemoryPolicy(max_messages=3))
+    for i in range(5):
+        svc.store_message("session", f"message {i}")
+
+    assert svc.retrieve_memory("session") == ["message 2", "message 3", "message 4"]
+    stats = svc.stats()
+    assert stats.messages == 3
+    assert stats.dropped_messages == 2
+
+def test_token_budget_returns_newest_messages_that_fit():
+    """
+    retrieve_memory() should return the newest messages whose token counts fit the budget.
+    """
+    svc = WindowedMemoryService(MemoryPolicy(max_tokens=5))
+    svc.store_messages("session", ["one two three", "four five", "six seven eight"])
+
+    assert svc.retrieve_memory("session") == ["four five", "six seven eight"]
+    assert svc.retrieve_memory("session", limit=1) == ["four five"]
+
+def test_lru_evicts_least_recently_used_session():
+    """
+    Beyond max_sessions, the least recently used session should be evicted.
+    """
+    svc = WindowedMemoryService(MemoryPolicy(max_sessions=2))
+    svc.store_message("a", "first")
+    svc.store_message("b", "second")
+    svc.retrieve_memory("a")
+    svc.store_message("c", "third")
+
+    assert svc.retrieve_memory("b") == []
+    assert svc.retrieve_memory("a") == ["first"]
+    assert svc.stats().evicted_sessions == 1
+
+def test_idle_sessions_expire_after_ttl():
+    """
+    Sessions idle for longer than session_ttl_seconds should be evicted.
+    """
+    svc = WindowedMemoryService(MemoryPolicy(session_ttl_seconds=0.02))
+    svc.store_message("idle", "hello")
+    time.sleep(0.03)
+
+    assert svc.evict_idle_sessions() == 1
+    assert svc.retrieve_memory("idle") == []
+    assert svc.stats().sessions == 0
+
+def test_stats_track_bytes_incrementally():
+    """
+    stats() should reflect stores, drops and clears without rescanning.
+    """
+    svc = WindowedMemoryService(MemoryPolicy(max_messages=2))
+    svc.store_messages("session", ["a", "b", "c"])
+    assert svc.stats().approximate_bytes > 0
+
+    assert svc.clear_memory("session") is True
+    stats = svc.stats()
+    assert (stats.sessions, stats.messages, stats.approximate_bytes) == (0, 0, 0)
+
+def test_validation_errors():
+    """
+    Empty ids and messages, and negative page bounds, should raise ValueError.
+    """
+    svc = WindowedMemoryService()
+    with pytest.raises(ValueError):
+        svc.store_message("", "message")
+    with pytest.raises(ValueError):
+        svc.store_message("session", "")
+    with pytest.raises(ValueError):
+        svc.retrieve_memory("session", offset=-1)
+
+def test_build_memory_service_from_env_windowed(monkeypatch):
+    """
+    MEMORY_BACKEND=windowed should build a WindowedMemoryService with the env policy.
+    """
+    monkeypatch.setenv("MEMORY_BACKEND", "windowed")
+    monkeypatch.setenv("MEMORY_MAX_MESSAGES", "10")
+    monkeypatch.setenv("MEMORY_SESSION_TTL", "60")
+
+    svc = build_memory_service_from_env()
+    assert isinstance(svc, WindowedMemoryService)
+    assert svc.policy.max_messages == 10
+    assert svc.policy.session_ttl_seconds == 60
+    assert svc.policy.max_tokens is None
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from fastapi.testclient import TestClient
+
+from main import create_app
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture that provides a client for a fresh app.
+    """
+    return TestClient(create_app())
+
+
+def test_metrics_endpoint_exposes_prometheus_text(client):
+    """
+    Test that /metrics serves the text format with the request and memory metrics.
+    """
+    client.get("/memory/metrics-session")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",router="memory",status="200"}' in body
+    assert "memory_sessions " in body
+    assert "http_request_duration_seconds_bucket" in body
+
+
+def test_metrics_endpoint_counts_itself_under_metrics_router(client):
+    """
+    Test that scrapes are labelled with their own router rather than other.
+    """
+    client.get("/metrics")
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",router="metrics",status="200"}' in body
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+pytest.importorskip("prometheus_client")
+
+from prometheus_client import REGISTRY
+
+from agents.agents_service import arun_agent, create_basic_agent
+from chains.chains_cache import LRUCacheBackend, ResponseCache
+from chains.chains_llm import FakeStreamingLLM
+from metrics.metrics_service import observe_request, record_cache_lookup, router_label
+from tools.tools_registry import ToolRegistry
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class FlakyInput(BaseModel):
+    value: str
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_router_label_bounds_paths_to_known_routers():
+    """
+    Test that paths map to their router and unknown paths share one label.
+    """
+    assert router_label("/chains/generate") == "chains"
+    assert router_label("/memory/abc/stats") == "memory"
+    assert router_label("/tools") == "tools"
+    assert router_label("/docs") == "other"
+    assert router_label("/") == "other"
+
+
+def test_observe_request_counts_and_times_requests():
+    """
+    Test that a request increments the counter and the latency histogram.
+    """
+    before = _value("http_requests_total", router="agents", method="POST", status="200")
+    count_before = _value("http_request_duration_seconds_count", router="agents", method="POST")
+
+    observe_request("agents", "POST", 200, 0.02)
+
+    assert _value("http_requests_total", router="agents", method="POST", status="200") == before + 1
+    assert _value("http_request_duration_seconds_count", router="agents", method="POST") == count_before + 1
+
+
+def test_record_cache_lookup_labels_each_result():
+    """
+    Test that hits, semantic hits and misses are counted under their own result label.
+    """
+    results = ("hit", "semantic_hit", "miss")
+    before = {result: _value("cache_lookups_total", cache="test", result=result) for result in results}
+
+    record_cache_lookup("test", hit=True)
+    record_cache_lookup("test", hit=True, semantic=True)
+    record_cache_lookup("test", hit=False, semantic=True)
+
+    after = {result: _value("cache_lookups_total", cache="test", result=result) for result in results}
+    assert after == {"hit": before["hit"] + 1, "semantic_hit": before["semantic_hit"] + 1, "miss": before["miss"] + 1}
+
+
+def test_response_cache_lookups_are_counted():
+    """
+    Test that response cache hits and misses are exported.
+    """
+    hits = _value("cache_lookups_total", cache="response", result="hit")
+    misses = _value("cache_lookups_total", cache="response", result="miss")
+    cache = ResponseCache(LRUCacheBackend())
+
+    cache.get("simple", "question", "llm")
+    cache.set("simple", "question", "llm", "answer")
+    cache.get("simple", "question", "llm")
+
+    assert _value("cache_lookups_total", cache="response", result="hit") == hits + 1
+    assert _value("cache_lookups_total", cache="response", result="miss") == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_tool_outcomes_are_counted():
+    """
+    Test that successful and failing tool calls are exported per tool.
+    """
+    def flaky(value: str) -> str:
+        if value == "bad":
+            raise ValueError("rejected")
+        return value
+
+    registry = ToolRegistry()
+    registry.register("flaky_metrics_tool", flaky, FlakyInput)
+
+    await registry.call("flaky_metrics_tool", "good")
+    with pytest.raises(ValueError):
+        await registry.call("flaky_metrics_tool", "bad")
+
+    assert _value("tool_calls_total", tool="flaky_metrics_tool", outcome="ok") == 1
+    assert _value("tool_calls_total", tool="flaky_metrics_tool", outcome="error") == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_llm_tokens_are_counted():
+    """
+    Test that an agent run adds its prompt and completion tokens to the counter.
+    """
+    prompt_before = _value("llm_tokens_total", source="agent", kind="prompt")
+    completion_before = _value("llm_tokens_total", source="agent", kind="completion")
+
+    llm = FakeStreamingLLM(responses=["Final Answer: four"])
+    run = await arun_agent(create_basic_agent(["calculator"]), "What is 2 + 2?", llm_provider=llm)
+
+    prompt = _value("llm_tokens_total", source="agent", kind="prompt") - prompt_before
+    completion = _value("llm_tokens_total", source="agent", kind="completion") - completion_before
+    assert completion == 3
+    assert prompt + completion == run.tokens_used
+
+
+def test_multiprocess_mode_aggregates_worker_files(tmp_path):
+    """
+    Test that counters written by separate worker processes are summed when rendered.
+    """
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = "from metrics.metrics_service import record_tool_call; record_tool_call('shared', 'error')"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, cwd=PROJECT_ROOT, check=True)
+
+    render = "from metrics.metrics_service import render_metrics; print(render_metrics()[0].decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", render], env=env, cwd=PROJECT_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'tool_calls_total{outcome="error",tool="shared"} 2.0' in output
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+
+from tools.tools_calculator import CompiledExpression, compile_expression
+from tools.tools_service import calculator_tool, vectorized_calculator_tool
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("2 + 3 * 4", 14),
+        ("(2 + 3) * 4", 20),
+        ("-2 ** 2", -4),
+        ("7 // 2 + 7 % 2", 4),
+        ("sqrt(16) + log(e)", 5),
+        ("max(1, 5, 3) - min(4, 2)", 3),
+        ("round(sin(pi / 2), 6)", 1),
+        ("log(8, 2)", 3),
+    ],
+)
+def test_calculator_tool_evaluates_supported_syntax(expression, expected):
+    """
+    Test that arithmetic, constants and whitelisted functions evaluate correctly.
+    """
+    assert calculator_tool(expression) == pytest.approx(expected)
+
+
+def test_calculator_tool_binds_variables():
+    """
+    Test that variables are read from the supplied bindings.
+    """
+    assert calculator_tool("a * x ** 2 + b", {"a": 2, "x": 3, "b": 1}) == 19
+    with pytest.raises(ValueError, match="Missing values"):
+        calculator_tool("a + b", {"a": 1})
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('echo hi')",
+        "(1).__class__",
+        "[1, 2, 3]",
+        "'a' * 3",
+        "x if y else z",
+        "sqrt(x=4)",
+        "print(1)",
+        "lambda: 1",
+        "1 < 2",
+        "_safe_pow(2, 3)",
+    ],
+)
+def test_calculator_tool_rejects_unsafe_syntax(expression):
+    """
+    Test that anything outside the whitelist is rejected before evaluation.
+    """
+    with pytest.raises(ValueError):
+        calculator_tool(expression)
+
+
+@pytest.mark.parametrize("expression", ["1 / 0", "sqrt(-1)", "9 ** 9 ** 9", "10.0 ** 400", "(-8) ** 0.5", "2 + * 3"])
+def test_calculator_tool_reports_invalid_computations(expression):
+    """
+    Test that undefined or runaway computations raise ValueError instead of hanging or crashing.
+    """
+    with pytest.raises(ValueError):
+        calculator_tool(expression)
+
+
+@pytest.mark.parametrize("expression", ["-" * 990 + "1", "+-" * 495 + "1", "-(" * 250 + "1" + ")" * 250])
+def test_calculator_tool_rejects_deeply_nested_expressions(expression):
+    """
+    Test that short but deeply nested expressions raise ValueError rather than RecursionError.
+    """
+    with pytest.raises(ValueError):
+        CompiledExpression(expression)
+
+
+def test_compile_expression_is_cached():
+    """
+    Test that the same expression text is compiled only once.
+    """
+    compile_expression.cache_clear()
+    first = compile_expression("x * 2 + 1")
+    assert compile_expression("x * 2 + 1") is first
+    assert first.variables == frozenset({"x"})
+    assert compile_expression.cache_info().hits == 1
+
+
+def test_vectorized_calculator_matches_scalar_evaluation():
+    """
+    Test that vectorized evaluation matches per-element scalar evaluation, with broadcasting.
+    """
+    x = np.linspace(0.1, 5, 50)
+    expression = "hypot(x, y) + log(x) * max(x, 1) - sqrt(abs(sin(x)))"
+    result = vectorized_calculator_tool(expression, {"x": x, "y": 2})
+
+    expected = [calculator_tool(expression, {"x": float(value), "y": 2}) for value in x]
+    assert result.shape == (50,)
+    np.testing.assert_allclose(result, expected)
+
+
+def test_vectorized_calculator_constant_expression_broadcasts():
+    """
+    Test that expressions not using every variable still return one result per binding.
+    """
+    result = CompiledExpression("pi * 2").evaluate_vectorized({"x": np.zeros(3)})
+    np.testing.assert_allclose(result, [math.tau] * 3)
+
+
+def test_vectorized_calculator_raises_on_invalid_elements():
+    """
+    Test that division by zero in any element raises ValueError rather than producing inf.
+    """
+    with pytest.raises(ValueError):
+        vectorized_calculator_tool("1 / x", {"x": np.array([1.0, 0.0])})
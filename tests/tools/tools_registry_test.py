@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from tools.tools_models import SearchResults
+from tools.tools_registry import LatencyHistogram, ToolNotFoundError, ToolRegistry, ToolTimeoutError, tool_registry
+
+
+class EchoInput(BaseModel):
+    text: str
+    times: int = 1
+
+
+def echo(text: str, times: int) -> str:
+    return text * times
+
+
+@pytest.fixture
+def registry():
+    """
+    Fixture that returns a registry with a blocking echo tool.
+    """
+    reg = ToolRegistry()
+    reg.register("echo", echo, EchoInput, description="Repeats text.")
+    return reg
+
+
+@pytest.mark.asyncio
+async def test_call_validates_input_against_schema(registry):
+    """
+    Test that string, mapping and model inputs are validated and passed as keyword arguments.
+    """
+    assert await registry.call("echo", "ab") == "ab"
+    assert await registry.call("echo", {"text": "ab", "times": "3"}) == "ababab"
+    assert await registry.call("echo", EchoInput(text="x", times=2)) == "xx"
+    with pytest.raises(ValueError):
+        await registry.call("echo", {"times": 2})
+    with pytest.raises(ToolNotFoundError):
+        await registry.call("missing", "x")
+
+
+@pytest.mark.asyncio
+async def test_call_enforces_timeout():
+    """
+    Test that a call exceeding the tool timeout raises ToolTimeoutError and is counted.
+    """
+    reg = ToolRegistry()
+
+    async def slow(text: str, times: int) -> str:
+        await asyncio.sleep(1)
+        return text
+
+    reg.register("slow", slow, EchoInput, timeout=0.05)
+    with pytest.raises(ToolTimeoutError):
+        await reg.call("slow", "x")
+    stats = reg.stats()["slow"]
+    assert stats.timeouts == 1 and stats.calls == 1 and stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_per_tool():
+    """
+    Test that a saturated slow tool does not delay calls to another tool.
+    """
+    reg = ToolRegistry()
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking(text: str, times: int) -> str:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+        return text
+
+    reg.register("slow", blocking, EchoInput, max_concurrency=2)
+    reg.register("echo", echo, EchoInput)
+
+    slow_calls = [asyncio.create_task(reg.call("slow", str(i))) for i in range(6)]
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    assert await reg.call("echo", "fast") == "fast"
+    fast_elapsed = time.perf_counter() - start
+
+    assert await asyncio.gather(*slow_calls) == [str(i) for i in range(6)]
+    assert peak == 2
+    assert fast_elapsed < 0.1
+
+
+@pytest.mark.asyncio
+async def test_timed_out_blocking_call_keeps_its_slot_until_it_finishes():
+    """
+    Test that a blocking call still running after its timeout counts against max_concurrency,
+    so later calls wait for the slot instead of queueing inside the executor.
+    """
+    reg = ToolRegistry()
+    release = threading.Event()
+    started = []
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking(text: str, times: int) -> str:
+        nonlocal running, peak
+        with lock:
+            started.append(text)
+            running += 1
+            peak = max(peak, running)
+        if text == "stuck":
+            release.wait(5)
+        with lock:
+            running -= 1
+        return text
+
+    tool = reg.register("stuck", blocking, EchoInput, timeout=0.05, max_concurrency=1)
+    with pytest.raises(ToolTimeoutError):
+        await reg.call("stuck", "stuck")
+    assert tool.semaphore().locked()
+    with pytest.raises(ToolTimeoutError):
+        await reg.call("stuck", "queued")
+    assert started == ["stuck"]
+
+    release.set()
+    for _ in range(100):
+        if not tool.semaphore().locked():
+            break
+        await asyncio.sleep(0.01)
+    assert await reg.call("stuck", "after") == "after"
+    assert started == ["stuck", "after"]
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_record_latency_and_errors(registry):
+    """
+    Test that every call is observed in the latency histogram and failures are counted.
+    """
+    await registry.call("echo", "a")
+    with pytest.raises(ValueError):
+        await registry.call("echo", {"text": "a", "times": "many"})
+
+    stats = registry.stats()["echo"]
+    assert stats.calls == 1
+    assert stats.latency_seconds.count == 1
+    assert stats.latency_seconds.buckets["+Inf"] == 1
+
+
+def test_latency_histogram_is_cumulative():
+    """
+    Test that histogram buckets count every observation at or below their bound.
+    """
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot.buckets == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot.count == 4
+    assert snapshot.sum == pytest.approx(5.65)
+
+
+def test_describe_includes_input_schema(registry):
+    """
+    Test that describe() exposes each tool's JSON schema and limits.
+    """
+    [description] = registry.describe()
+    assert description["name"] == "echo"
+    assert description["description"] == "Repeats text."
+    assert description["input_schema"]["required"] == ["text"]
+
+
+@pytest.mark.asyncio
+async def test_default_registry_runs_builtin_tools():
+    """
+    Test that the process-wide registry exposes the search and calculator tools.
+    """
+    assert tool_registry.tool_names() == ["calculator", "search"]
+    assert await tool_registry.call("calculator", {"expression": "x * 2", "variables": {"x": 4}}) == 8
+    assert isinstance(await tool_registry.call("search", "anything"), SearchResults)
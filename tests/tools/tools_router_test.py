@@ -86,4 +86,62 @@ def test_call_tool_raises_exception(client):
             json={"tool_input": "trigger error"}
         )
         # Depending on how exceptions are handled, could be 500 or custom status code
-        assert response.status_code == 500 or response.status_code == 400  # Adjust as needed
\ No newline at end of file
+        assert response.status_code == 500 or response.status_code == 400  # Adjust as needed
+
+
+def test_call_tool_endpoint_dispatches_by_name(client):
+    """
+    Test that /tools/call/{tool_name} awaits the named tool and returns its result.
+    """
+    response = client.post("/tools/call/calculator", params={"tool_input": "2 + 3 * 4"})
+    assert response.status_code == 200
+    assert response.json()["result"] == 14
+
+
+def test_call_tool_endpoint_unknown_tool(client):
+    """
+    Test that an unknown tool name returns 404.
+    """
+    response = client.post("/tools/call/unknown", params={"tool_input": "anything"})
+    assert response.status_code == 404
+
+
+def test_call_tool_endpoint_invalid_input(client):
+    """
+    Test that a tool's ValueError is reported as 400.
+    """
+    response = client.post("/tools/call/calculator", params={"tool_input": "2 + * 3"})
+    assert response.status_code == 400
+
+
+def test_call_tool_endpoint_rejects_deeply_nested_expression(client):
+    """
+    Test that an expression too deeply nested to compile is reported as 400, not 500.
+    """
+    response = client.post("/tools/call/calculator", params={"tool_input": "-" * 990 + "1"})
+    assert response.status_code == 400
+
+
+def test_call_tool_endpoint_accepts_json_arguments(client):
+    """
+    Test that a JSON body is validated against the tool's input schema.
+    """
+    response = client.post("/tools/call/calculator", json={"expression": "a + b", "variables": {"a": 1, "b": 2}})
+    assert response.status_code == 200
+    assert response.json()["result"] == 3
+
+    response = client.post("/tools/call/calculator", json={"variables": {"a": 1}})
+    assert response.status_code == 400
+
+
+def test_list_tools_and_stats(client):
+    """
+    Test that /tools lists registered tools and /tools/stats reports their metrics.
+    """
+    names = [tool["name"] for tool in client.get("/tools").json()]
+    assert names == ["calculator", "search"]
+
+    client.post("/tools/call/calculator", params={"tool_input": "1 + 1"})
+    stats = client.get("/tools/stats").json()
+    assert stats["calculator"]["calls"] >= 1
+    assert stats["calculator"]["latency_seconds"]["count"] >= 1
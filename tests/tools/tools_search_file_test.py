@@ -0,0 +1,105 @@
+import json
+import random
+
+import pytest
+
+from tools import tools_search
+from tools.tools_search import SearchIndex
+from tools.tools_search_file import MappedSearchIndex, main, write_search_index
+
+DOCUMENTS = [
+    ("https://example.com/cats", "Caring for cats", "Cats need food, water and play."),
+    ("https://example.com/dogs", "Training dogs", "Dogs learn tricks with treats."),
+    ("https://example.com/pets", "Pets at home", "Cats and dogs both make good pets."),
+    ("https://example.com/café", "Café guide", None),
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    """
+    Fixture that writes DOCUMENTS to an index file and returns its path.
+    """
+    path = str(tmp_path / "search.idx")
+    write_search_index(DOCUMENTS, path)
+    return path
+
+
+def test_mapped_index_matches_in_memory_index(index_path):
+    """
+    Test that the mapped index returns the same rankings as SearchIndex.
+    """
+    in_memory = SearchIndex()
+    for document in DOCUMENTS:
+        in_memory.add_document(*document)
+    mapped = MappedSearchIndex(index_path)
+
+    assert len(mapped) == 4
+    for query in ["cats", "cats dogs", "pets", "café", "giraffe"]:
+        assert mapped.search(query) == in_memory.search(query)
+    mapped.close()
+
+
+def test_mapped_index_pagination(tmp_path):
+    """
+    Test that offset/limit pages over the mapped index concatenate into the full ranking.
+    """
+    rng = random.Random(0)
+    documents = [
+        (f"https://example.com/{i}", f"doc {i}", " ".join(rng.choice(["alpha", "beta", "gamma"]) for _ in range(10)))
+        for i in range(100)
+    ]
+    path = str(tmp_path / "search.idx")
+    write_search_index(documents, path)
+    mapped = MappedSearchIndex(path)
+
+    full = mapped.search("alpha gamma", limit=100)
+    pages = [mapped.search("alpha gamma", limit=10, offset=offset) for offset in range(0, 100, 10)]
+    assert [item.url for page in pages for item in page.results] == [item.url for item in full.results]
+
+
+def test_write_search_index_replaces_duplicate_urls(tmp_path):
+    """
+    Test that later documents win when URLs repeat.
+    """
+    path = str(tmp_path / "search.idx")
+    count = write_search_index([("https://a", "old title", None), ("https://a", "new title", None)], path)
+    mapped = MappedSearchIndex(path)
+
+    assert count == 1
+    assert mapped.search("old").total_results == 0
+    assert mapped.search("new").results[0].title == "new title"
+
+
+def test_open_rejects_non_index_file(tmp_path):
+    """
+    Test that opening a file that is not an index raises ValueError.
+    """
+    path = tmp_path / "not-an-index"
+    path.write_bytes(b"x" * 200)
+    with pytest.raises(ValueError):
+        MappedSearchIndex(str(path))
+
+
+def test_cli_builds_index_from_jsonl(tmp_path, capsys):
+    """
+    Test that the builder CLI indexes a JSON Lines corpus.
+    """
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text("\n".join(
+        json.dumps({"url": url, "title": title, "description": description}) for url, title, description in DOCUMENTS
+    ))
+    output = str(tmp_path / "search.idx")
+    main([str(corpus), output])
+
+    assert "Indexed 4 documents" in capsys.readouterr().out
+    assert MappedSearchIndex(output).search("tricks").results[0].url == "https://example.com/dogs"
+
+
+def test_get_search_index_maps_configured_file(index_path, monkeypatch):
+    """
+    Test that SEARCH_INDEX_PATH makes get_search_index() open the file.
+    """
+    monkeypatch.setenv("SEARCH_INDEX_PATH", index_path)
+    monkeypatch.setattr(tools_search, "_search_index", None)
+    assert isinstance(tools_search.get_search_index(), MappedSearchIndex)
@@ -0,0 +1,200 @@
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from tools.tools_search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def index():
+    """
+    Fixture that returns a small populated SearchIndex.
+    """
+    idx = SearchIndex()
+    idx.add_document("https://example.com/cats", "Caring for cats", "Cats need food, water and play.")
+    idx.add_document("https://example.com/dogs", "Training dogs", "Dogs learn tricks with treats.")
+    idx.add_document("https://example.com/pets", "Pets at home", "Cats and dogs both make good pets.")
+    return idx
+
+
+def test_tokenize_lowercases_and_strips_punctuation():
+    """
+    Test that tokenize() returns lowercase word tokens.
+    """
+    assert tokenize("Hello, World! It's 2024.") == ["hello", "world", "it", "s", "2024"]
+
+
+def test_search_ranks_by_bm25(index):
+    """
+    Test that documents with more occurrences of rare query terms rank first.
+    """
+    results = index.search("cats")
+    assert results.total_results == 2
+    assert results.results[0].url == "https://example.com/cats"
+    assert results.results[0].score > results.results[1].score
+
+
+def test_search_combines_terms(index):
+    """
+    Test that multi-term queries match documents containing any term and favour those with all of them.
+    """
+    results = index.search("cats dogs")
+    assert results.total_results == 3
+    assert results.results[0].url == "https://example.com/pets"
+
+
+def test_search_without_matches_returns_empty(index):
+    """
+    Test that unknown terms and punctuation-only queries return no results.
+    """
+    assert index.search("giraffe").total_results == 0
+    assert index.search("!!!").results == []
+
+
+def test_pagination_pages_are_disjoint_and_ordered():
+    """
+    Test that offset/limit pages concatenate into the full ranking.
+    """
+    idx = SearchIndex()
+    rng = random.Random(0)
+    for i in range(200):
+        idx.add_document(f"https://example.com/{i}", f"doc {i}", " ".join(rng.choice(["alpha", "beta", "gamma"]) for _ in range(20)))
+
+    full = idx.search("alpha beta", limit=200)
+    pages = [idx.search("alpha beta", limit=25, offset=offset) for offset in range(0, 200, 25)]
+    assert [item.url for page in pages for item in page.results] == [item.url for item in full.results]
+    scores = [item.score for item in full.results]
+    assert scores == sorted(scores, reverse=True)
+    assert idx.search("alpha", limit=10, offset=500).results == []
+
+
+def test_tied_scores_sort_only_the_requested_page(monkeypatch):
+    """
+    Test that hits tying on score are paged by document number without sorting the whole match set.
+    """
+    idx = SearchIndex()
+    for i in range(2000):
+        idx.add_document(f"https://example.com/{i}", "same title", "same body")
+    sorted_sizes = []
+    real_lexsort = np.lexsort
+
+    def recording_lexsort(keys):
+        sorted_sizes.append(len(keys[0]))
+        return real_lexsort(keys)
+
+    monkeypatch.setattr(np, "lexsort", recording_lexsort)
+    page = idx.search("same", limit=10, offset=20)
+
+    assert page.total_results == 2000
+    assert [item.url for item in page.results] == [f"https://example.com/{i}" for i in range(20, 30)]
+    assert sorted_sizes == [30]
+
+
+def test_multi_term_queries_merge_without_sorting_candidates(monkeypatch):
+    """
+    Test that rare multi-term queries are merged by scatter-add rather than by sorting postings.
+    """
+    idx = SearchIndex()
+    for i in range(500):
+        idx.add_document(f"https://example.com/{i}", f"doc {i}", "alpha beta" if i % 100 == 0 else "filler")
+
+    def fail_unique(*args, **kwargs):
+        raise AssertionError("candidates were sorted")
+
+    monkeypatch.setattr(np, "unique", fail_unique)
+    results = idx.search("alpha beta")
+
+    assert results.total_results == 5
+    assert [item.url for item in results.results] == [f"https://example.com/{i}" for i in range(0, 500, 100)]
+
+
+def test_search_rejects_negative_paging(index):
+    """
+    Test that negative limit or offset raises ValueError.
+    """
+    with pytest.raises(ValueError):
+        index.search("cats", limit=-1)
+    with pytest.raises(ValueError):
+        index.search("cats", offset=-1)
+
+
+def test_remove_and_replace_documents(index):
+    """
+    Test that removed documents disappear and re-adding a URL replaces its content.
+    """
+    assert index.remove_document("https://example.com/cats") is True
+    assert index.remove_document("https://example.com/cats") is False
+    assert [item.url for item in index.search("cats").results] == ["https://example.com/pets"]
+
+    index.add_document("https://example.com/dogs", "Training dogs", "Now also about cats.")
+    assert len(index) == 2
+    assert index.search("tricks").total_results == 0
+    assert index.search("cats").total_results == 2
+
+
+def test_compact_preserves_results():
+    """
+    Test that compaction after many removals keeps rankings and document counts intact.
+    """
+    idx = SearchIndex()
+    for i in range(3000):
+        idx.add_document(f"https://example.com/{i}", f"title {i}", "shared" + " rare" * (i % 3))
+    for i in range(0, 3000, 2):
+        idx.remove_document(f"https://example.com/{i}")
+    before = idx.search("rare", limit=5)
+    idx.compact()
+    after = idx.search("rare", limit=5)
+
+    assert len(idx) == 1500
+    assert after.total_results == before.total_results
+    assert [item.url for item in after.results] == [item.url for item in before.results]
+
+
+def test_search_is_consistent_during_concurrent_writes():
+    """
+    Test that searches running while documents are added, removed and compacted
+    always see the stable documents and never fail.
+    """
+    idx = SearchIndex()
+    for i in range(200):
+        idx.add_document(f"https://example.com/stable/{i}", f"stable {i}", "anchor text")
+    expected = [item.url for item in idx.search("anchor", limit=200).results]
+    errors = []
+    done = threading.Event()
+
+    def write():
+        for i in range(3000):
+            idx.add_document(f"https://example.com/churn/{i}", f"churn {i}", "anchor churn" * (i % 3))
+            if i >= 10:
+                idx.remove_document(f"https://example.com/churn/{i - 10}")
+        done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                urls = [item.url for item in idx.search("anchor stable", limit=200).results]
+                assert sorted(u for u in urls if "/stable/" in u) == sorted(expected)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(idx) == 210
+    assert idx.search("anchor", limit=200).total_results == 200 + sum(1 for i in range(2990, 3000) if i % 3)
+
+
+def test_add_document_validation(index):
+    """
+    Test that documents without a URL or title are rejected.
+    """
+    with pytest.raises(ValueError):
+        index.add_document("", "title")
+    with pytest.raises(ValueError):
+        index.add_document("https://example.com/x", "")
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from tools.tools_service import search_tool, calculator_tool
+from tools.tools_models import SearchQuery, SearchResults
+from tools.tools_search import SearchIndex
+from tools.tools_service import acalculator_tool, asearch_tool, calculator_tool, search_tool
 
 
 @pytest.mark.describe("Tools Service - search_tool function")
@@ -15,11 +17,7 @@ class TestSearchTool:
         # For demonstration, we don't patch any external call since none is specified
         result = search_tool(query)
         assert result is not None, "Expected a result from search_tool"
-        # This assertion depends on what the function actually returns
-        # Adjust accordingly to match expected shape of the result
-        assert isinstance(result, list) or isinstance(result, str), (
-            "Expected search_tool() to return a list or string of results"
-        )
+        assert isinstance(result, SearchResults), "Expected search_tool() to return SearchResults"
 
     # -------------------------------------------------------------------------
     # Test how the function behaves when given an empty query
@@ -79,4 +77,42 @@ class TestCalculatorTool:
     def test_calculator_tool_parentheses(self):
         expression = "(2 + 3) * 4"
         result = calculator_tool(expression)
-        assert result == 20, "Expected calculator_tool to evaluate '(2 + 3) * 4' to 20"
\ No newline at end of file
+        assert result == 20, "Expected calculator_tool to evaluate '(2 + 3) * 4' to 20"
+
+
+@pytest.mark.asyncio
+async def test_async_tools_match_sync_results():
+    """
+    Test that the async tool wrappers return the same results as the sync tools.
+    """
+    assert await acalculator_tool("(2 + 3) * 4") == calculator_tool("(2 + 3) * 4")
+    assert await asearch_tool("sample query") == search_tool("sample query")
+    with pytest.raises(ValueError):
+        await acalculator_tool("")
+
+
+@pytest.mark.asyncio
+async def test_async_calculator_binds_variables():
+    """
+    Test that acalculator_tool forwards variable bindings like calculator_tool.
+    """
+    variables = {"a": 2, "x": 3, "b": 1}
+    assert await acalculator_tool("a * x + b", variables) == calculator_tool("a * x + b", variables) == 7
+    with pytest.raises(ValueError):
+        await acalculator_tool("a + 1")
+
+
+def test_search_tool_uses_search_index_and_pagination():
+    """
+    Test that search_tool queries the process-wide index and honours SearchQuery paging.
+    """
+    index = SearchIndex()
+    for i in range(5):
+        index.add_document(f"https://example.com/{i}", f"python guide {i}", "python " * (i + 1))
+    with patch("tools.tools_service.get_search_index", return_value=index):
+        first = search_tool("python", limit=2)
+        second = search_tool(SearchQuery(query="python", limit=2, offset=2))
+
+    assert first.total_results == second.total_results == 5
+    assert [item.url for item in first.results] == ["https://example.com/4", "https://example.com/3"]
+    assert [item.url for item in second.results] == ["https://example.com/2", "https://example.com/1"]
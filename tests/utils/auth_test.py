@@ -0,0 +1,233 @@
+import time
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+import utils.auth as auth
+from main import create_app
+from utils.auth import (
+    ALGORITHM,
+    DEFAULT_KID,
+    KeyRing,
+    VerifiedTokenCache,
+    build_key_ring_from_env,
+    build_token_cache_from_env,
+    create_jwt,
+    decode_jwt,
+    get_key_ring,
+    get_token_cache,
+    set_key_ring,
+    set_token_cache,
+    verify_jwt,
+)
+
+OLD_SECRET = "old-secret-with-at-least-thirty-two-bytes"
+NEW_SECRET = "new-secret-with-at-least-thirty-two-bytes"
+
+
+@pytest.fixture
+def key_ring():
+    """
+    Provides a ring with an old and a new key, signing with the new one.
+    """
+    return KeyRing({"old": OLD_SECRET, "new": NEW_SECRET}, "new")
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """
+    Counts full signature verifications.
+    """
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_create_jwt_signs_with_active_kid(key_ring):
+    """
+    Test that new tokens carry the active key id and verify.
+    """
+    token = create_jwt("user-1", key_ring)
+
+    assert jwt.get_unverified_header(token)["kid"] == "new"
+    assert verify_jwt(token, key_ring, VerifiedTokenCache())["sub"] == "user-1"
+
+
+def test_tokens_signed_with_any_active_key_verify(key_ring):
+    """
+    Test that tokens signed with an older key still verify until that key is removed.
+    """
+    old_token = jwt.encode({"sub": "user-2"}, OLD_SECRET, algorithm=ALGORITHM, headers={"kid": "old"})
+    assert decode_jwt(old_token, key_ring)["sub"] == "user-2"
+
+    key_ring.remove("old")
+    with pytest.raises(ValueError):
+        decode_jwt(old_token, key_ring)
+    with pytest.raises(ValueError):
+        key_ring.remove("new")
+
+
+def test_unknown_kid_and_legacy_tokens(key_ring):
+    """
+    Test that unknown key ids are rejected and tokens without kid use the default key.
+    """
+    forged = jwt.encode({"sub": "x"}, NEW_SECRET, algorithm=ALGORITHM, headers={"kid": "missing"})
+    with pytest.raises(ValueError, match="Invalid or expired token"):
+        decode_jwt(forged, key_ring)
+
+    legacy_ring = KeyRing({DEFAULT_KID: OLD_SECRET, "new": NEW_SECRET}, "new")
+    legacy = jwt.encode({"sub": "legacy"}, OLD_SECRET, algorithm=ALGORITHM)
+    assert decode_jwt(legacy, legacy_ring)["sub"] == "legacy"
+
+
+def test_cache_skips_repeat_verification(key_ring, decode_calls):
+    """
+    Test that a second verification of the same token is served from the cache.
+    """
+    cache = VerifiedTokenCache()
+    token = create_jwt("user-3", key_ring)
+
+    first = verify_jwt(token, key_ring, cache)
+    first["sub"] = "mutated"
+    second = verify_jwt(token, key_ring, cache)
+
+    assert second["sub"] == "user-3"
+    assert len(decode_calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalid_tokens_are_not_cached(key_ring, decode_calls):
+    """
+    Test that failed verifications are repeated rather than cached.
+    """
+    cache = VerifiedTokenCache()
+    bad = create_jwt("user-4", key_ring) + "x"
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            verify_jwt(bad, key_ring, cache)
+    assert len(decode_calls) == 2
+    assert len(cache) == 0
+
+
+def test_cached_entries_expire_with_token(key_ring):
+    """
+    Test that a cached payload is not served at or after the token's exp.
+    """
+    cache = VerifiedTokenCache()
+    token_hash = cache.token_hash("token")
+    now = time.time()
+    cache.set(token_hash, {"sub": "u", "exp": int(now) + 10}, "new", NEW_SECRET, now)
+
+    assert cache.get(token_hash, key_ring, now)["sub"] == "u"
+    assert cache.get(token_hash, key_ring, now + 10) is None
+    assert len(cache) == 0
+
+
+def test_cached_entries_without_exp_use_ttl(key_ring):
+    """
+    Test that tokens without exp are trusted for at most the cache TTL.
+    """
+    cache = VerifiedTokenCache(ttl_seconds=5)
+    token_hash = cache.token_hash("token")
+    cache.set(token_hash, {"sub": "u"}, "new", NEW_SECRET, 100.0)
+
+    assert cache.get(token_hash, key_ring, 104.0) is not None
+    assert cache.get(token_hash, key_ring, 105.0) is None
+
+
+def test_cached_entries_are_dropped_when_key_is_removed_or_changed(key_ring):
+    """
+    Test that rotating a key out invalidates tokens cached under it.
+    """
+    cache = VerifiedTokenCache()
+    token = jwt.encode({"sub": "user-5"}, OLD_SECRET, algorithm=ALGORITHM, headers={"kid": "old"})
+    verify_jwt(token, key_ring, cache)
+
+    key_ring.remove("old")
+    with pytest.raises(ValueError):
+        verify_jwt(token, key_ring, cache)
+
+    key_ring.add("old", "a-different-secret-of-thirty-two-bytes")
+    with pytest.raises(ValueError):
+        verify_jwt(token, key_ring, cache)
+
+
+def test_cache_is_bounded_lru(key_ring):
+    """
+    Test that the least recently used token is evicted once the cache is full.
+    """
+    cache = VerifiedTokenCache(max_size=2)
+    now = time.time()
+    for name in ("a", "b"):
+        cache.set(cache.token_hash(name), {"sub": name}, "new", NEW_SECRET, now)
+    cache.get(cache.token_hash("a"), key_ring, now)
+    cache.set(cache.token_hash("c"), {"sub": "c"}, "new", NEW_SECRET, now)
+
+    assert len(cache) == 2
+    assert cache.get(cache.token_hash("b"), key_ring, now) is None
+    assert cache.get(cache.token_hash("a"), key_ring, now) is not None
+    assert cache.evictions == 1
+
+
+def test_key_ring_and_cache_from_env(monkeypatch):
+    """
+    Test JWT_KEYS, JWT_ACTIVE_KID and JWT_CACHE_SIZE parsing.
+    """
+    monkeypatch.setenv("JWT_KEYS", "k1:secret-one, k2:secret-two")
+    monkeypatch.setenv("JWT_ACTIVE_KID", "k2")
+    ring = build_key_ring_from_env()
+    assert ring.kids() == ("k1", "k2") and ring.active_kid == "k2"
+
+    monkeypatch.setenv("JWT_ACTIVE_KID", "k3")
+    with pytest.raises(ValueError):
+        build_key_ring_from_env()
+    monkeypatch.setenv("JWT_KEYS", "broken")
+    with pytest.raises(ValueError):
+        build_key_ring_from_env()
+
+    monkeypatch.delenv("JWT_KEYS")
+    assert build_key_ring_from_env().kids() == (DEFAULT_KID,)
+
+    monkeypatch.setenv("JWT_CACHE_SIZE", "0")
+    assert build_token_cache_from_env() is None
+
+
+@pytest.fixture
+def protected_client(key_ring):
+    """
+    Provides a client for an app with authentication enabled and a test key ring.
+    """
+    previous_ring, previous_cache = get_key_ring(), get_token_cache()
+    set_key_ring(key_ring)
+    set_token_cache(VerifiedTokenCache())
+    yield TestClient(create_app(auth=True))
+    set_key_ring(previous_ring)
+    set_token_cache(previous_cache)
+
+
+def test_routers_require_a_bearer_token(protected_client, key_ring):
+    """
+    Test that API routes reject missing and invalid tokens and accept valid ones.
+    """
+    missing = protected_client.get("/tools")
+    invalid = protected_client.get("/tools", headers={"Authorization": "Bearer not-a-token"})
+    valid = protected_client.get("/tools", headers={"Authorization": f"Bearer {create_jwt('user', key_ring)}"})
+
+    assert missing.status_code == 401
+    assert missing.headers["WWW-Authenticate"] == "Bearer"
+    assert invalid.status_code == 401
+    assert valid.status_code == 200
+
+
+def test_metrics_stay_open_when_auth_is_enabled(protected_client):
+    """
+    Test that the scrape endpoint does not require a token.
+    """
+    assert protected_client.get("/metrics").status_code != 401
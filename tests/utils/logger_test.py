@@ -0,0 +1,147 @@
+import io
+import json
+import logging
+
+import pytest
+
+from utils.logger import (
+    DebugSamplingFilter,
+    configure_logging,
+    configure_logging_from_env,
+    lazy,
+    log_info,
+    parse_sample_rates,
+    shutdown_logging,
+)
+from utils.tracing import reset_request_id, set_request_id
+
+
+@pytest.fixture
+def stream():
+    """
+    Fixture that routes logging into a buffer and restores the root logger afterwards.
+    """
+    root = logging.getLogger()
+    previous_level = root.level
+    buffer = io.StringIO()
+    yield buffer
+    shutdown_logging()
+    root.setLevel(previous_level)
+
+
+def _lines(buffer):
+    shutdown_logging()
+    return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+
+def test_json_output_carries_request_id_and_extra_fields(stream):
+    """
+    Test that records are written as JSON with the request id current when they were logged.
+    """
+    configure_logging(level="INFO", stream=stream)
+    token = set_request_id("req-42")
+    try:
+        logging.getLogger("agents.test").info("Ran %d tools", 3, extra={"agent": "basic"})
+    finally:
+        reset_request_id(token)
+    log_info("no request")
+
+    first, second = _lines(stream)
+    assert first["message"] == "Ran 3 tools"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "agents.test"
+    assert first["request_id"] == "req-42"
+    assert first["agent"] == "basic"
+    assert "request_id" not in second
+
+
+def test_exceptions_are_formatted_into_the_record(stream):
+    """
+    Test that a logged exception's traceback is kept in its own field.
+    """
+    configure_logging(stream=stream)
+    try:
+        raise RuntimeError("broken")
+    except RuntimeError:
+        logging.getLogger("chains.test").exception("Chain failed")
+
+    [entry] = _lines(stream)
+    assert entry["message"] == "Chain failed"
+    assert "RuntimeError: broken" in entry["exception"]
+
+
+def test_lazy_arguments_are_not_computed_below_the_level(stream):
+    """
+    Test that lazy() arguments are evaluated only for emitted records.
+    """
+    configure_logging(level="INFO", stream=stream)
+    calls = []
+
+    def expensive(label):
+        calls.append(label)
+        return "tools"
+
+    log = logging.getLogger("agents.lazy")
+    log.debug("Skipped %s", lazy(lambda: expensive("debug")))
+    log.info("Kept %s", lazy(lambda: expensive("info")))
+
+    [entry] = _lines(stream)
+    assert entry["message"] == "Kept tools"
+    assert "debug" not in calls and "info" in calls
+
+
+def test_debug_sampling_keeps_a_fraction_per_module(stream):
+    """
+    Test that DEBUG records from a sampled module are thinned while other modules and levels pass.
+    """
+    configure_logging(level="DEBUG", stream=stream, sample_rates={"agents": 0.25})
+    for i in range(8):
+        logging.getLogger("agents.agents_service").debug("noisy %d", i)
+    logging.getLogger("agents.agents_service").warning("important")
+    logging.getLogger("chains.chains_registry").debug("unsampled")
+
+    messages = [entry["message"] for entry in _lines(stream)]
+    assert messages == ["noisy 0", "noisy 4", "important", "unsampled"]
+
+
+def test_sampling_uses_longest_prefix():
+    """
+    Test that the most specific prefix decides the rate and zero drops every DEBUG record.
+    """
+    sampling = DebugSamplingFilter({"agents": 1.0, "agents.agents_pool": 0.0})
+
+    def record(name):
+        return logging.LogRecord(name, logging.DEBUG, __file__, 1, "message", None, None)
+
+    assert sampling.filter(record("agents.agents_service"))
+    assert not sampling.filter(record("agents.agents_pool"))
+    assert sampling.filter(record("agentsx"))
+
+
+def test_configure_logging_from_env(monkeypatch, stream):
+    """
+    Test that LOG_LEVEL, LOG_FORMAT and LOG_DEBUG_SAMPLING are applied and validated.
+    """
+    monkeypatch.setenv("LOG_LEVEL", "warning")
+    monkeypatch.setenv("LOG_FORMAT", "text")
+    monkeypatch.setenv("LOG_DEBUG_SAMPLING", "agents=0.5, tools=0.1")
+    configure_logging_from_env()
+    assert logging.getLogger().level == logging.WARNING
+
+    monkeypatch.setenv("LOG_LEVEL", "LOUD")
+    with pytest.raises(ValueError):
+        configure_logging_from_env()
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("LOG_FORMAT", "xml")
+    with pytest.raises(ValueError):
+        configure_logging_from_env()
+
+
+def test_parse_sample_rates():
+    """
+    Test parsing of the module=rate list.
+    """
+    assert parse_sample_rates("agents=0.5, tools.tools_registry=0.1,") == {"agents": 0.5, "tools.tools_registry": 0.1}
+    assert parse_sample_rates("") == {}
+    with pytest.raises(ValueError):
+        parse_sample_rates("agents")
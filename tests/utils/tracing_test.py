@@ -0,0 +1,284 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agents.agents_service import arun_agent, create_basic_agent
+from chains.chains_cache import LRUCacheBackend, get_response_cache
+from chains.chains_llm import FakeStreamingLLM, get_llm_provider
+from main import create_app
+from memory.memory_service import MemoryService
+from utils.tracing import (
+    NOOP_SPAN,
+    STATUS_ERROR,
+    InMemorySpanExporter,
+    SpanExporter,
+    OTLPJsonFileExporter,
+    configure_tracing_from_env,
+    current_span,
+    get_request_id,
+    reset_request_id,
+    set_request_id,
+    span,
+    traced,
+    tracer,
+)
+
+
+@pytest.fixture
+def exporter():
+    """
+    Fixture that enables the process-wide tracer with an in-memory exporter,
+    restoring the previous configuration afterwards.
+    """
+    previous_enabled, previous_exporters = tracer.enabled, tracer.exporters
+    memory = InMemorySpanExporter()
+    tracer.configure(True, [memory])
+    yield memory
+    tracer.enabled, tracer.exporters = previous_enabled, previous_exporters
+
+
+def test_span_is_noop_when_tracing_is_disabled():
+    """
+    Test that span() hands out the shared no-op span and records nothing while tracing is off.
+    """
+    previous = tracer.enabled
+    tracer.enabled = False
+    try:
+        with span("ignored", key="value") as s:
+            s.set_attribute("other", 1)
+        assert s is NOOP_SPAN
+        assert current_span() is None
+    finally:
+        tracer.enabled = previous
+
+
+def test_nested_spans_share_trace_and_link_parents(exporter):
+    """
+    Test that a span opened inside another becomes its child in the same trace.
+    """
+    with span("outer") as outer:
+        with span("inner", size=3) as inner:
+            assert current_span() is inner
+        assert current_span() is outer
+
+    inner_done, outer_done = exporter.get_finished_spans()
+    assert (inner_done.name, outer_done.name) == ("inner", "outer")
+    assert inner_done.trace_id == outer_done.trace_id
+    assert inner_done.parent_id == outer_done.span_id
+    assert outer_done.parent_id is None
+    assert inner_done.attributes["size"] == 3
+    assert outer_done.end_ns >= inner_done.end_ns >= inner_done.start_ns >= outer_done.start_ns
+
+
+def test_span_records_escaping_exception(exporter):
+    """
+    Test that an exception leaving the block marks the span as failed and is re-raised.
+    """
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+
+    [failed] = exporter.get_finished_spans()
+    assert failed.status == STATUS_ERROR
+    assert failed.status_message == "boom"
+    assert failed.attributes["exception.type"] == "ValueError"
+
+
+@pytest.mark.asyncio
+async def test_traced_decorator_wraps_sync_and_async_functions(exporter):
+    """
+    Test that traced() opens a span per call for plain and coroutine functions.
+    """
+    @traced("work.sync", kind_of="sync")
+    def add(a, b):
+        return a + b
+
+    @traced()
+    async def fetch():
+        await asyncio.sleep(0)
+        return current_span().name
+
+    assert add(1, 2) == 3
+    assert (await fetch()).endswith("fetch")
+    names = [s.name for s in exporter.get_finished_spans()]
+    assert names[0] == "work.sync"
+    assert names[1].endswith("fetch")
+
+
+@pytest.mark.asyncio
+async def test_request_id_and_parent_propagate_into_tasks(exporter):
+    """
+    Test that tasks started inside a span inherit the request id and parent span.
+    """
+    token = set_request_id("req-1")
+    try:
+        with span("root") as root:
+            async def child():
+                assert get_request_id() == "req-1"
+                with span("child"):
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(child(), child())
+    finally:
+        reset_request_id(token)
+
+    assert get_request_id() is None
+    children = [s for s in exporter.get_finished_spans(request_id="req-1") if s.name == "child"]
+    assert len(children) == 2
+    assert all(s.parent_id == root.span_id for s in children)
+
+
+def test_exporter_without_export_cannot_be_created():
+    """
+    Test that an exporter missing export() fails at construction rather than when a span ends.
+    """
+    class FlushOnlyExporter(SpanExporter):
+        def flush(self):
+            pass
+
+    with pytest.raises(TypeError):
+        FlushOnlyExporter()
+
+
+def test_otlp_file_exporter_writes_export_requests(tmp_path):
+    """
+    Test that the file exporter writes buffered spans as OTLP/JSON on flush.
+    """
+    path = tmp_path / "spans.jsonl"
+    file_exporter = OTLPJsonFileExporter(str(path), service_name="svc", batch_size=2)
+    previous_enabled, previous_exporters = tracer.enabled, tracer.exporters
+    tracer.configure(True, [file_exporter])
+    try:
+        with span("a", count=1, ratio=0.5, flag=True, label="x"):
+            with span("b"):
+                pass
+        with span("c"):
+            pass
+        tracer.flush()
+    finally:
+        tracer.enabled, tracer.exporters = previous_enabled, previous_exporters
+        file_exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2
+    [resource_spans] = lines[0]["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "svc"}}]
+    b, a = resource_spans["scopeSpans"][0]["spans"]
+    assert b["parentSpanId"] == a["spanId"] and b["traceId"] == a["traceId"]
+    assert len(a["traceId"]) == 32 and len(a["spanId"]) == 16
+    assert "parentSpanId" not in a
+    assert int(a["endTimeUnixNano"]) >= int(a["startTimeUnixNano"])
+    assert {attr["key"]: attr["value"] for attr in a["attributes"]} == {
+        "count": {"intValue": "1"},
+        "ratio": {"doubleValue": 0.5},
+        "flag": {"boolValue": True},
+        "label": {"stringValue": "x"},
+    }
+    assert lines[1]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "c"
+
+
+def test_otlp_file_exporter_writes_off_the_exporting_thread(tmp_path, monkeypatch):
+    """
+    Test that full batches are encoded and written by the background writer, not by the caller.
+    """
+    file_exporter = OTLPJsonFileExporter(str(tmp_path / "spans.jsonl"), batch_size=1)
+    writer_threads = []
+    real_write = file_exporter._write
+
+    def recording_write(batch):
+        writer_threads.append(threading.current_thread())
+        real_write(batch)
+
+    monkeypatch.setattr(file_exporter, "_write", recording_write)
+    previous_enabled, previous_exporters = tracer.enabled, tracer.exporters
+    tracer.configure(True, [file_exporter])
+    try:
+        for name in ("a", "b"):
+            with span(name):
+                pass
+        file_exporter.flush()
+        assert len((tmp_path / "spans.jsonl").read_text().splitlines()) == 2
+    finally:
+        tracer.enabled, tracer.exporters = previous_enabled, previous_exporters
+        file_exporter.shutdown()
+
+    assert len(writer_threads) == 2
+    assert threading.current_thread() not in writer_threads
+
+
+def test_configure_tracing_from_env(monkeypatch, tmp_path):
+    """
+    Test that TRACING_ENABLED and TRACING_OTLP_FILE select the exporters.
+    """
+    previous_enabled, previous_exporters = tracer.enabled, tracer.exporters
+    monkeypatch.setenv("TRACING_ENABLED", "true")
+    monkeypatch.setenv("TRACING_MAX_SPANS", "5")
+    monkeypatch.setenv("TRACING_OTLP_FILE", str(tmp_path / "spans.jsonl"))
+    try:
+        configured = configure_tracing_from_env()
+        assert configured.enabled
+        assert [type(e) for e in configured.exporters] == [InMemorySpanExporter, OTLPJsonFileExporter]
+
+        monkeypatch.setenv("TRACING_ENABLED", "false")
+        assert not configure_tracing_from_env().enabled
+    finally:
+        tracer.enabled, tracer.exporters = previous_enabled, previous_exporters
+
+
+def test_middleware_sets_request_id_and_traces_chain_call(exporter):
+    """
+    Test that a request gets a root span, its id is echoed, and the prompt and
+    LLM spans recorded while handling it carry that id.
+    """
+    app = create_app()
+    app.dependency_overrides[get_llm_provider] = lambda: FakeStreamingLLM(responses=["traced"])
+    app.dependency_overrides[get_response_cache] = lambda: None
+    client = TestClient(app)
+
+    response = client.post("/chains/generate", json={"user_input": "trace me"}, headers={"X-Request-ID": "abc-123"})
+    generated = client.post("/chains/generate", json={"user_input": "again"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "abc-123"
+    assert generated.headers["X-Request-ID"] not in ("", "abc-123")
+    spans = {s.name: s for s in exporter.get_finished_spans(request_id="abc-123")}
+    root = spans["POST /chains/generate"]
+    assert root.attributes["http.status_code"] == 200
+    assert spans["llm.call"].attributes["chain.name"] == "simple"
+    assert spans["llm.call"].parent_id == root.span_id
+    assert spans["prompt.format"].trace_id == root.trace_id
+
+
+@pytest.mark.asyncio
+async def test_agent_run_records_step_llm_and_tool_spans(exporter):
+    """
+    Test that every agent step, planner call and tool call gets its own span.
+    """
+    llm = FakeStreamingLLM(responses=["Action: calculator[2 + 2]", "Final Answer: 4"])
+    agent = create_basic_agent(["calculator"])
+    run = await arun_agent(agent, "What is 2 + 2?", llm_provider=llm, tool_memo=LRUCacheBackend())
+
+    assert run.final_answer == "4"
+    spans = exporter.get_finished_spans()
+    steps = [s for s in spans if s.name == "agent.step"]
+    assert [s.attributes["agent.step"] for s in steps] == [0, 1]
+    [tool_call] = [s for s in spans if s.name == "tool.call"]
+    assert tool_call.attributes["tool.name"] == "calculator"
+    assert tool_call.parent_id == steps[0].span_id
+    assert sorted(s.parent_id for s in spans if s.name == "llm.call") == sorted(s.span_id for s in steps)
+
+
+def test_memory_reads_and_writes_are_traced(exporter):
+    """
+    Test that memory stores and retrievals are recorded with their backend.
+    """
+    memory = MemoryService()
+    memory.store_message("s1", "hello")
+    memory.retrieve_memory("s1")
+
+    spans = exporter.get_finished_spans()
+    assert [s.name for s in spans] == ["memory.store", "memory.retrieve"]
+    assert spans[0].attributes["memory.backend"] == "in_memory"
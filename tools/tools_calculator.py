@@ -0,0 +1,209 @@
+"""Safe math expression compiler used by tools_service.calculator_tool."""
+
+import ast
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional
+
+import numpy as np
+
+MAX_EXPRESSION_LENGTH = 1000
+COMPILE_CACHE_SIZE = 1024
+
+# Integer powers beyond this many result bits are refused instead of computed.
+_MAX_POWER_BITS = 4096
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+
+def _safe_pow(base: Any, exponent: Any) -> Any:
+    if isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1 and exponent > 0:
+        if exponent * math.log2(abs(base)) > _MAX_POWER_BITS:
+            raise ValueError("Exponent is too large.")
+    return base ** exponent
+
+
+def _vector_log(x: Any, base: Optional[Any] = None) -> Any:
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+
+def _vector_reduce(ufunc: np.ufunc) -> Callable[..., Any]:
+    def reduce(*args: Any) -> Any:
+        result = args[0]
+        for arg in args[1:]:
+            result = ufunc(result, arg)
+        return result
+
+    return reduce
+
+
+SCALAR_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": abs, "min": min, "max": max, "round": round,
+    "sqrt": math.sqrt, "exp": math.exp, "log": math.log, "log2": math.log2, "log10": math.log10,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "floor": math.floor, "ceil": math.ceil, "hypot": math.hypot,
+    "degrees": math.degrees, "radians": math.radians,
+}
+
+VECTOR_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs, "min": _vector_reduce(np.minimum), "max": _vector_reduce(np.maximum), "round": np.round,
+    "sqrt": np.sqrt, "exp": np.exp, "log": _vector_log, "log2": np.log2, "log10": np.log10,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan, "atan2": np.arctan2,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "floor": np.floor, "ceil": np.ceil, "hypot": np.hypot,
+    "degrees": np.degrees, "radians": np.radians,
+}
+
+
+class _PowRewriter(ast.NodeTransformer):
+    """
+    Routes ** through _safe_pow so huge integer powers cannot exhaust memory or CPU.
+    """
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="_safe_pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node,
+            )
+        return node
+
+
+def _validate(node: ast.AST, variables: set) -> None:
+    if isinstance(node, ast.Expression):
+        _validate(node.body, variables)
+    elif isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, _BINARY_OPERATORS):
+        _validate(node.left, variables)
+        _validate(node.right, variables)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPERATORS):
+        _validate(node.operand, variables)
+    elif isinstance(node, ast.Name):
+        if node.id.startswith("_") or node.id in SCALAR_FUNCTIONS:
+            raise ValueError(f"Invalid name: {node.id}")
+        if node.id not in CONSTANTS:
+            variables.add(node.id)
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in SCALAR_FUNCTIONS or node.keywords:
+            raise ValueError("Only calls to supported math functions are allowed.")
+        for arg in node.args:
+            _validate(arg, variables)
+    else:
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+class CompiledExpression:
+    """
+    A validated, pre-compiled math expression that can be evaluated repeatedly,
+    either on scalars or element-wise over NumPy arrays.
+
+    Only numbers, the arithmetic operators, CONSTANTS, variables and calls to the
+    whitelisted math functions are accepted, so the compiled code has no way to
+    reach attributes, builtins or anything outside its namespace.
+    """
+
+    __slots__ = ("expression", "variables", "_code")
+
+    def __init__(self, expression: str) -> None:
+        """
+        Parses, validates and compiles an expression.
+
+        Args:
+            expression: The math expression, e.g. "2 * sin(x) + y ** 2".
+
+        Raises:
+            ValueError: If the expression is empty, too long, nested too deeply, or uses unsupported syntax.
+        """
+        if not expression or not expression.strip():
+            raise ValueError("Expression cannot be empty.")
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters.")
+        variables: set = set()
+        try:
+            try:
+                tree = ast.parse(expression.strip(), mode="eval")
+            except SyntaxError as exc:
+                raise ValueError(f"Invalid expression: {expression}") from exc
+            _validate(tree, variables)
+            tree = ast.fix_missing_locations(_PowRewriter().visit(tree))
+            self._code = compile(tree, "<expression>", "eval")
+        except (RecursionError, MemoryError) as exc:
+            # Short inputs such as "-" * 990 + "1" still nest deeper than the recursive walk allows.
+            raise ValueError("Expression is nested too deeply.") from exc
+        self.expression = expression
+        self.variables: FrozenSet[str] = frozenset(variables)
+
+    def evaluate(self, variables: Optional[Mapping[str, float]] = None) -> float:
+        """
+        Evaluates the expression on scalar variable bindings.
+
+        Args:
+            variables: Values for the expression's variables.
+
+        Returns:
+            The result as a float.
+
+        Raises:
+            ValueError: If a variable is missing or the computation is undefined.
+        """
+        result = self._run(SCALAR_FUNCTIONS, variables or {})
+        if isinstance(result, complex):
+            raise ValueError("Expression has no real result.")
+        return float(result)
+
+    def evaluate_vectorized(self, variables: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evaluates the expression element-wise over arrays of variable bindings.
+
+        Args:
+            variables: Arrays (or scalars) for the expression's variables; they must broadcast together.
+
+        Returns:
+            A float64 array with one result per binding.
+
+        Raises:
+            ValueError: If a variable is missing, the arrays do not broadcast, or an element is undefined.
+        """
+        arrays = {name: np.asarray(value, dtype=np.float64) for name, value in variables.items()}
+        # Raise on division by zero and NaN/overflow like scalar evaluation does, instead of warning.
+        with np.errstate(divide="raise", invalid="raise", over="raise"):
+            result = self._run(VECTOR_FUNCTIONS, arrays)
+        shape = np.broadcast_shapes(*(a.shape for a in arrays.values())) if arrays else ()
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), shape).copy()
+
+    def _run(self, functions: Mapping[str, Callable[..., Any]], variables: Mapping[str, Any]) -> Any:
+        missing = self.variables - variables.keys()
+        if missing:
+            raise ValueError(f"Missing values for variables: {', '.join(sorted(missing))}")
+        namespace = {"__builtins__": {}, "_safe_pow": _safe_pow, **CONSTANTS, **functions}
+        namespace.update((name, variables[name]) for name in self.variables)
+        try:
+            # Safe: the code object was compiled from an AST that passed _validate.
+            return eval(self._code, namespace)
+        except ZeroDivisionError as exc:
+            raise ValueError("Division by zero is not allowed.") from exc
+        except (ArithmeticError, TypeError, ValueError) as exc:
+            raise ValueError(f"Cannot evaluate expression: {exc}") from exc
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Returns the compiled form of an expression, reusing it for repeated expression text.
+
+    Args:
+        expression: The math expression to compile.
+
+    Raises:
+        ValueError: If the expression is invalid.
+    """
+    return CompiledExpression(expression)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
@@ -21,6 +21,7 @@ class SearchResultItem(BaseModel):
     title: str
     url: str
     description: Optional[str] = None
+    score: Optional[float] = None
     # TODO: Add any additional fields as needed
 
 
@@ -31,4 +32,35 @@ class SearchResults(BaseModel):
 
     results: List[SearchResultItem]
     total_results: int
-    # TODO: Add any additional fields as needed
\ No newline at end of file
+    # TODO: Add any additional fields as needed
+
+
+class CalculatorInput(BaseModel):
+    """
+    Model representing the input for a calculator call.
+    """
+
+    expression: str
+    variables: Optional[Dict[str, float]] = None
+
+
+class LatencyHistogramSnapshot(BaseModel):
+    """
+    Model representing a point-in-time copy of a latency histogram.
+    """
+
+    buckets: Dict[str, int]
+    count: int
+    sum: float
+
+
+class ToolStats(BaseModel):
+    """
+    Model representing execution metrics for one registered tool.
+    """
+
+    calls: int
+    errors: int
+    timeouts: int
+    in_flight: int
+    latency_seconds: LatencyHistogramSnapshot
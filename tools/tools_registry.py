@@ -0,0 +1,341 @@
+"""Registry of callable tools with typed inputs, per-tool timeouts, concurrency limits and latency histograms."""
+
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Type, Union
+
+from pydantic import BaseModel
+
+from tools.tools_models import (
+    CalculatorInput,
+    LatencyHistogramSnapshot,
+    SearchQuery,
+    ToolStats,
+)
+from metrics.metrics_service import record_tool_call
+from tools.tools_service import calculator_tool, search_tool
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_TOOL_TIMEOUT = 30.0
+DEFAULT_TOOL_CONCURRENCY = 8
+
+
+class ToolNotFoundError(KeyError):
+    """
+    Raised when a tool name has not been registered.
+    """
+    pass
+
+
+class ToolTimeoutError(TimeoutError):
+    """
+    Raised when a tool call does not finish within the tool's timeout.
+    """
+    pass
+
+
+class LatencyHistogram:
+    """
+    Thread-safe cumulative histogram of call durations, in seconds.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self._bounds = sorted(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records one duration.
+
+        Args:
+            seconds: The observed duration.
+        """
+        index = bisect.bisect_left(self._bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self) -> LatencyHistogramSnapshot:
+        """
+        Returns cumulative counts keyed by upper bound ("+Inf" for the last bucket).
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        buckets: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip([*self._bounds, math.inf], counts):
+            running += count
+            buckets["+Inf" if bound == math.inf else repr(bound)] = running
+        return LatencyHistogramSnapshot(buckets=buckets, count=running, sum=total)
+
+
+class RegisteredTool:
+    """
+    A tool function plus its input schema and execution limits.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        input_model: Type[BaseModel],
+        description: str = "",
+        timeout: float = DEFAULT_TOOL_TIMEOUT,
+        max_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.input_model = input_model
+        self.description = description or (func.__doc__ or "").strip().split("\n")[0]
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.is_async = asyncio.iscoroutinefunction(func)
+        # Each blocking tool gets its own pool, so a slow tool can only tie up its own workers.
+        self.executor = None if self.is_async else executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix=f"tool-{name}"
+        )
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        # asyncio primitives belong to one event loop, so keep one semaphore per loop.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def primary_field(self) -> str:
+        """
+        The first field of the input model, which a bare string input is bound to.
+        """
+        return next(iter(self.input_model.__fields__))
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def stats(self) -> ToolStats:
+        return ToolStats(
+            calls=self.calls,
+            errors=self.errors,
+            timeouts=self.timeouts,
+            in_flight=self.in_flight,
+            latency_seconds=self.histogram.snapshot(),
+        )
+
+
+class ToolRegistry:
+    """
+    Holds tools by name and runs them with their own timeout and concurrency limit.
+
+    Async tools run on the event loop; blocking tools run in a per-tool thread
+    pool (or a process pool passed at registration), so one slow or saturated
+    tool never delays calls to the others.
+    """
+
+    def __init__(self) -> None:
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """
+        Increases whenever a tool is registered, so callers can tell when cached tool metadata is stale.
+        """
+        return self._version
+
+    def register(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        input_model: Type[BaseModel],
+        description: str = "",
+        timeout: float = DEFAULT_TOOL_TIMEOUT,
+        max_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+        use_processes: bool = False,
+    ) -> RegisteredTool:
+        """
+        Registers (or replaces) a tool.
+
+        Args:
+            name: The name callers use to select the tool.
+            func: The tool function; it receives the validated input fields as keyword arguments.
+            input_model: Pydantic model describing and validating the tool input.
+            description: Human-readable description; defaults to the first docstring line.
+            timeout: Seconds a call may take, including time spent waiting for a free slot.
+            max_concurrency: Maximum number of calls running at once.
+            use_processes: Run a blocking tool in a process pool instead of threads.
+                The function must then be importable at module level.
+
+        Returns:
+            The registered tool.
+
+        Raises:
+            ValueError: If the name is empty or a limit is not positive.
+        """
+        if not name:
+            raise ValueError("Tool name cannot be empty.")
+        if timeout <= 0 or max_concurrency <= 0:
+            raise ValueError("timeout and max_concurrency must be positive.")
+
+        executor = ProcessPoolExecutor(max_workers=max_concurrency) if use_processes else None
+        tool = RegisteredTool(name, func, input_model, description, timeout, max_concurrency, executor)
+        with self._lock:
+            previous = self._tools.get(name)
+            self._tools[name] = tool
+            self._version += 1
+        if previous is not None and previous.executor is not None:
+            previous.executor.shutdown(wait=False)
+        return tool
+
+    def get(self, name: str) -> RegisteredTool:
+        """
+        Returns a registered tool.
+
+        Raises:
+            ToolNotFoundError: If no tool has that name.
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            raise ToolNotFoundError(name)
+        return tool
+
+    def tool_names(self) -> List[str]:
+        """
+        Returns the names of all registered tools.
+        """
+        return sorted(self._tools)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """
+        Returns the name, description, limits and JSON input schema of every tool.
+        """
+        return [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "timeout": tool.timeout,
+                "max_concurrency": tool.max_concurrency,
+                "input_schema": tool.input_model.schema(),
+            }
+            for tool in (self._tools[name] for name in self.tool_names())
+        ]
+
+    def stats(self) -> Dict[str, ToolStats]:
+        """
+        Returns call counts and latency histograms per tool.
+        """
+        return {name: self._tools[name].stats() for name in self.tool_names()}
+
+    async def call(self, name: str, tool_input: Union[str, Mapping[str, Any], BaseModel]) -> Any:
+        """
+        Validates the input and runs the named tool within its limits.
+
+        Args:
+            name: The registered tool name.
+            tool_input: A bare string (bound to the model's first field), a mapping of fields,
+                or an instance of the tool's input model.
+
+        Returns:
+            Whatever the tool returns.
+
+        Raises:
+            ToolNotFoundError: If no tool has that name.
+            ValueError: If the input does not match the tool's schema, or the tool rejects it.
+            ToolTimeoutError: If the call does not finish within the tool's timeout.
+        """
+        tool = self.get(name)
+        arguments = self._validate(tool, tool_input).dict()
+
+        start = time.perf_counter()
+        tool.calls += 1
+        tool.in_flight += 1
+        try:
+            with span("tool.call", **{"tool.name": name}):
+                result = await asyncio.wait_for(self._run(tool, arguments), timeout=tool.timeout)
+            record_tool_call(name, "ok")
+            return result
+        except asyncio.TimeoutError as exc:
+            tool.timeouts += 1
+            record_tool_call(name, "timeout")
+            logger.warning("Tool '%s' timed out after %.2fs.", name, tool.timeout)
+            raise ToolTimeoutError(f"Tool '{name}' timed out after {tool.timeout}s.") from exc
+        except Exception:
+            tool.errors += 1
+            record_tool_call(name, "error")
+            raise
+        finally:
+            tool.in_flight -= 1
+            tool.histogram.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _validate(tool: RegisteredTool, tool_input: Union[str, Mapping[str, Any], BaseModel]) -> BaseModel:
+        if isinstance(tool_input, tool.input_model):
+            return tool_input
+        if isinstance(tool_input, str):
+            tool_input = {tool.primary_field: tool_input}
+        # pydantic's ValidationError is a ValueError, so bad input surfaces like any other ValueError.
+        return tool.input_model.parse_obj(tool_input)
+
+    @staticmethod
+    async def _run(tool: RegisteredTool, arguments: Dict[str, Any]) -> Any:
+        semaphore = tool.semaphore()
+        if tool.is_async:
+            async with semaphore:
+                return await tool.func(**arguments)
+
+        # A worker thread cannot be cancelled, so when the caller times out the
+        # slot stays taken until the worker finishes. Otherwise further calls
+        # would queue behind stuck workers inside the executor, out of sight of
+        # the concurrency limit.
+        await semaphore.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(tool.executor, _call_with_kwargs, tool.func, arguments)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda f: _release_slot(f, semaphore))
+        return await asyncio.shield(future)
+
+
+def _release_slot(future: "asyncio.Future[Any]", semaphore: asyncio.Semaphore) -> None:
+    semaphore.release()
+    # Retrieve the outcome so an abandoned call's error is not reported as never retrieved.
+    if not future.cancelled():
+        future.exception()
+
+
+def _call_with_kwargs(func: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+    # Module-level so it can be pickled for process pools.
+    return func(**arguments)
+
+
+tool_registry = ToolRegistry()
+tool_registry.register("search", search_tool, SearchQuery, timeout=10.0, max_concurrency=8)
+tool_registry.register("calculator", calculator_tool, CalculatorInput, timeout=2.0, max_concurrency=16)
+
+
+def get_tool_registry() -> ToolRegistry:
+    """
+    Returns the process-wide tool registry, for use as a FastAPI dependency.
+    """
+    return tool_registry
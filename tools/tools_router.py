@@ -1,31 +1,92 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+
+from tools.tools_models import ToolStats
+from tools.tools_registry import ToolNotFoundError, ToolRegistry, ToolTimeoutError, get_tool_registry
 
 router = APIRouter(prefix="/tools", tags=["Tools"])
 
 
+@router.get("")
+async def list_tools_endpoint(registry: ToolRegistry = Depends(get_tool_registry)) -> List[Dict[str, Any]]:
+    """
+    Lists the registered tools with their limits and input schemas.
+
+    Args:
+        registry (ToolRegistry): The registry holding the tools.
+
+    Returns:
+        List[Dict[str, Any]]: One description per tool.
+    """
+    return registry.describe()
+
+
+@router.get("/stats")
+async def tool_stats_endpoint(registry: ToolRegistry = Depends(get_tool_registry)) -> Dict[str, ToolStats]:
+    """
+    Returns call counts and latency histograms for every tool.
+
+    Args:
+        registry (ToolRegistry): The registry holding the tools.
+
+    Returns:
+        Dict[str, ToolStats]: Metrics keyed by tool name.
+    """
+    return registry.stats()
+
+
 @router.post("/call/{tool_name}")
-def call_tool_endpoint(tool_name: str, tool_input: str) -> dict:
+async def call_tool_endpoint(
+    tool_name: str,
+    tool_input: Optional[str] = None,
+    arguments: Optional[Dict[str, Any]] = Body(None),
+    registry: ToolRegistry = Depends(get_tool_registry),
+) -> dict:
     """
     Exposes a REST endpoint to manually trigger a tool.
 
     Args:
         tool_name (str): The name of the tool to be triggered.
-        tool_input (str): The input data required by the tool.
+        tool_input (Optional[str]): The input data required by the tool, bound to its first input field.
+        arguments (Optional[Dict[str, Any]]): Full tool input as a JSON body, validated against the tool's schema.
+        registry (ToolRegistry): The registry that runs the tool.
 
     Returns:
         dict: A dictionary containing information about the tool call and its result.
     """
+    if tool_input is None and arguments is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide tool_input or a JSON body of tool arguments."
+        )
+
     try:
-        # TODO: Implement logic to call the specified tool using the provided input.
-        # For now, return a placeholder response.
+        result = await registry.call(tool_name, arguments if arguments is not None else tool_input)
         return {
             "tool_name": tool_name,
-            "tool_input": tool_input,
+            "tool_input": tool_input if arguments is None else arguments,
+            "result": result,
             "message": "Tool called successfully"
         }
+    except ToolNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown tool: {tool_name}"
+        ) from exc
+    except ToolTimeoutError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(exc)
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        ) from exc
     except Exception as exc:
         # Handle any unexpected errors during tool invocation
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(exc)
-        ) from exc
\ No newline at end of file
+        ) from exc
@@ -0,0 +1,363 @@
+"""In-memory BM25 inverted index that backs tools_service.search_tool."""
+
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tools.tools_models import SearchResultItem, SearchResults
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        A list of tokens, in order of appearance.
+    """
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+Postings = Tuple[np.ndarray, np.ndarray, int]
+
+
+def rank_bm25(
+    term_postings: Sequence[Postings],
+    lengths: Any,
+    alive: Optional[Any],
+    n_docs: int,
+    total_length: int,
+    limit: int,
+    offset: int,
+    k1: float = DEFAULT_K1,
+    b: float = DEFAULT_B,
+) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Scores documents against the postings of each query term and selects one page.
+
+    Args:
+        term_postings: (document numbers, term frequencies, document frequency) per query term.
+        lengths: Array (or buffer) of uint32 document lengths, indexed by document number.
+        alive: Optional array (or buffer) of uint8 flags; documents flagged 0 never match.
+        n_docs: Number of live documents.
+        total_length: Sum of live document lengths.
+        limit: Maximum number of results to return.
+        offset: Number of top-ranked results to skip.
+        k1: BM25 term-frequency saturation.
+        b: BM25 document-length normalization.
+
+    Returns:
+        The page as (document number, score) pairs, best first, and the total number of matches.
+    """
+    if not n_docs or not term_postings:
+        return [], 0
+    doc_lengths = np.frombuffer(lengths, dtype=np.uint32)
+    live = None if alive is None else np.frombuffer(alive, dtype=np.uint8)
+    avg_length = total_length / n_docs or 1.0
+
+    doc_parts, score_parts = [], []
+    for doc_nums, freqs, df in term_postings:
+        tf = freqs.astype(np.float64)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_lengths[doc_nums] / avg_length)
+        scores = idf * tf * (k1 + 1.0) / (tf + norm)
+        if live is not None:
+            scores *= live[doc_nums]
+        doc_parts.append(doc_nums)
+        score_parts.append(scores)
+
+    if len(term_postings) > 1:
+        # Scatter-add into one slot per document merges the terms without sorting the candidates.
+        totals = np.bincount(
+            np.concatenate(doc_parts), weights=np.concatenate(score_parts), minlength=len(doc_lengths)
+        )
+        candidates = np.flatnonzero(totals > 0)
+        scores = totals[candidates]
+    else:
+        candidates, scores = doc_parts[0], score_parts[0]
+    matched = scores > 0
+    candidates, scores = candidates[matched], scores[matched]
+    return _top_k(candidates, scores, offset + limit)[offset:], int(len(candidates))
+
+
+def _top_k(doc_nums: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    if k <= 0:
+        return []
+    if len(scores) > k:
+        # argpartition finds the k-th best score in linear time. Hits above it are all kept;
+        # among hits tying with it, a second partition keeps the lowest document numbers, so
+        # ties break the same way on every page and only k hits are ever sorted.
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)
+        needed = k - len(above)
+        if len(tied) > needed:
+            tied = tied[np.argpartition(doc_nums[tied], needed - 1)[:needed]]
+        selected = np.concatenate((above, tied))
+    else:
+        selected = np.arange(len(scores))
+    ordered = selected[np.lexsort((doc_nums[selected], -scores[selected]))]
+    return [(int(doc_nums[i]), float(scores[i])) for i in ordered]
+
+
+class _GrowableArray:
+    """
+    Append-only NumPy array with amortized O(1) appends.
+
+    Growing allocates a new buffer rather than resizing in place, and appends
+    only write past the current end, so a view taken with view() stays valid
+    and unchanged while the array keeps growing.
+    """
+
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, dtype: Any, values: Optional[np.ndarray] = None, capacity: int = 4) -> None:
+        if values is None:
+            self._data = np.empty(capacity, dtype=dtype)
+            self._size = 0
+        else:
+            self._data = np.array(values, dtype=dtype)
+            self._size = len(values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Any:
+        return self._data[:self._size][index]
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        self._data[:self._size][index] = value
+
+    def append(self, value: Any) -> None:
+        if self._size == len(self._data):
+            grown = np.empty(max(2 * len(self._data), 4), dtype=self._data.dtype)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+class _Postings:
+    """
+    Postings list for one term: parallel arrays of document numbers and term frequencies.
+    """
+
+    __slots__ = ("doc_nums", "freqs", "df")
+
+    def __init__(self, doc_nums: Optional[np.ndarray] = None, freqs: Optional[np.ndarray] = None) -> None:
+        self.doc_nums = _GrowableArray(np.uint32, doc_nums)
+        self.freqs = _GrowableArray(np.uint32, freqs)
+        self.df = 0
+
+
+class SearchIndex:
+    """
+    Incremental BM25 index over (url, title, description) documents.
+
+    Documents are keyed by URL. Postings are growable NumPy arrays, so a query
+    costs one vectorized pass over the postings of its terms plus a partial
+    selection of the best offset + limit hits; the full result set is never
+    sorted. Removed documents are tombstoned and their postings dropped by
+    compact(), which runs automatically once half the slots are dead.
+
+    Searches hold the lock only to take views of the arrays they read; scoring
+    runs outside it, so searches do not serialize behind each other or writes.
+    """
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        """
+        Initializes an empty index.
+
+        Args:
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+        """
+        self._k1 = k1
+        self._b = b
+        self._postings: Dict[str, _Postings] = {}
+        self._docs: List[Optional[Tuple[str, str, Optional[str]]]] = []
+        self._lengths = _GrowableArray(np.uint32)
+        self._alive = _GrowableArray(np.uint8)
+        self._doc_nums: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_nums)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._doc_nums
+
+    def add_document(self, url: str, title: str, description: Optional[str] = None) -> None:
+        """
+        Adds a document, replacing any existing document with the same URL.
+
+        Args:
+            url: The unique URL of the document.
+            title: The document title.
+            description: Optional body text.
+
+        Raises:
+            ValueError: If url or title is empty.
+        """
+        if not url:
+            raise ValueError("Document URL cannot be empty.")
+        if not title:
+            raise ValueError("Document title cannot be empty.")
+
+        tokens = tokenize(f"{title} {description or ''}")
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        with self._lock:
+            if url in self._doc_nums:
+                self._remove(url)
+            doc_num = len(self._docs)
+            self._docs.append((url, title, description))
+            self._lengths.append(len(tokens))
+            self._alive.append(1)
+            self._doc_nums[url] = doc_num
+            self._total_length += len(tokens)
+            for term, freq in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.doc_nums.append(doc_num)
+                postings.freqs.append(freq)
+                postings.df += 1
+
+    def remove_document(self, url: str) -> bool:
+        """
+        Removes a document from the index.
+
+        Args:
+            url: The URL of the document to remove.
+
+        Returns:
+            True if the document was indexed, False otherwise.
+        """
+        with self._lock:
+            if url not in self._doc_nums:
+                return False
+            self._remove(url)
+            if len(self._docs) > 1024 and len(self._doc_nums) * 2 < len(self._docs):
+                self._compact()
+            return True
+
+    def compact(self) -> None:
+        """
+        Drops removed documents from the postings and renumbers the remaining ones.
+        """
+        with self._lock:
+            self._compact()
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> SearchResults:
+        """
+        Returns one page of documents ranked by BM25 score.
+
+        Args:
+            query: The search query string.
+            limit: Maximum number of results to return.
+            offset: Number of top-ranked results to skip.
+
+        Returns:
+            The requested page of results and the total number of matching documents.
+
+        Raises:
+            ValueError: If limit or offset is negative.
+        """
+        if limit < 0 or offset < 0:
+            raise ValueError("limit and offset cannot be negative.")
+        terms = set(tokenize(query))
+
+        with self._lock:
+            n_docs = len(self._doc_nums)
+            term_postings = [
+                (p.doc_nums.view(), p.freqs.view(), p.df)
+                for p in (self._postings.get(t) for t in terms)
+                if p is not None and p.df
+            ]
+            lengths, alive = self._lengths.view(), self._alive.view()
+            docs, total_length = self._docs, self._total_length
+        if not n_docs or not term_postings:
+            return SearchResults(results=[], total_results=0)
+
+        page, total = rank_bm25(
+            term_postings, lengths, alive, n_docs, total_length, limit, offset, self._k1, self._b,
+        )
+        items = []
+        for doc_num, score in page:
+            doc = docs[doc_num]
+            # None if the document was removed while this query was being scored.
+            if doc is not None:
+                url, title, description = doc
+                items.append(SearchResultItem(title=title, url=url, description=description, score=score))
+        return SearchResults(results=items, total_results=total)
+
+    def _remove(self, url: str) -> None:
+        doc_num = self._doc_nums.pop(url)
+        _, title, description = self._docs[doc_num]
+        for term in set(tokenize(f"{title} {description or ''}")):
+            self._postings[term].df -= 1
+        self._total_length -= int(self._lengths[doc_num])
+        self._docs[doc_num] = None
+        self._alive[doc_num] = 0
+
+    def _compact(self) -> None:
+        # Builds new arrays rather than rewriting the old ones, which searches may still be reading.
+        alive = self._alive.view().astype(bool)
+        remap = np.cumsum(alive, dtype=np.uint32) - 1
+        docs = [doc for doc in self._docs if doc is not None]
+
+        for term in list(self._postings):
+            postings = self._postings[term]
+            if not postings.df:
+                del self._postings[term]
+                continue
+            doc_nums = postings.doc_nums.view()
+            keep = alive[doc_nums]
+            compacted = _Postings(remap[doc_nums[keep]], postings.freqs.view()[keep])
+            compacted.df = postings.df
+            self._postings[term] = compacted
+
+        self._docs = docs
+        self._lengths = _GrowableArray(np.uint32, self._lengths.view()[alive])
+        self._alive = _GrowableArray(np.uint8, np.ones(len(docs), dtype=np.uint8))
+        self._doc_nums = {doc[0]: i for i, doc in enumerate(docs)}
+
+
+_search_index: Optional[Any] = None
+
+
+def get_search_index() -> Any:
+    """
+    Returns the process-wide index used by search_tool.
+
+    When SEARCH_INDEX_PATH is set, the prebuilt index file at that path is
+    memory-mapped read-only; otherwise an empty in-memory SearchIndex is used.
+    """
+    global _search_index
+    if _search_index is None:
+        path = os.getenv("SEARCH_INDEX_PATH")
+        if path:
+            from tools.tools_search_file import MappedSearchIndex
+
+            _search_index = MappedSearchIndex(path)
+        else:
+            _search_index = SearchIndex()
+    return _search_index
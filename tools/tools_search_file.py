@@ -0,0 +1,243 @@
+"""
+Read-only, memory-mapped BM25 index file for search_tool, and the offline builder that writes it.
+
+Build an index from a JSON Lines corpus of {"url", "title", "description"} objects with:
+
+    python -m tools.tools_search_file corpus.jsonl search.idx
+
+then point SEARCH_INDEX_PATH at the output. Opening the file only parses its
+header, and every array is a view over the mapping, so worker processes share
+the same page-cache pages instead of each holding its own copy.
+"""
+
+import argparse
+import json
+import mmap
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from tools.tools_models import SearchResultItem, SearchResults
+from tools.tools_search import DEFAULT_B, DEFAULT_K1, rank_bm25, tokenize
+
+MAGIC = b"MLSRCH01"
+
+# magic, n_docs, n_terms, total_length, then the byte offset of each section.
+_HEADER = struct.Struct("<8s3Q8Q")
+_SECTIONS = (
+    "doc_lengths",
+    "doc_offsets",
+    "doc_blob",
+    "term_offsets",
+    "term_blob",
+    "postings_offsets",
+    "postings_docs",
+    "postings_freqs",
+)
+
+Document = Tuple[str, str, Optional[str]]
+
+
+def write_search_index(documents: Iterable[Document], path: str) -> int:
+    """
+    Writes an index file for the given (url, title, description) documents.
+
+    Later documents replace earlier ones with the same URL.
+
+    Args:
+        documents: The corpus to index.
+        path: Where to write the index file.
+
+    Returns:
+        The number of documents written.
+    """
+    docs: Dict[str, Document] = {}
+    for url, title, description in documents:
+        if not url or not title:
+            raise ValueError("Documents need a URL and a title.")
+        docs.pop(url, None)
+        docs[url] = (url, title, description)
+
+    lengths = array("I")
+    doc_offsets = array("Q", [0])
+    doc_blob = bytearray()
+    postings: Dict[str, Tuple[array, array]] = {}
+    for doc_num, (url, title, description) in enumerate(docs.values()):
+        tokens = tokenize(f"{title} {description or ''}")
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, freq in counts.items():
+            term_docs, term_freqs = postings.setdefault(term, (array("I"), array("I")))
+            term_docs.append(doc_num)
+            term_freqs.append(freq)
+        lengths.append(len(tokens))
+        for field in (url, title, description or ""):
+            doc_blob += field.encode("utf-8")
+            doc_offsets.append(len(doc_blob))
+
+    terms = sorted(postings)
+    term_offsets = array("Q", [0])
+    term_blob = bytearray()
+    postings_offsets = array("Q", [0])
+    postings_docs = array("I")
+    postings_freqs = array("I")
+    for term in terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+        term_docs, term_freqs = postings[term]
+        postings_docs.extend(term_docs)
+        postings_freqs.extend(term_freqs)
+        postings_offsets.append(len(postings_docs))
+
+    sections = (
+        lengths, doc_offsets, doc_blob, term_offsets, term_blob,
+        postings_offsets, postings_docs, postings_freqs,
+    )
+    with open(path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets = []
+        for section in sections:
+            # Keep every section 8-byte aligned so it can be viewed in place.
+            f.write(b"\0" * (-f.tell() % 8))
+            offsets.append(f.tell())
+            f.write(section if isinstance(section, bytearray) else section.tobytes())
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(docs), len(terms), sum(lengths), *offsets))
+    return len(docs)
+
+
+class MappedSearchIndex:
+    """
+    Read-only index over a file written by write_search_index.
+
+    The term dictionary is sorted, so lookups are a binary search over the
+    mapping; postings and the document table are NumPy views into it.
+    """
+
+    def __init__(self, path: str, k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        """
+        Maps the index file. Cost does not depend on the corpus size.
+
+        Args:
+            path: The index file to open.
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+
+        Raises:
+            ValueError: If the file is not a search index.
+        """
+        self._k1 = k1
+        self._b = b
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{path} is not a search index file.")
+        magic, self._n_docs, self._n_terms, self._total_length, *offsets = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search index file.")
+
+        section = dict(zip(_SECTIONS, offsets))
+        self._doc_lengths = self._view(section["doc_lengths"], np.uint32, self._n_docs)
+        self._doc_offsets = self._view(section["doc_offsets"], np.uint64, 3 * self._n_docs + 1)
+        self._doc_blob = section["doc_blob"]
+        self._term_offsets = self._view(section["term_offsets"], np.uint64, self._n_terms + 1)
+        self._term_blob = section["term_blob"]
+        self._postings_offsets = self._view(section["postings_offsets"], np.uint64, self._n_terms + 1)
+        n_postings = int(self._postings_offsets[-1])
+        self._postings_docs = self._view(section["postings_docs"], np.uint32, n_postings)
+        self._postings_freqs = self._view(section["postings_freqs"], np.uint32, n_postings)
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    def close(self) -> None:
+        """
+        Releases the mapping. The index cannot be searched afterwards.
+        """
+        self._doc_lengths = self._doc_offsets = self._term_offsets = None
+        self._postings_offsets = self._postings_docs = self._postings_freqs = None
+        self._mmap.close()
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> SearchResults:
+        """
+        Returns one page of documents ranked by BM25 score.
+
+        Args:
+            query: The search query string.
+            limit: Maximum number of results to return.
+            offset: Number of top-ranked results to skip.
+
+        Returns:
+            The requested page of results and the total number of matching documents.
+
+        Raises:
+            ValueError: If limit or offset is negative.
+        """
+        if limit < 0 or offset < 0:
+            raise ValueError("limit and offset cannot be negative.")
+
+        term_postings = []
+        for term in set(tokenize(query)):
+            term_id = self._find_term(term)
+            if term_id is not None:
+                start, end = int(self._postings_offsets[term_id]), int(self._postings_offsets[term_id + 1])
+                term_postings.append((self._postings_docs[start:end], self._postings_freqs[start:end], end - start))
+
+        page, total = rank_bm25(
+            term_postings, self._doc_lengths, None, self._n_docs, self._total_length,
+            limit, offset, self._k1, self._b,
+        )
+        items = []
+        for doc_num, score in page:
+            url, title, description = self._document(doc_num)
+            items.append(SearchResultItem(title=title, url=url, description=description or None, score=score))
+        return SearchResults(results=items, total_results=total)
+
+    def _view(self, offset: int, dtype: type, count: int) -> np.ndarray:
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+
+    def _string(self, base: int, offsets: np.ndarray, i: int) -> str:
+        return self._mmap[base + int(offsets[i]):base + int(offsets[i + 1])].decode("utf-8")
+
+    def _find_term(self, term: str) -> Optional[int]:
+        lo, hi = 0, self._n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(self._term_blob, self._term_offsets, mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_terms and self._string(self._term_blob, self._term_offsets, lo) == term:
+            return lo
+        return None
+
+    def _document(self, doc_num: int) -> List[str]:
+        return [self._string(self._doc_blob, self._doc_offsets, 3 * doc_num + i) for i in range(3)]
+
+
+def _read_jsonl(path: str) -> Iterable[Document]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["url"], record["title"], record.get("description")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command-line entry point: builds an index file from a JSON Lines corpus.
+    """
+    parser = argparse.ArgumentParser(description="Build a memory-mapped search index for search_tool.")
+    parser.add_argument("corpus", help='JSON Lines file of {"url", "title", "description"} objects.')
+    parser.add_argument("output", help="Path of the index file to write.")
+    args = parser.parse_args(argv)
+
+    count = write_search_index(_read_jsonl(args.corpus), args.output)
+    print(f"Indexed {count} documents into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
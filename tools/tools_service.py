@@ -1,59 +1,120 @@
 """Business logic for implementing or orchestrating custom Tools. Agents or Chains call these tools behind the scenes."""
 
+import asyncio
 import logging
-from typing import List
+from typing import Any, Mapping, Optional, Union
 
+import numpy as np
 
-def search_tool(query: str) -> List[str]:
+from tools.tools_calculator import compile_expression
+from tools.tools_models import SearchQuery, SearchResults
+from tools.tools_search import get_search_index
+
+
+def search_tool(query: Union[str, SearchQuery], limit: int = 10, offset: int = 0) -> SearchResults:
     """
-    Example tool that searches an index or external API.
+    Example tool that searches the local BM25 index.
 
     Args:
-        query: The search query string.
+        query: The search query string, or a SearchQuery carrying its own limit and offset.
+        limit: Maximum number of results to return.
+        offset: Number of top-ranked results to skip.
 
     Returns:
-        A list of relevant search results matching the given query.
+        One page of relevant search results and the total number of matches.
 
     Raises:
-        ValueError: If the query is empty.
+        TypeError: If the query is neither a string nor a SearchQuery.
+        ValueError: If the query is empty or limit/offset is negative.
     """
+    if isinstance(query, SearchQuery):
+        query, limit, offset = query.query, query.limit, query.offset
+    if not isinstance(query, str):
+        raise TypeError("Query must be a string or a SearchQuery.")
     if not query:
         raise ValueError("Query cannot be empty.")
 
-    # TODO: Implement actual search logic here. This might involve calling an external
-    # API, running a local index search, or any other form of data retrieval.
     logging.debug("Executing search_tool with query: %s", query)
 
-    results: List[str] = []
-    # Placeholder for real search implementation
-    # results = ...
+    return get_search_index().search(query, limit=limit, offset=offset)
 
-    return results
 
-
-def calculator_tool(expression: str) -> float:
+def calculator_tool(expression: str, variables: Optional[Mapping[str, float]] = None) -> float:
     """
     Example tool that computes math expressions.
 
+    Expressions are compiled once by a whitelisting compiler and cached by
+    their text, so repeated formulas skip parsing entirely.
+
     Args:
         expression: A string representing the math expression to compute.
+        variables: Values for any variables used in the expression.
 
     Returns:
         The computed float value.
 
     Raises:
-        ValueError: If the expression is invalid.
+        ValueError: If the expression is invalid or cannot be evaluated.
     """
     if not expression:
         raise ValueError("Expression cannot be empty.")
 
-    # TODO: Implement robust math expression parsing and evaluation.
     logging.debug("Executing calculator_tool with expression: %s", expression)
 
-    try:
-        result = eval(expression)  # NOTE: eval() is not safe for production use
-        return float(result)
-    except (SyntaxError, NameError) as exc:
-        raise ValueError(f"Invalid expression: {expression}") from exc
-    except ZeroDivisionError as exc:
-        raise ValueError("Division by zero is not allowed.") from exc
\ No newline at end of file
+    return compile_expression(expression).evaluate(variables)
+
+
+def vectorized_calculator_tool(expression: str, variables: Mapping[str, Any]) -> np.ndarray:
+    """
+    Evaluates one expression element-wise over arrays of variable bindings.
+
+    Args:
+        expression: A string representing the math expression to compute.
+        variables: Arrays of values for the expression's variables; they must broadcast together.
+
+    Returns:
+        A float64 array with one result per binding.
+
+    Raises:
+        ValueError: If the expression is invalid or cannot be evaluated.
+    """
+    if not expression:
+        raise ValueError("Expression cannot be empty.")
+
+    return compile_expression(expression).evaluate_vectorized(variables)
+
+
+async def asearch_tool(query: Union[str, SearchQuery], limit: int = 10, offset: int = 0) -> SearchResults:
+    """
+    Async counterpart of search_tool. The search runs in a worker thread so
+    large index scans never block the event loop.
+
+    Args:
+        query: The search query string, or a SearchQuery carrying its own limit and offset.
+        limit: Maximum number of results to return.
+        offset: Number of top-ranked results to skip.
+
+    Returns:
+        One page of relevant search results and the total number of matches.
+
+    Raises:
+        ValueError: If the query is empty.
+    """
+    return await asyncio.to_thread(search_tool, query, limit, offset)
+
+
+async def acalculator_tool(expression: str, variables: Optional[Mapping[str, float]] = None) -> float:
+    """
+    Async counterpart of calculator_tool.
+
+    Args:
+        expression: A string representing the math expression to compute.
+        variables: Values for any variables used in the expression.
+
+    Returns:
+        The computed float value.
+
+    Raises:
+        ValueError: If the expression is invalid or cannot be evaluated.
+    """
+    return await asyncio.to_thread(calculator_tool, expression, variables)
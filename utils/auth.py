@@ -1,8 +1,14 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt.exceptions import PyJWTError
 
 # TODO: Retrieve secret key securely, e.g., from environment variables or a secrets manager
@@ -10,34 +16,339 @@ SECRET_KEY: str = os.getenv("JWT_SECRET", "replace-with-a-secure-secret")
 ALGORITHM: str = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+# Tokens without a kid header were signed before key rotation and verify against this key.
+DEFAULT_KID = "default"
+DEFAULT_TOKEN_CACHE_SIZE = 10_000
+# Upper bound on how long a verified token is trusted without re-checking, for tokens without exp.
+DEFAULT_TOKEN_CACHE_TTL = 300.0
 
-def create_jwt(user_id: str) -> str:
+
+class KeyRing:
+    """
+    The HMAC keys accepted for verification, by key id (kid), and the one used to sign.
+
+    Rotating without downtime: add the new key, let every instance pick it up,
+    activate it so new tokens carry its kid, and remove the old key once the
+    tokens signed with it have expired.
+    """
+
+    def __init__(self, keys: Mapping[str, str], active_kid: str) -> None:
+        """
+        :param keys: Secrets by key id.
+        :param active_kid: The key id new tokens are signed with.
+        :raises ValueError: If no keys are given or active_kid is not among them.
+        """
+        if not keys:
+            raise ValueError("At least one key is required.")
+        if active_kid not in keys:
+            raise ValueError(f"Unknown active key id: {active_kid}")
+        self._keys = dict(keys)
+        self.active_kid = active_kid
+
+    def secret_for(self, kid: Optional[str]) -> Optional[str]:
+        """
+        Returns the secret for a key id, or None if the key is not accepted.
+
+        :param kid: The token's kid header; DEFAULT_KID when the token has none.
+        """
+        return self._keys.get(kid if kid is not None else DEFAULT_KID)
+
+    @property
+    def active_secret(self) -> str:
+        return self._keys[self.active_kid]
+
+    def kids(self) -> Tuple[str, ...]:
+        return tuple(self._keys)
+
+    def add(self, kid: str, secret: str) -> None:
+        """
+        Starts accepting tokens signed with a key.
+
+        :raises ValueError: If kid or secret is empty.
+        """
+        if not kid or not secret:
+            raise ValueError("Key id and secret cannot be empty.")
+        # Copy on write, so concurrent readers never see a dict being resized.
+        self._keys = {**self._keys, kid: secret}
+
+    def activate(self, kid: str) -> None:
+        """
+        Signs new tokens with a key that is already accepted.
+
+        :raises ValueError: If the key id is unknown.
+        """
+        if kid not in self._keys:
+            raise ValueError(f"Unknown key id: {kid}")
+        self.active_kid = kid
+
+    def remove(self, kid: str) -> None:
+        """
+        Stops accepting tokens signed with a key. Cached verifications of those
+        tokens are rejected on their next lookup.
+
+        :raises ValueError: If the key is the active one.
+        """
+        if kid == self.active_kid:
+            raise ValueError("Cannot remove the active key.")
+        self._keys = {k: v for k, v in self._keys.items() if k != kid}
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of decoded payloads of tokens that passed verification,
+    keyed by the token's SHA-256 digest so raw tokens are not kept.
+
+    An entry expires at the token's exp claim, or after ttl_seconds for tokens
+    without one, and is only served while the key that signed the token is
+    still accepted with the same secret. Failed verifications are not cached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_TOKEN_CACHE_SIZE, ttl_seconds: float = DEFAULT_TOKEN_CACHE_TTL) -> None:
+        """
+        :param max_size: Maximum number of entries before least recently used ones are evicted.
+        :param ttl_seconds: Lifetime of entries for tokens without an exp claim.
+        :raises ValueError: If max_size or ttl_seconds is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive.")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive.")
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float, Optional[str], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def token_hash(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token_hash: bytes, key_ring: KeyRing, now: float) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the cached payload, or None on a miss.
+
+        :param token_hash: The token's digest, see token_hash.
+        :param key_ring: The keys currently accepted.
+        :param now: The current Unix time.
+        """
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is not None:
+                payload, expires_at, kid, secret = entry
+                if now < expires_at and key_ring.secret_for(kid) == secret:
+                    self._entries.move_to_end(token_hash)
+                    self.hits += 1
+                    return dict(payload)
+                del self._entries[token_hash]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def set(
+        self, token_hash: bytes, payload: Dict[str, Any], kid: Optional[str], secret: str, now: float
+    ) -> None:
+        """
+        Caches a verified payload until the token's exp, or for ttl_seconds without one.
+        """
+        exp = payload.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else now + self._ttl
+        with self._lock:
+            self._entries[token_hash] = (dict(payload), expires_at, kid, secret)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def build_key_ring_from_env() -> KeyRing:
+    """
+    Builds the key ring from JWT_KEYS ("kid:secret,kid:secret") and
+    JWT_ACTIVE_KID (the first listed key by default). Without JWT_KEYS the
+    ring holds JWT_SECRET under DEFAULT_KID.
+
+    :raises ValueError: If JWT_KEYS is malformed or JWT_ACTIVE_KID is not listed.
+    """
+    spec = os.getenv("JWT_KEYS", "")
+    if not spec.strip():
+        return KeyRing({DEFAULT_KID: SECRET_KEY}, DEFAULT_KID)
+    keys: Dict[str, str] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kid, sep, secret = entry.partition(":")
+        if not sep or not kid or not secret:
+            raise ValueError(f"Invalid JWT_KEYS entry for key '{kid}'.")
+        keys[kid] = secret
+    return KeyRing(keys, os.getenv("JWT_ACTIVE_KID") or next(iter(keys)))
+
+
+def build_token_cache_from_env() -> Optional[VerifiedTokenCache]:
+    """
+    Builds the verified-token cache from JWT_CACHE_SIZE (entries, default
+    10000; 0 disables caching) and JWT_CACHE_TTL (seconds for tokens without exp).
+    """
+    size = int(os.getenv("JWT_CACHE_SIZE", str(DEFAULT_TOKEN_CACHE_SIZE)))
+    if size <= 0:
+        return None
+    return VerifiedTokenCache(size, float(os.getenv("JWT_CACHE_TTL", str(DEFAULT_TOKEN_CACHE_TTL))))
+
+
+_key_ring: Optional[KeyRing] = None
+_token_cache: Optional[VerifiedTokenCache] = None
+_token_cache_built = False
+
+
+def get_key_ring() -> KeyRing:
+    """
+    Returns the process-wide key ring, built from the environment on first use.
+    """
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = build_key_ring_from_env()
+    return _key_ring
+
+
+def get_token_cache() -> Optional[VerifiedTokenCache]:
+    """
+    Returns the process-wide verified-token cache, or None when disabled.
+    """
+    global _token_cache, _token_cache_built
+    if not _token_cache_built:
+        _token_cache = build_token_cache_from_env()
+        _token_cache_built = True
+    return _token_cache
+
+
+def set_key_ring(key_ring: Optional[KeyRing]) -> None:
+    """
+    Replaces the process-wide key ring; None rebuilds it from the environment on next use.
+    """
+    global _key_ring
+    _key_ring = key_ring
+
+
+def set_token_cache(cache: Optional[VerifiedTokenCache]) -> None:
+    """
+    Replaces the process-wide verified-token cache; None disables caching.
+    """
+    global _token_cache, _token_cache_built
+    _token_cache, _token_cache_built = cache, True
+
+
+def create_jwt(user_id: str, key_ring: Optional[KeyRing] = None) -> str:
     """
     Generates a JWT with user claims.
-    
+
     :param user_id: The unique identifier for the user
-    :return: A JWT token as a string
+    :param key_ring: Signs with its active key; the process-wide ring by default.
+    :return: A JWT token as a string, with the signing key's id in its kid header
     """
+    key_ring = key_ring or get_key_ring()
     expiration = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     payload: Dict[str, Any] = {
         "sub": user_id,
         "exp": expiration
     }
-    token: str = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    token: str = jwt.encode(
+        payload, key_ring.active_secret, algorithm=ALGORITHM, headers={"kid": key_ring.active_kid}
+    )
     return token
 
 
-def verify_jwt(token: str) -> Dict[str, Any]:
+def _decode(token: str, key_ring: KeyRing) -> Tuple[Dict[str, Any], Optional[str], str]:
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        secret = key_ring.secret_for(kid)
+        if secret is None:
+            raise ValueError("Invalid or expired token")
+        decoded_token: Dict[str, Any] = jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except PyJWTError as exc:
+        # TODO: Add logging here if needed
+        raise ValueError("Invalid or expired token") from exc
+    return decoded_token, kid, secret
+
+
+def decode_jwt(token: str, key_ring: Optional[KeyRing] = None) -> Dict[str, Any]:
+    """
+    Fully verifies and decodes a JWT, without consulting the cache.
+
+    :param token: The JWT token to be verified
+    :param key_ring: The accepted keys; the process-wide ring by default.
+    :return: The decoded token payload as a dictionary
+    :raises ValueError: If the token is invalid, expired or signed with an unknown key
+    """
+    return _decode(token, key_ring or get_key_ring())[0]
+
+
+def verify_jwt(
+    token: str, key_ring: Optional[KeyRing] = None, cache: Optional[VerifiedTokenCache] = None
+) -> Dict[str, Any]:
     """
-    Validates and decodes a JWT.
-    
+    Validates and decodes a JWT, serving repeat verifications of the same
+    token from the cache until it expires.
+
     :param token: The JWT token to be verified
+    :param key_ring: The accepted keys; the process-wide ring by default.
+    :param cache: The verified-token cache; the process-wide cache by default.
     :return: The decoded token payload as a dictionary
-    :raises ValueError: If the token is invalid or expired
+    :raises ValueError: If the token is invalid, expired or signed with an unknown key
+    """
+    key_ring = key_ring or get_key_ring()
+    cache = cache if cache is not None else get_token_cache()
+    if cache is None:
+        return _decode(token, key_ring)[0]
+    now = time.time()
+    token_hash = cache.token_hash(token)
+    payload = cache.get(token_hash, key_ring, now)
+    if payload is not None:
+        return payload
+    payload, kid, secret = _decode(token, key_ring)
+    cache.set(token_hash, payload, kid, secret, now)
+    return payload
+
+
+def auth_enabled() -> bool:
+    """
+    Returns whether AUTH_ENABLED asks for the API routers to require a bearer token.
     """
+    return os.getenv("AUTH_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_auth(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme),
+) -> Dict[str, Any]:
+    """
+    FastAPI dependency that requires a valid bearer token, verified against
+    the process-wide key ring and cache.
+
+    It is async and takes the ring and cache from their getters rather than
+    as sub-dependencies, because FastAPI runs sync dependencies in the
+    threadpool and that hop costs far more than a cached verification.
+
+    :return: The token's claims.
+    :raises HTTPException: 401 if the token is missing, invalid or expired.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     try:
-        decoded_token: Dict[str, Any] = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return decoded_token
-    except PyJWTError as exc:
-        # TODO: Add logging here if needed
-        raise ValueError("Invalid or expired token") from exc
\ No newline at end of file
+        return verify_jwt(credentials.credentials)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
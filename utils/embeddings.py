@@ -0,0 +1,38 @@
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+DEFAULT_EMBEDDING_DIM: int = 256
+
+
+def hashing_embedding(text: str, dim: int = DEFAULT_EMBEDDING_DIM) -> np.ndarray:
+    """
+    Computes a deterministic, dependency-free embedding using feature hashing
+    of lower-cased words and word bigrams. The result is L2-normalized, so a
+    dot product between two embeddings is their cosine similarity.
+
+    :param text: The text to embed.
+    :param dim: The embedding dimensionality.
+    :return: A float32 vector of length dim.
+    :raises ValueError: If dim is not positive.
+    """
+    if dim <= 0:
+        raise ValueError("Embedding dimension must be positive.")
+
+    vector = np.zeros(dim, dtype=np.float32)
+    words: List[str] = _WORD_PATTERN.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        vector[(value >> 1) % dim] += sign
+
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
@@ -1,17 +1,247 @@
+"""
+Logging setup: records are handed to a queue on the calling thread and
+written by a background listener, so request handlers never block on I/O.
+
+configure_logging installs the queue handler on the root logger, so every
+module logs through it with logging.getLogger(__name__). Output is one JSON
+object per line by default. Messages are formatted only for records that
+pass the level check and sampling; pass expensive arguments through lazy()
+so they are not computed for records that are dropped. Configured from the
+environment by configure_logging_from_env:
+
+    LOG_LEVEL=INFO                          root level
+    LOG_FORMAT=json                         json or text
+    LOG_DEBUG_SAMPLING=agents=0.1,chains.chains_registry=0.5
+                                            fraction of DEBUG records kept per module prefix
+"""
+
+import atexit
+import datetime
+import itertools
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, TextIO, Tuple
+
+from utils.tracing import get_request_id
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-# Configure the logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-_console_handler = logging.StreamHandler()
-_console_handler.setLevel(logging.DEBUG)
-_formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-_console_handler.setFormatter(_formatter)
-logger.addHandler(_console_handler)
 
-# TODO: Optionally allow configuration of log level, handlers, format, etc.
+# Attributes every LogRecord has; anything else on a record came from extra=.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id",
+}
+
+
+def lazy(func: Callable[[], Any]) -> "_LazyValue":
+    """
+    Defers computing a log argument until the message is formatted:
+
+        logger.debug("Tools: %s", lazy(lambda: sorted(agent.tools)))
+
+    :param func: Computes the value; called only if the record is actually emitted.
+    """
+    return _LazyValue(func)
+
+
+class _LazyValue:
+    __slots__ = ("_func",)
+
+    def __init__(self, func: Callable[[], Any]) -> None:
+        self._func = func
+
+    def __str__(self) -> str:
+        return str(self._func())
+
+    def __repr__(self) -> str:
+        return repr(self._func())
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single-line JSON object with the timestamp, level,
+    logger, message, request id, exception and any extra= fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+            .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of DEBUG records from noisy modules.
+
+    Rates are keyed by logger name prefix; the longest matching prefix wins and
+    modules without a rate are not sampled. A rate of 0.25 keeps every fourth
+    record, so sampling is even rather than random. Records above DEBUG always pass.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        """
+        :param rates: Fraction of DEBUG records to keep, by logger name prefix.
+        :raises ValueError: If a rate is outside [0, 1].
+        """
+        super().__init__()
+        for prefix, rate in rates.items():
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"Sampling rate for '{prefix}' must be between 0 and 1.")
+        self._rates = dict(rates)
+        self._samplers: Dict[str, Optional[Tuple[int, Iterator[int]]]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        sampler = self._samplers.get(record.name, False)
+        if sampler is False:
+            sampler = self._samplers[record.name] = self._sampler_for(record.name)
+        if sampler is None:
+            return True
+        every, counter = sampler
+        # next() on itertools.count is atomic under the GIL, so no lock is needed.
+        return every > 0 and next(counter) % every == 0
+
+    def _sampler_for(self, name: str) -> Optional[Tuple[int, Iterator[int]]]:
+        matches = [p for p in self._rates if name == p or name.startswith(p + ".")]
+        if not matches:
+            return None
+        rate = self._rates[max(matches, key=len)]
+        return (round(1 / rate) if rate else 0), itertools.count()
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that stamps records with the current request id and formats
+    their message on the calling thread, where the arguments are still valid,
+    leaving the rest of the formatting and the I/O to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        prepared = logging.makeLogRecord(vars(record))
+        prepared.message = prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+        prepared.exc_info = None
+        prepared.request_id = get_request_id()
+        return prepared
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[ContextQueueHandler] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(
+    level: Any = logging.INFO,
+    json_output: bool = True,
+    sample_rates: Optional[Mapping[str, float]] = None,
+    stream: Optional[TextIO] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Routes the root logger through a queue to a background listener that
+    writes to stream. Calling it again replaces the previous configuration.
+
+    :param level: Root level, as a number or a name such as "DEBUG".
+    :param json_output: Write JSON lines rather than plain text.
+    :param sample_rates: Fraction of DEBUG records kept, by logger name prefix.
+    :param stream: Where records are written; stderr by default.
+    :raises ValueError: If the level name or a sampling rate is invalid.
+    :return: The started listener.
+    """
+    global _listener, _queue_handler
+    if isinstance(level, str):
+        level_name = level.upper()
+        level = logging.getLevelName(level_name)
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {level_name}")
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+    handler = ContextQueueHandler(queue.SimpleQueue())
+    if sample_rates:
+        handler.addFilter(DebugSamplingFilter(sample_rates))
+    listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+
+    with _configure_lock:
+        root = logging.getLogger()
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+        if _listener is not None:
+            _listener.stop()
+        root.addHandler(handler)
+        root.setLevel(level)
+        listener.start()
+        _listener, _queue_handler = listener, handler
+    return listener
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    Parses "module=rate,module=rate" into a rate per module prefix.
+
+    :raises ValueError: If an entry is not of the form module=rate.
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        prefix, sep, rate = entry.partition("=")
+        if not sep or not prefix.strip():
+            raise ValueError(f"Invalid sampling entry: {entry}")
+        rates[prefix.strip()] = float(rate)
+    return rates
+
+
+def configure_logging_from_env() -> logging.handlers.QueueListener:
+    """
+    Configures logging from LOG_LEVEL, LOG_FORMAT and LOG_DEBUG_SAMPLING (see the module docstring).
+
+    :raises ValueError: If a setting is invalid.
+    """
+    log_format = os.getenv("LOG_FORMAT", "json").lower()
+    if log_format not in ("json", "text"):
+        raise ValueError(f"Unknown log format: {log_format}")
+    return configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        json_output=log_format == "json",
+        sample_rates=parse_sample_rates(os.getenv("LOG_DEBUG_SAMPLING", "")),
+    )
+
+
+def shutdown_logging() -> None:
+    """
+    Writes out queued records and stops the listener thread.
+    """
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+        if _listener is not None:
+            _listener.stop()
+        _listener = _queue_handler = None
+
+
+atexit.register(shutdown_logging)
 
 
 def log_debug(message: str) -> None:
@@ -47,4 +277,4 @@ def log_error(message: str) -> None:
     """
     if not isinstance(message, str):
         raise TypeError("Message must be a string.")
-    logger.error(message)
\ No newline at end of file
+    logger.error(message)
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key, so only one underlying call
+    runs and every caller receives its result or its exception.
+
+    The shared call runs as its own task, so one caller being cancelled does
+    not cancel it for the others; it is cancelled only once every caller has
+    gone. Calls are coalesced per event loop, since tasks cannot be awaited
+    across loops.
+    """
+
+    def __init__(self) -> None:
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _Flight]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        """
+        Returns the number of distinct calls currently running on this loop.
+        """
+        return len(self._flights.get(asyncio.get_running_loop(), ()))
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaits func() unless a call with the same key is already running, in
+        which case it waits for and returns that call's outcome instead.
+
+        :param key: Identifies calls that are interchangeable.
+        :param func: Starts the call; invoked only when no identical call is running.
+        :return: The shared call's result.
+        :raises Exception: Whatever the shared call raised.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flights = self._flights.get(loop)
+            if flights is None:
+                flights = self._flights[loop] = {}
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = _Flight(loop.create_task(func()))
+                flight.task.add_done_callback(lambda _task: self._land(loop, key, flight))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                with self._lock:
+                    flight.waiters -= 1
+                    abandoned = flight.waiters == 0
+                    if abandoned and flights.get(key) is flight:
+                        # Later callers must start a fresh call rather than join the cancelled one.
+                        del flights[key]
+                if abandoned:
+                    flight.task.cancel()
+            raise
+
+    def _land(self, loop: asyncio.AbstractEventLoop, key: Hashable, flight: "_Flight") -> None:
+        with self._lock:
+            flights = self._flights.get(loop)
+            if flights is not None and flights.get(key) is flight:
+                del flights[key]
+        # Retrieve the exception so an abandoned failing call does not log "never retrieved".
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
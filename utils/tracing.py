@@ -0,0 +1,567 @@
+"""
+Lightweight request tracing.
+
+Spans are opened with the span() context manager or the traced() decorator
+and nest through contextvars, so a span started inside another, in the same
+task or in a task or thread started from it, becomes its child. Finished
+spans go to the tracer's exporters: InMemorySpanExporter keeps the latest
+spans in-process, OTLPJsonFileExporter appends them to a file in the OTLP/JSON
+format accepted by OpenTelemetry collectors.
+
+Tracing is off unless enabled with TRACING_ENABLED=true or Tracer.configure;
+while it is off, span() returns a shared no-op span and traced() calls the
+wrapped function directly, so instrumented code pays one attribute check.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+DEFAULT_SERVICE_NAME = "mini-langchain"
+DEFAULT_MAX_SPANS = 1000
+MAX_REQUEST_ID_LENGTH = 128
+
+STATUS_UNSET = "unset"
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+_OTLP_STATUS_CODES = {STATUS_UNSET: 0, STATUS_OK: 1, STATUS_ERROR: 2}
+_OTLP_SPAN_KIND_INTERNAL = 1
+_OTLP_SPAN_KIND_SERVER = 2
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def new_request_id() -> str:
+    """
+    Returns a new random request id.
+    """
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Returns the id of the request being handled in this context, if any.
+    """
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]) -> Token:
+    """
+    Sets the request id for this context and the tasks and threads it starts.
+
+    :param request_id: The id, or None to clear it.
+    :return: A token for reset_request_id.
+    """
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: Token) -> None:
+    """
+    Restores the request id that was current before set_request_id returned token.
+    """
+    _request_id.reset(token)
+
+
+def current_span() -> Optional["Span"]:
+    """
+    Returns the innermost open span in this context, if any.
+    """
+    return _current_span.get()
+
+
+class Span:
+    """
+    One timed operation. Used as a context manager, it becomes the current
+    span on entry and is ended and exported on exit; an exception escaping
+    the block marks it as failed.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+        "attributes", "status", "status_message", "_tracer", "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = _OTLP_SPAN_KIND_INTERNAL,
+    ) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.kind = kind
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = attributes if attributes is not None else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self._tracer = tracer
+        self._token: Optional[Token] = None
+
+    @property
+    def duration_ms(self) -> float:
+        """
+        Milliseconds between start and end; 0 while the span is open.
+        """
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Sets an attribute; values should be str, bool, int or float.
+        """
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = "") -> None:
+        """
+        Sets the span status to STATUS_OK or STATUS_ERROR.
+        """
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        """
+        Marks the span as failed by exc.
+        """
+        self.attributes["exception.type"] = type(exc).__name__
+        self.set_status(STATUS_ERROR, str(exc))
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self._token = None
+        self._tracer._export(self)
+        return False
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Returns the span in the OTLP/JSON span encoding.
+        """
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": _OTLP_STATUS_CODES[self.status]},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, span_id={self.span_id}, parent_id={self.parent_id}, status={self.status})"
+
+
+class _NoopSpan:
+    """
+    Stands in for a span while tracing is disabled; every operation does nothing.
+    """
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: str = "") -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    # bool first: it is a subclass of int. OTLP/JSON encodes 64-bit integers as strings.
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class SpanExporter(ABC):
+    """
+    Receives spans as they end. Called on the thread that ended the span, so
+    implementations must be thread-safe and should not block.
+    """
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """
+        Handles one finished span.
+        """
+
+    def flush(self) -> None:
+        """
+        Writes out any buffered spans.
+        """
+
+    def shutdown(self) -> None:
+        """
+        Flushes and releases resources.
+        """
+        self.flush()
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Keeps the most recent finished spans in process, for tests and debugging.
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS) -> None:
+        """
+        :param max_spans: Number of spans kept; the oldest are dropped first.
+        :raises ValueError: If max_spans is not positive.
+        """
+        if max_spans <= 0:
+            raise ValueError("max_spans must be positive.")
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        # deque.append is atomic, so no lock is needed.
+        self._spans.append(span)
+
+    def get_finished_spans(
+        self, trace_id: Optional[str] = None, request_id: Optional[str] = None
+    ) -> List[Span]:
+        """
+        Returns the kept spans in the order they ended.
+
+        :param trace_id: Only return spans of this trace.
+        :param request_id: Only return spans recorded while handling this request.
+        """
+        spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        if request_id is not None:
+            spans = [span for span in spans if span.attributes.get("request.id") == request_id]
+        return spans
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class OTLPJsonFileExporter(SpanExporter):
+    """
+    Appends spans to a file as OTLP/JSON, one ExportTraceServiceRequest per
+    line, so the file can be replayed into an OpenTelemetry collector.
+
+    Spans are buffered and handed batch_size at a time to a background
+    writer thread, so encoding and file I/O never run on the thread that
+    ended the span. flush waits until everything exported so far is written;
+    shutdown also stops the writer.
+    """
+
+    def __init__(self, path: str, service_name: str = DEFAULT_SERVICE_NAME, batch_size: int = 64) -> None:
+        """
+        :param path: The file to append to; created if missing.
+        :param service_name: Reported as the service.name resource attribute.
+        :param batch_size: Number of spans written per line.
+        :raises ValueError: If batch_size is not positive.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._batches: "queue.Queue[Optional[List[Span]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+            self._enqueue(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if batch:
+                self._enqueue(batch)
+        self._batches.join()
+
+    def shutdown(self) -> None:
+        self.flush()
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._batches.put(None)
+        if writer is not None:
+            writer.join()
+
+    def encode(self, spans: Sequence[Span]) -> Dict[str, Any]:
+        """
+        Returns spans as an OTLP ExportTraceServiceRequest.
+        """
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+
+    def _enqueue(self, batch: List[Span]) -> None:
+        # Called with self._lock held.
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_batches, name="otlp-span-writer", daemon=True)
+            self._writer.start()
+        self._batches.put(batch)
+
+    def _write_batches(self) -> None:
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is None:
+                    return
+                self._write(batch)
+            except Exception:
+                # Losing a batch of spans must not kill the writer for every later batch.
+                logger.exception("Failed to write spans to %s.", self.path)
+            finally:
+                self._batches.task_done()
+
+    def _write(self, batch: Sequence[Span]) -> None:
+        line = json.dumps(self.encode(batch), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to its exporters.
+    """
+
+    def __init__(self, exporters: Optional[Sequence[SpanExporter]] = None, enabled: bool = False) -> None:
+        self.exporters: List[SpanExporter] = list(exporters or ())
+        self.enabled = enabled
+
+    def configure(self, enabled: bool, exporters: Optional[Sequence[SpanExporter]] = None) -> None:
+        """
+        Turns tracing on or off and, when exporters is given, replaces the
+        exporters; the previous ones are shut down.
+        """
+        if exporters is not None:
+            previous, self.exporters = self.exporters, list(exporters)
+            for exporter in previous:
+                if exporter not in self.exporters:
+                    exporter.shutdown()
+        self.enabled = enabled
+
+    def span(self, name: str, kind: int = _OTLP_SPAN_KIND_INTERNAL, **attributes: Any) -> Any:
+        """
+        Returns a span to use as a context manager, a child of the current span.
+
+        :param name: The operation, e.g. "llm.call".
+        :param kind: The OTLP span kind.
+        :param attributes: Initial attributes.
+        :return: A Span, or NOOP_SPAN while tracing is disabled.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        request_id = _request_id.get()
+        if request_id is not None:
+            attributes["request.id"] = request_id
+        return Span(self, name, _current_span.get(), attributes, kind)
+
+    def memory_exporter(self) -> Optional[InMemorySpanExporter]:
+        """
+        Returns the first in-process exporter, if one is configured.
+        """
+        return next((e for e in self.exporters if isinstance(e, InMemorySpanExporter)), None)
+
+    def flush(self) -> None:
+        for exporter in self.exporters:
+            exporter.flush()
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def _export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+tracer = Tracer()
+atexit.register(tracer.shutdown)
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the process-wide tracer.
+    """
+    return tracer
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """
+    Opens a span on the process-wide tracer; see Tracer.span.
+
+        with span("tool.call", tool="search") as s:
+            s.set_attribute("results", 3)
+    """
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return tracer.span(name, **attributes)
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable[[F], F]:
+    """
+    Decorates a function or coroutine function so each call runs in a span.
+
+    :param name: The span name; the function's qualified name by default.
+    :param attributes: Attributes set on every span.
+    """
+    def decorate(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def configure_tracing_from_env() -> Tracer:
+    """
+    Configures the process-wide tracer from the environment and returns it.
+
+    TRACING_ENABLED=true turns tracing on, with an in-process exporter keeping
+    the last TRACING_MAX_SPANS spans (default 1000). TRACING_OTLP_FILE also
+    appends spans to that file as OTLP/JSON, and TRACING_SERVICE_NAME sets the
+    service.name reported in it. Leaves the tracer untouched when
+    TRACING_ENABLED is unset, so a tracer configured in code is kept.
+    """
+    setting = os.getenv("TRACING_ENABLED")
+    if setting is None:
+        return tracer
+    if setting.lower() not in ("1", "true", "yes"):
+        tracer.configure(False)
+        return tracer
+    exporters: List[SpanExporter] = [InMemorySpanExporter(int(os.getenv("TRACING_MAX_SPANS", DEFAULT_MAX_SPANS)))]
+    path = os.getenv("TRACING_OTLP_FILE")
+    if path:
+        exporters.append(OTLPJsonFileExporter(path, os.getenv("TRACING_SERVICE_NAME", DEFAULT_SERVICE_NAME)))
+    tracer.configure(True, exporters)
+    return tracer
+
+
+def _request_id_from_header(value: bytes) -> Optional[str]:
+    # Only echo back ids that are safe to put in a response header.
+    request_id = value.decode("latin-1")
+    if 0 < len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable() and request_id.isascii():
+        return request_id
+    return None
+
+
+class RequestTracingMiddleware:
+    """
+    ASGI middleware that gives every HTTP request an id and a root span.
+
+    The id comes from the X-Request-ID request header when it holds a usable
+    value and is generated otherwise; it is set for the request's context, so
+    get_request_id() and every span recorded while handling the request carry
+    it, and it is echoed in the response's X-Request-ID header.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]) -> None:
+        self.app = app
+        self._header = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for key, value in scope.get("headers", ()):
+            if key == self._header:
+                request_id = _request_id_from_header(value)
+                break
+        request_id = request_id or new_request_id()
+        header = (self._header, request_id.encode("latin-1"))
+
+        token = _request_id.set(request_id)
+        try:
+            with tracer.span(
+                f"{scope['method']} {scope['path']}",
+                kind=_OTLP_SPAN_KIND_SERVER,
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            ) as root:
+                async def send_with_request_id(message: Dict[str, Any]) -> None:
+                    if message["type"] == "http.response.start":
+                        message = {**message, "headers": [*message.get("headers", ()), header]}
+                        root.set_attribute("http.status_code", message["status"])
+                        if message["status"] >= 500:
+                            root.set_status(STATUS_ERROR)
+                    await send(message)
+
+                await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id.reset(token)